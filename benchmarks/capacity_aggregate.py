@@ -0,0 +1,41 @@
+"""Column build + per-node/location aggregation behind ``/panel_capacity``.
+
+    python -m benchmarks.capacity_aggregate [servers] [nodes]
+"""
+from __future__ import annotations
+import sys, time
+from bot.client.records import NodeRecord, ServerColumns
+from bot.services import capacity
+from bot.services.capacity import capacity_report
+
+def pages(n: int, nodes: int, per_page: int = 100):
+    # Application API /servers items, trimmed to the fields the columns read
+    for start in range(0, n, per_page):
+        yield [{"id": i, "node": 1 + i % nodes, "limits": {"memory": 1024 * (1 + i % 8), "disk": 5120 * (1 + i % 4),
+                                                        "cpu": 100 * (i % 3), "swap": 0, "io": 500}}
+               for i in range(start, min(n, start + per_page))]
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    node_list = [NodeRecord(i, f"node-{i}", f"n{i}.example.com", 1 + i % 6, 65536, 20, 1_000_000, 0, False)
+                 for i in range(1, k + 1)]
+    batches = list(pages(n, k))
+    t0 = time.perf_counter()
+    cols = ServerColumns()
+    for b in batches:
+        cols.extend(b)
+    build_s = time.perf_counter() - t0
+    print(f"{n} servers on {k} nodes")
+    print(f"  columns: {build_s * 1000:7.1f} ms  ({sum(a.itemsize * len(a) for a in (cols.node_id, cols.memory, cols.disk, cols.cpu)) / 1024:.0f} KiB)")
+    modes = [False] + ([True] if capacity.np is not None else [])
+    for vectorized in modes:
+        t0 = time.perf_counter()
+        report = capacity_report(cols, node_list, vectorized=vectorized)
+        label = "numpy" if vectorized else "plain"
+        print(f"  {label}:   {(time.perf_counter() - t0) * 1000:7.1f} ms  estate mem {report.estate.memory_ratio:.0%}")
+    if capacity.np is None:
+        print("  numpy:   not installed (plain path only)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Memory of cached panel data: raw API ``attributes`` dicts vs the compact records
+(server directory, per-server resources, node allocations).
+
+    python -m benchmarks.records_memory [count]
+"""
+from __future__ import annotations
+import gc, json, sys, time, tracemalloc
+from bot.client.records import AllocationRecord, ResourceRecord, ServerRecord
+
+NODES = [f"node-{i:02d}" for i in range(40)]
+STATES = [None, "installing", "suspended", "restoring_backup"]
+
+def payload(i: int) -> str:
+    # one /api/client list item, decoded separately so no strings are shared up front
+    return json.dumps({"object": "server", "attributes": {
+        "server_owner": True,
+        "identifier": f"{i:08x}",
+        "internal_id": i,
+        "uuid": f"{i:08x}-0000-4000-8000-{i:012x}",
+        "name": f"server-{i}",
+        "node": NODES[i % len(NODES)],
+        "is_node_under_maintenance": False,
+        "sftp_details": {"ip": "sftp.example.com", "port": 2022},
+        "description": "",
+        "limits": {"memory": 2048, "swap": 0, "disk": 10240, "io": 500, "cpu": 200, "threads": None, "oom_disabled": True},
+        "invocation": "java -Xms128M -Xmx2048M -jar server.jar",
+        "docker_image": "ghcr.io/pterodactyl/yolks:java_17",
+        "egg_features": ["eula", "java_version"],
+        "feature_limits": {"databases": 2, "allocations": 1, "backups": 5},
+        "status": STATES[i % len(STATES)],
+        "is_suspended": False,
+        "is_installing": False,
+        "is_transferring": False,
+        "relationships": {"allocations": {"object": "list", "data": [{"object": "allocation", "attributes": {
+            "id": i, "ip": "10.0.0.1", "ip_alias": None, "port": 25565 + i % 1000, "notes": None, "is_default": True}}]},
+            "variables": {"object": "list", "data": []}},
+    }})
+
+def resources_payload(i: int) -> str:
+    return json.dumps({"object": "stats", "attributes": {
+        "current_state": ("running", "offline", "starting")[i % 3],
+        "is_suspended": False,
+        "resources": {"memory_bytes": 1_500_000_000 + i, "cpu_absolute": 12.5 + i % 100, "disk_bytes": 4_000_000_000 + i,
+                      "network_rx_bytes": 10_000 * i, "network_tx_bytes": 20_000 * i, "uptime": 3_600_000 + i},
+    }})
+
+def allocation_payload(i: int) -> str:
+    return json.dumps({"object": "allocation", "attributes": {
+        "id": i, "ip": f"10.0.{i // 65536 % 256}.{i // 256 % 256}", "alias": None, "port": 25565 + i % 1000,
+        "notes": None, "assigned": bool(i % 2),
+    }})
+
+def measure(build) -> tuple[int, float]:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    keep = build()
+    elapsed = time.perf_counter() - t0
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return size, elapsed
+
+def compare(label: str, raw: list[str], record) -> None:
+    n = len(raw)
+    dict_bytes, dict_s = measure(lambda: [json.loads(r)["attributes"] for r in raw])
+    rec_bytes, rec_s = measure(lambda: [record.from_api(json.loads(r)["attributes"]) for r in raw])
+    print(f"{n} {label}")
+    print(f"  dicts:   {dict_bytes / 1024 / 1024:8.1f} MiB  ({dict_bytes / n:6.0f} B each)  parse {dict_s:.2f}s")
+    print(f"  records: {rec_bytes / 1024 / 1024:8.1f} MiB  ({rec_bytes / n:6.0f} B each)  parse {rec_s:.2f}s")
+    print(f"  ratio:   {dict_bytes / max(1, rec_bytes):.1f}x smaller")
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    compare("servers", [payload(i) for i in range(n)], ServerRecord)
+    compare("resource snapshots", [resources_payload(i) for i in range(n)], ResourceRecord)
+    compare("allocations", [allocation_payload(i) for i in range(n)], AllocationRecord)
+
+if __name__ == "__main__":
+    main()
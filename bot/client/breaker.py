@@ -0,0 +1,154 @@
+from __future__ import annotations
+import asyncio, time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any
+import aiohttp
+from yarl import URL
+from ..config import settings
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"panel {host} unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+def is_panel_failure(exc: BaseException) -> bool:
+    """Errors that say the panel itself is unhealthy (not e.g. a 404 for a wrong server)."""
+    if isinstance(exc, CircuitOpenError | asyncio.TimeoutError):
+        return True
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status >= 500 or exc.status == 429
+    return isinstance(exc, aiohttp.ClientError)
+
+class CircuitBreaker:
+    def __init__(self, host: str, *, window: float, min_calls: int, error_rate: float,
+                 max_consecutive: int, open_seconds: float):
+        self.host = host
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate
+        self.max_consecutive = max_consecutive
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trips = 0
+        self.consecutive = 0
+        self.last_error: str | None = None
+        self._events: deque[tuple[float, bool]] = deque()
+        self._probing = False
+
+    def _trim(self, now: float) -> None:
+        while self._events and now - self._events[0][0] > self.window:
+            self._events.popleft()
+
+    def error_rate(self) -> float:
+        self._trim(time.monotonic())
+        if not self._events:
+            return 0.0
+        return sum(1 for _, failed in self._events if failed) / len(self._events)
+
+    def retry_in(self) -> float:
+        return max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+
+    def _trip(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.trips += 1
+        self._events.clear()
+
+    def before_call(self) -> bool:
+        """Raise if the call must fail fast; return True when this call is the half-open probe."""
+        now = time.monotonic()
+        if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+        if self.state == OPEN or (self.state == HALF_OPEN and self._probing):
+            raise CircuitOpenError(self.host, self.retry_in())
+        if self.state == HALF_OPEN:
+            self._probing = True
+            return True
+        return False
+
+    def record(self, failed: bool, probe: bool, error: str | None = None) -> None:
+        now = time.monotonic()
+        if failed:
+            self.consecutive += 1
+            self.last_error = error
+        else:
+            self.consecutive = 0
+        if probe:
+            self._probing = False
+            if failed:
+                self._trip(now)
+            else:
+                self.state = CLOSED
+            return
+        if self.state != CLOSED:
+            return
+        self._events.append((now, failed))
+        self._trim(now)
+        if not failed:
+            return
+        failures = sum(1 for _, f in self._events if f)
+        if self.consecutive >= self.max_consecutive or (
+            len(self._events) >= self.min_calls and failures / len(self._events) >= self.error_rate_threshold
+        ):
+            self._trip(now)
+
+    @asynccontextmanager
+    async def guard(self):
+        probe = self.before_call()
+        try:
+            yield
+        except asyncio.CancelledError:
+            if probe:
+                self._probing = False
+            raise
+        except Exception as e:
+            failed = is_panel_failure(e)
+            self.record(failed, probe, (str(e) or type(e).__name__)[:120] if failed else None)
+            raise
+        else:
+            self.record(False, probe)
+
+    def snapshot(self) -> dict[str, Any]:
+        state = self.state
+        if state == OPEN and self.retry_in() == 0:
+            state = HALF_OPEN
+        return {
+            "host": self.host,
+            "state": state,
+            "error_rate": self.error_rate(),
+            "calls": len(self._events),
+            "trips": self.trips,
+            "retry_in": self.retry_in() if state == OPEN else 0.0,
+            "last_error": self.last_error,
+        }
+
+class BreakerRegistry:
+    """One breaker per panel host, shared by every user and client instance."""
+
+    def __init__(self):
+        self._by_host: dict[str, CircuitBreaker] = {}
+
+    def get(self, panel_url: str | URL) -> CircuitBreaker:
+        u = URL(str(panel_url))
+        host = f"{u.host}:{u.port}" if u.port and not u.is_default_port() else (u.host or str(panel_url))
+        br = self._by_host.get(host)
+        if br is None:
+            br = self._by_host[host] = CircuitBreaker(
+                host,
+                window=settings.breaker_window_seconds,
+                min_calls=settings.breaker_min_calls,
+                error_rate=settings.breaker_error_rate,
+                max_consecutive=settings.breaker_max_consecutive,
+                open_seconds=settings.breaker_open_seconds,
+            )
+        return br
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [b.snapshot() for b in sorted(self._by_host.values(), key=lambda b: b.host)]
+
+breakers = BreakerRegistry()
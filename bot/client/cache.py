@@ -0,0 +1,183 @@
+from __future__ import annotations
+import asyncio, time
+from collections import OrderedDict
+from dataclasses import is_dataclass, replace
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
+import aiohttp
+import structlog
+from ..config import settings
+from .breaker import is_panel_failure
+
+log = structlog.get_logger()
+
+CacheKey = tuple[str, str, str]  # (panel host, token fingerprint, path)
+
+class StaleList(list):
+    stale_age: float = 0.0
+    warm: bool = False
+
+class StaleDict(dict):
+    stale_age: float = 0.0
+    warm: bool = False
+
+def mark_stale(value: Any, age: float, warm: bool = False) -> Any:
+    if isinstance(value, list):
+        out: Any = StaleList(value)
+    elif isinstance(value, dict):
+        out = StaleDict(value)
+    elif is_dataclass(value) and hasattr(value, "stale_age"):
+        return replace(value, stale_age=age, warm=warm)  # records with stale fields (ResourceRecord)
+    else:
+        return value
+    out.stale_age = age
+    out.warm = warm
+    return out
+
+def stale_age(value: Any) -> float | None:
+    """Age in seconds if ``value`` came from the fallback cache, else None."""
+    return getattr(value, "stale_age", None)
+
+def is_warm(value: Any) -> bool:
+    """True if ``value`` is a warm-restart snapshot entry (a refresh is under way), not a fallback."""
+    return getattr(value, "warm", False)
+
+def stale_note(value: Any) -> str | None:
+    """Short user-facing reason ``value`` is not live data, or None if it is."""
+    age = stale_age(value)
+    if age is None:
+        return None
+    if is_warm(value):
+        return f"restored from snapshot ({fmt_age(age)} old), refreshing"
+    return f"panel unavailable, cached {fmt_age(age)} ago"
+
+def fmt_age(seconds: float) -> str:
+    s = int(seconds)
+    if s < 90:
+        return f"{s}s"
+    if s < 90 * 60:
+        return f"{s // 60}m"
+    return f"{s // 3600}h"
+
+class ResponseCache:
+    """Bounded LRU of the last good panel responses, used when a panel is down.
+
+    Entries restored from a warm-restart snapshot are flagged *warm*: they
+    may be served straight away (marked stale) until a live fetch replaces them.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[CacheKey, tuple[float, Any]] = OrderedDict()
+        self._warm: set[CacheKey] = set()
+
+    def put(self, key: CacheKey, value: Any) -> None:
+        self._store(key, time.time(), value)
+        self._warm.discard(key)
+
+    def restore(self, key: CacheKey, stored_at: float, value: Any) -> None:
+        if key in self._data:
+            return  # a live response beat the snapshot loader
+        self._store(key, stored_at, value)
+        self._warm.add(key)
+
+    def _store(self, key: CacheKey, stored_at: float, value: Any) -> None:
+        self._data[key] = (stored_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            old, _ = self._data.popitem(last=False)
+            self._warm.discard(old)
+
+    def discard(self, key: CacheKey) -> None:
+        self._data.pop(key, None)
+        self._warm.discard(key)
+
+    def get(self, key: CacheKey) -> tuple[float, Any] | None:
+        hit = self._data.get(key)
+        if hit is None:
+            return None
+        stored_at, value = hit
+        return (time.time() - stored_at, value)
+
+    def get_warm(self, key: CacheKey) -> tuple[float, Any] | None:
+        if key not in self._warm:
+            return None
+        hit = self.get(key)
+        if hit is None or hit[0] > settings.snapshot_max_age_seconds:
+            self._warm.discard(key)
+            return None
+        return hit
+
+    def items(self) -> Iterator[tuple[CacheKey, float, Any]]:
+        for key, (stored_at, value) in list(self._data.items()):
+            yield key, stored_at, value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, Any]:
+        return {"entries": len(self._data), "warm": len(self._warm)}
+
+Refresh = Callable[[aiohttp.ClientSession], Awaitable[Any]]
+
+class Revalidator:
+    """Background refresh of warm cache entries at a limited rate.
+
+    Each key is refreshed at most once at a time, no more than
+    ``concurrency`` refreshes run together and new ones start at most
+    ``rate`` per second, so a restart with a full snapshot does not hit
+    every panel at once. Jobs run on the bot's shared session (bound at
+    startup) because the session of the command that found the entry may
+    already be closed. A refresh that fails because the panel is unhealthy
+    leaves the entry warm (the next read schedules it again); any other
+    failure (401/403/404: key revoked, server deleted) drops the entry.
+    """
+
+    def __init__(self, cache: ResponseCache, rate: float, concurrency: int):
+        self.cache = cache
+        self.interval = 1.0 / max(0.1, rate)
+        self.session: aiohttp.ClientSession | None = None
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._pending: set[CacheKey] = set()
+        self._next_start = 0.0
+        self.refreshed = 0
+        self.failed = 0
+
+    def bind(self, session: aiohttp.ClientSession) -> None:
+        self.session = session
+
+    def schedule(self, key: CacheKey, refresh: Refresh) -> bool:
+        """Queue a refresh of ``key``; False if nothing can run it (the caller should fetch live)."""
+        if self.session is None or self.session.closed:
+            return False
+        if key not in self._pending:
+            self._pending.add(key)
+            asyncio.get_running_loop().create_task(self._run(key, refresh))
+        return True
+
+    async def _run(self, key: CacheKey, refresh: Refresh) -> None:
+        try:
+            async with self._slots:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self.interval
+                if start > now:
+                    await asyncio.sleep(start - now)
+                if self.session is None or self.session.closed:
+                    return
+                value = await refresh(self.session)
+            self.cache.put(key, value)
+            self.refreshed += 1
+        except Exception as e:
+            self.failed += 1
+            if not is_panel_failure(e):
+                self.cache.discard(key)
+            log.debug("revalidate_failed", host=key[0], path=key[2], error=str(e)[:200])
+        finally:
+            self._pending.discard(key)
+
+    def stats(self) -> dict[str, Any]:
+        return {"pending": len(self._pending), "refreshed": self.refreshed, "failed": self.failed}
+
+panel_cache = ResponseCache(settings.panel_cache_entries)
+revalidator = Revalidator(panel_cache, settings.revalidate_per_second, settings.revalidate_concurrency)
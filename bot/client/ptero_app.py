@@ -1,8 +1,17 @@
 from __future__ import annotations
+import asyncio
 import aiohttp
 from typing import Any
 from yarl import URL
 from ..config import settings
+from ..core.executor import loads_json
+from ..crypto import fingerprint
+from .breaker import is_panel_failure
+from .cache import mark_stale, panel_cache, revalidator
+from .records import AllocationRecord, NodeRecord, ServerColumns
+
+NODES_PATH = "/api/application/nodes"
+SERVERS_PATH = "/api/application/servers"
 
 class PteroApp:
     def __init__(self, session: aiohttp.ClientSession):
@@ -18,16 +27,83 @@ class PteroApp:
             "Content-Type": "application/json",
         }
 
+    async def _page(self, path: str, params: dict[str, Any]) -> tuple[list[dict[str, Any]], int]:
+        url = self.base.with_path(path)
+        async with self.session.get(url, headers=self._headers(), params=params) as r:
+            r.raise_for_status()
+            data = await loads_json(await r.read())
+            pag = ((data.get("meta") or {}).get("pagination") or {})
+            return [d["attributes"] for d in data.get("data", [])], int(pag.get("total_pages") or 1)
+
+    async def list_nodes_page(self, page: int, per_page: int, name: str | None = None) -> tuple[list[dict[str, Any]], int]:
+        params: dict[str, Any] = {"page": page, "per_page": per_page}
+        if name:
+            params["filter[name]"] = name
+        return await self._page("/api/application/nodes", params)
+
+    async def list_allocations_page(self, node_id: int, page: int, per_page: int) -> tuple[list[AllocationRecord], int]:
+        items, pages = await self._page(f"/api/application/nodes/{node_id}/allocations", {"page": page, "per_page": per_page})
+        return [AllocationRecord.from_api(a) for a in items], pages
+
     async def list_nodes(self) -> list[dict[str, Any]]:
         url = self.base.with_path("/api/application/nodes")
         async with self.session.get(url, headers=self._headers()) as r:
             r.raise_for_status()
-            data = await r.json()
+            data = await loads_json(await r.read())
             return [d["attributes"] for d in data.get("data", [])]
 
-    async def list_allocations(self, node_id: int) -> list[dict[str, Any]]:
+    async def list_allocations(self, node_id: int) -> list[AllocationRecord]:
         url = self.base.with_path(f"/api/application/nodes/{node_id}/allocations")
         async with self.session.get(url, headers=self._headers()) as r:
             r.raise_for_status()
-            data = await r.json()
-            return [d["attributes"] for d in data.get("data", [])]
+            data = await loads_json(await r.read())
+            return [AllocationRecord.from_api(d["attributes"]) for d in data.get("data", [])]
+
+    async def _all_nodes(self) -> list[NodeRecord]:
+        out: list[NodeRecord] = []
+        page, pages = 1, 1
+        while page <= pages:
+            items, pages = await self.list_nodes_page(page, 100)
+            out.extend(NodeRecord.from_api(a) for a in items)
+            page += 1
+        return out
+
+    async def node_records(self) -> list[NodeRecord]:
+        """Every node as a compact record, shared through the panel cache (and the
+        warm-restart snapshot); the last good inventory is served if the panel is down."""
+        key = (self.base.host or "", fingerprint(settings.app_api_key or ""), NODES_PATH)
+        warm = panel_cache.get_warm(key)
+        if warm is not None and revalidator.schedule(key, lambda sess: PteroApp(sess)._all_nodes()):
+            return mark_stale(warm[1], warm[0], warm=True)
+        try:
+            nodes = await self._all_nodes()
+        except Exception as e:
+            hit = panel_cache.get(key) if is_panel_failure(e) else None
+            if hit is None:
+                raise
+            return mark_stale(hit[1], hit[0])
+        panel_cache.put(key, nodes)
+        return nodes
+
+    async def server_columns(self, per_page: int = 100, concurrency: int | None = None) -> ServerColumns:
+        """Every server on the panel, paged in parallel after the first page and
+        folded straight into columns so no page of dicts outlives its parse."""
+        cols = ServerColumns()
+        items, pages = await self._page(SERVERS_PATH, {"page": 1, "per_page": per_page})
+        cols.extend(items)
+        slots = asyncio.Semaphore(max(1, concurrency or settings.capacity_page_concurrency))
+        async def one(page: int) -> None:
+            async with slots:
+                items, _ = await self._page(SERVERS_PATH, {"page": page, "per_page": per_page})
+            cols.extend(items)
+        await asyncio.gather(*(one(p) for p in range(2, pages + 1)))
+        return cols
+
+    async def location_names(self) -> dict[int, str]:
+        out: dict[int, str] = {}
+        page, pages = 1, 1
+        while page <= pages:
+            items, pages = await self._page("/api/application/locations", {"page": page, "per_page": 100})
+            out.update((int(a.get("id") or 0), str(a.get("short") or a.get("long") or "?")) for a in items)
+            page += 1
+        return out
@@ -1,13 +1,29 @@
 from __future__ import annotations
 import aiohttp
+from collections.abc import Awaitable, Callable
 from typing import Any
 from yarl import URL
+from ..config import settings
+from ..core.executor import loads_json
+from ..crypto import fingerprint
+from .breaker import breakers, is_panel_failure
+from .cache import is_warm, mark_stale, panel_cache, revalidator, stale_age
+from .records import BackupRecord, ResourceRecord, ServerRecord
+
+def total_pages(data: dict[str, Any]) -> int:
+    pag = ((data.get("meta") or {}).get("pagination") or {})
+    return int(pag.get("total_pages") or 1)
+
+Fetch = Callable[["PteroClient"], Awaitable[Any]]
 
 class PteroClient:
     def __init__(self, session: aiohttp.ClientSession, panel_url: str, client_api_key: str):
         self.session = session
         self.base = URL(panel_url)
         self.token = client_api_key
+        self.breaker = breakers.get(self.base)
+        self._fp = fingerprint(client_api_key)
+        self._timeout = aiohttp.ClientTimeout(total=settings.panel_timeout_seconds)
 
     def _headers(self) -> dict[str, str]:
         return {
@@ -16,64 +32,132 @@ class PteroClient:
             "Content-Type": "application/json",
         }
 
-    async def list_servers(self) -> list[dict[str, Any]]:
-        url = self.base.with_path("/api/client")
-        params = {"per_page": 50}
-        out: list[dict[str, Any]] = []
-        while True:
-            async with self.session.get(url, headers=self._headers(), params=params) as r:
+    async def _request(self, method: str, url: URL, **kw) -> Any:
+        async with self.breaker.guard():
+            async with self.session.request(method, url, headers=self._headers(), timeout=self._timeout, **kw) as r:
                 r.raise_for_status()
-                data = await r.json()
-                out.extend([d["attributes"] for d in data.get("data", [])])
+                if r.status == 204:
+                    return {}
+                body = await r.read()
+                return await loads_json(body) if body else {}
+
+    async def _with_stale(self, path: str, fetch: Fetch, allow_warm: bool = False) -> Any:
+        """Run ``fetch``; if the panel is down, fall back to the last good response (marked stale).
+
+        With ``allow_warm`` (interactive, display-only reads) an entry restored
+        from a warm-restart snapshot is served straight away, marked stale,
+        while a rate-limited background refresh replaces it. Everything else
+        (workers, lookups ahead of a mutation) always fetches live.
+        """
+        key = (self.breaker.host, self._fp, path)
+        warm = panel_cache.get_warm(key) if allow_warm else None
+        if warm is not None:
+            base, token = str(self.base), self.token
+            if revalidator.schedule(key, lambda sess: fetch(PteroClient(sess, base, token))):
+                age, value = warm
+                return mark_stale(value, age, warm=True)
+        try:
+            value = await fetch(self)
+        except Exception as e:
+            hit = panel_cache.get(key) if is_panel_failure(e) else None
+            if hit is None:
+                raise
+            age, value = hit
+            return mark_stale(value, age)
+        panel_cache.put(key, value)
+        return value
+
+    async def list_servers(self, allow_warm: bool = False) -> list[ServerRecord]:
+        """Full server directory as compact records; the fallback cache keeps the records, not the JSON."""
+        async def fetch(c: PteroClient) -> list[ServerRecord]:
+            url = c.base.with_path("/api/client")
+            params: dict[str, Any] | None = {"per_page": 50}
+            out: list[ServerRecord] = []
+            while True:
+                data = await c._request("GET", url, params=params)
+                out.extend(ServerRecord.from_api(d["attributes"]) for d in data.get("data", []))
                 links = data.get("links", {}) or {}
                 next_url = links.get("next")
                 if not next_url:
                     break
                 url = URL(next_url)
                 params = None
-        return out
+            return out
+        return await self._with_stale("/api/client", fetch, allow_warm)
 
-    async def server_details(self, identifier: str) -> dict[str, Any]:
-        url = self.base.with_path(f"/api/client/servers/{identifier}")
-        async with self.session.get(url, headers=self._headers()) as r:
-            r.raise_for_status()
-            data = await r.json()
-            return data["attributes"]
+    async def _page(self, path: str, params: dict[str, Any], allow_warm: bool = False) -> tuple[list[dict[str, Any]], int]:
+        key = path + "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        data = await self._with_stale(key, lambda c: c._request("GET", c.base.with_path(path), params=params), allow_warm)
+        items = [d["attributes"] for d in data.get("data", [])]
+        age = stale_age(data)
+        return (mark_stale(items, age, is_warm(data)) if age is not None else items, total_pages(data))
 
-    async def server_resources(self, identifier: str) -> dict[str, Any]:
-        url = self.base.with_path(f"/api/client/servers/{identifier}/resources")
-        async with self.session.get(url, headers=self._headers()) as r:
-            r.raise_for_status()
-            data = await r.json()
-            return data["attributes"]
+    async def list_servers_page(self, page: int, per_page: int, search: str | None = None,
+                                allow_warm: bool = False) -> tuple[list[dict[str, Any]], int]:
+        params: dict[str, Any] = {"page": page, "per_page": per_page}
+        if search:
+            params["filter[*]"] = search
+        return await self._page("/api/client", params, allow_warm)
+
+    async def _attributes(self, path: str) -> dict[str, Any]:
+        return (await self._request("GET", self.base.with_path(path)))["attributes"]
+
+    async def server_details(self, identifier: str, allow_warm: bool = False) -> dict[str, Any]:
+        path = f"/api/client/servers/{identifier}"
+        return await self._with_stale(path, lambda c: c._attributes(path), allow_warm)
+
+    async def server_resources(self, identifier: str, allow_warm: bool = False) -> ResourceRecord:
+        path = f"/api/client/servers/{identifier}/resources"
+        async def fetch(c: PteroClient) -> ResourceRecord:
+            return ResourceRecord.from_api(await c._attributes(path))
+        return await self._with_stale(path, fetch, allow_warm)
 
     async def websocket_info(self, identifier: str) -> dict[str, Any]:
         url = self.base.with_path(f"/api/client/servers/{identifier}/websocket")
-        async with self.session.get(url, headers=self._headers()) as r:
-            r.raise_for_status()
-            return await r.json()
+        return await self._request("GET", url)
 
-    async def list_backups(self, identifier: str) -> list[dict[str, Any]]:
-        url = self.base.with_path(f"/api/client/servers/{identifier}/backups")
-        async with self.session.get(url, headers=self._headers()) as r:
-            r.raise_for_status()
-            data = await r.json()
-            return [d["attributes"] for d in data.get("data", [])]
+    async def list_backups(self, identifier: str, allow_warm: bool = False) -> list[BackupRecord]:
+        path = f"/api/client/servers/{identifier}/backups"
+        async def fetch(c: PteroClient) -> list[BackupRecord]:
+            data = await c._request("GET", c.base.with_path(path))
+            return [BackupRecord.from_api(d["attributes"]) for d in data.get("data", [])]
+        return await self._with_stale(path, fetch, allow_warm)
+
+    async def list_backups_page(self, identifier: str, page: int, per_page: int,
+                                allow_warm: bool = False) -> tuple[list[dict[str, Any]], int]:
+        return await self._page(f"/api/client/servers/{identifier}/backups", {"page": page, "per_page": per_page},
+                                allow_warm)
+
+    async def send_power(self, identifier: str, signal: str) -> None:
+        url = self.base.with_path(f"/api/client/servers/{identifier}/power")
+        await self._request("POST", url, json={"signal": signal})
+
+    async def send_command(self, identifier: str, command: str) -> None:
+        url = self.base.with_path(f"/api/client/servers/{identifier}/command")
+        await self._request("POST", url, json={"command": command})
 
     async def create_backup(self, identifier: str, name: str | None = None) -> dict[str, Any]:
         url = self.base.with_path(f"/api/client/servers/{identifier}/backups")
         payload = {"name": name} if name else {}
-        async with self.session.post(url, headers=self._headers(), json=payload) as r:
-            r.raise_for_status()
-            return (await r.json()).get("attributes", {})
+        return (await self._request("POST", url, json=payload)).get("attributes", {})
+
+    async def get_backup(self, identifier: str, backup_uuid: str) -> dict[str, Any]:
+        url = self.base.with_path(f"/api/client/servers/{identifier}/backups/{backup_uuid}")
+        return (await self._request("GET", url)).get("attributes", {})
+
+    async def delete_backup(self, identifier: str, backup_uuid: str) -> None:
+        url = self.base.with_path(f"/api/client/servers/{identifier}/backups/{backup_uuid}")
+        await self._request("DELETE", url)
 
     async def get_download_url(self, identifier: str, file_path: str) -> str | None:
         url = self.base.with_path(f"/api/client/servers/{identifier}/files/download")
-        params = {"file": file_path}
-        async with self.session.get(url, headers=self._headers(), params=params) as r:
-            r.raise_for_status()
-            data = await r.json()
-            return (data.get("data", {}) or {}).get("url") or (data.get("attributes", {}) or {}).get("url") or data.get("url")
+        data = await self._request("GET", url, params={"file": file_path})
+        return (data.get("data", {}) or {}).get("url") or (data.get("attributes", {}) or {}).get("url") or data.get("url")
+
+    async def get_upload_url(self, identifier: str) -> str:
+        url = self.base.with_path(f"/api/client/servers/{identifier}/files/upload")
+        data = await self._request("GET", url)
+        return (data.get("attributes", {}) or {}).get("url") or data.get("url")
 
     async def download_file_bytes(self, download_url: str, max_bytes: int = 8*1024*1024) -> bytes | None:
         async with self.session.get(download_url) as r:
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import sys
+from array import array
+from dataclasses import dataclass
+from collections.abc import Iterable
+from typing import Any
+
+# Compact, typed views of panel payloads. Only the fields the bot reads are
+# kept; nested JSON (feature_limits, relationships, sftp_details, ...) is
+# dropped at parse time, and low-cardinality strings are interned so that
+# thousands of records share one copy of each node name / state.
+
+_intern = sys.intern
+
+def _istr(v: Any) -> str | None:
+    return _intern(str(v)) if v is not None else None
+
+@dataclass(slots=True)
+class ServerRecord:
+    uuid: str
+    identifier: str
+    name: str
+    node: str | None
+    status: str | None
+    memory_mib: int
+    disk_mib: int
+    cpu_pct: int
+    is_suspended: bool
+
+    @classmethod
+    def from_api(cls, a: dict[str, Any]) -> ServerRecord:
+        limits = a.get("limits") or {}
+        return cls(
+            str(a.get("uuid") or ""),
+            str(a.get("identifier") or ""),
+            str(a.get("name") or "(unknown)"),
+            _istr(a.get("node")),
+            _istr(a.get("status")),
+            int(limits.get("memory") or 0),
+            int(limits.get("disk") or 0),
+            int(limits.get("cpu") or 0),
+            bool(a.get("is_suspended")),
+        )
+
+    def matches(self, needle: str) -> bool:
+        return needle.lower() in self.name.lower() or self.uuid.startswith(needle)
+
+@dataclass(slots=True)
+class ResourceRecord:
+    state: str
+    is_suspended: bool
+    cpu: float            # percent of one core
+    memory_bytes: int
+    disk_bytes: int
+    rx_bytes: int
+    tx_bytes: int
+    uptime_ms: int
+    # set on copies served from the cache (see client.cache.mark_stale), never on live values
+    stale_age: float | None = None
+    warm: bool = False
+
+    @classmethod
+    def from_api(cls, a: dict[str, Any]) -> ResourceRecord:
+        r = a.get("resources") or {}
+        return cls(
+            _intern(str(a.get("current_state") or a.get("state") or "unknown")),
+            bool(a.get("is_suspended")),
+            float(r.get("cpu_absolute") or 0.0),
+            int(r.get("memory_bytes") or 0),
+            int(r.get("disk_bytes") or 0),
+            # older Wings report rx_bytes/tx_bytes without the network_ prefix
+            int(r.get("network_rx_bytes") or r.get("rx_bytes") or 0),
+            int(r.get("network_tx_bytes") or r.get("tx_bytes") or 0),
+            int(r.get("uptime") or a.get("uptime") or 0),
+        )
+
+@dataclass(slots=True)
+class BackupRecord:
+    uuid: str
+    name: str
+    bytes: int
+    is_successful: bool
+    is_locked: bool
+    created_at: str | None
+    completed_at: str | None
+
+    @classmethod
+    def from_api(cls, a: dict[str, Any]) -> BackupRecord:
+        return cls(
+            str(a.get("uuid") or ""),
+            str(a.get("name") or ""),
+            int(a.get("bytes") or 0),
+            bool(a.get("is_successful", True)),
+            bool(a.get("is_locked")),
+            a.get("created_at"),
+            a.get("completed_at"),
+        )
+
+@dataclass(slots=True)
+class NodeRecord:
+    id: int
+    name: str
+    fqdn: str
+    location_id: int
+    memory_mib: int
+    memory_overallocate: int
+    disk_mib: int
+    disk_overallocate: int
+    maintenance: bool
+
+    @classmethod
+    def from_api(cls, a: dict[str, Any]) -> NodeRecord:
+        return cls(
+            int(a.get("id") or 0),
+            _intern(str(a.get("name") or "?")),
+            _intern(str(a.get("fqdn") or "")),
+            int(a.get("location_id") or 0),
+            int(a.get("memory") or 0),
+            int(a.get("memory_overallocate") or 0),
+            int(a.get("disk") or 0),
+            int(a.get("disk_overallocate") or 0),
+            bool(a.get("maintenance_mode")),
+        )
+
+@dataclass(slots=True)
+class AllocationRecord:
+    id: int
+    ip: str
+    port: int
+    alias: str | None
+    assigned: bool
+
+    @classmethod
+    def from_api(cls, a: dict[str, Any]) -> AllocationRecord:
+        return cls(
+            int(a.get("id") or 0),
+            _intern(str(a.get("ip") or "")),
+            int(a.get("port") or 0),
+            _istr(a.get("ip_alias") or a.get("alias")),
+            bool(a.get("assigned")),
+        )
+
+    @property
+    def address(self) -> str:
+        return f"{self.alias or self.ip}:{self.port}"
+
+class ServerColumns:
+    """Application API servers as parallel typed arrays, one row per server.
+
+    Only the columns the capacity report needs are kept, so tens of
+    thousands of servers cost 32 bytes each rather than a dict apiece.
+    """
+
+    __slots__ = ("cpu", "disk", "memory", "node_id")
+
+    def __init__(self):
+        self.node_id = array("q")
+        self.memory = array("q")  # MiB, 0 = unlimited
+        self.disk = array("q")    # MiB, 0 = unlimited
+        self.cpu = array("q")     # percent of one core, 0 = unlimited
+
+    def extend(self, servers: Iterable[dict[str, Any]]) -> None:
+        for a in servers:
+            limits = a.get("limits") or {}
+            self.node_id.append(int(a.get("node") or 0))
+            self.memory.append(int(limits.get("memory") or 0))
+            self.disk.append(int(limits.get("disk") or 0))
+            self.cpu.append(int(limits.get("cpu") or 0))
+
+    def __len__(self) -> int:
+        return len(self.node_id)
@@ -2,18 +2,35 @@ from __future__ import annotations
 import discord, traceback
 from discord import app_commands
 from discord.ext import commands
-from sqlalchemy import select
+from ..client.breaker import breakers
 from ..core.permissions import has_admin_role, SERVER_UUID_RE
 from ..db import SessionLocal
-from ..db.models import ServerAlias
+from ..services.aliases import aliases, delete_alias, set_alias
+from ..services.audit import audit
+from ..services.guild_config import guild_configs
+
+SCOPE_CHOICES = [
+    app_commands.Choice(name="This server", value="guild"),
+    app_commands.Choice(name="Global", value="global"),
+]
+
+def _scope_guild_id(inter: discord.Interaction, scope: str) -> int | None:
+    return inter.guild_id if scope == "guild" else None
+
+async def alias_autocomplete(inter: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    return [
+        app_commands.Choice(name=f"{e.alias} ({'global' if e.guild_id is None else 'server'})", value=e.alias)
+        for e in aliases.suggest(inter.guild_id, current)
+    ]
 
 class AdminCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
     @app_commands.command(name="alias_set", description="Set an alias for a server UUID (optionally bind panel).")
-    @app_commands.describe(uuid="Full server UUID", alias="Alias to assign", panel_url="Optional panel URL to speed up lookups")
-    async def alias_set(self, inter: discord.Interaction, uuid: str, alias: str, panel_url: str | None = None):
+    @app_commands.describe(uuid="Full server UUID", alias="Alias to assign", panel_url="Optional panel URL to speed up lookups", scope="This server only (default) or global")
+    @app_commands.choices(scope=SCOPE_CHOICES)
+    async def alias_set(self, inter: discord.Interaction, uuid: str, alias: str, panel_url: str | None = None, scope: str = "guild"):
         if not has_admin_role(inter):
             await inter.response.send_message("You don't have permission.", ephemeral=True)
             return
@@ -23,21 +40,133 @@ class AdminCog(commands.Cog):
         await inter.response.defer(ephemeral=True)
         try:
             async with SessionLocal() as s:
-                row = await s.execute(select(ServerAlias).where(ServerAlias.alias == alias))
-                existing = row.scalar_one_or_none()
-                if existing:
-                    existing.uuid = uuid
-                    existing.panel_url = panel_url
-                    await s.commit()
-                else:
-                    s.add(ServerAlias(alias=alias, uuid=uuid, panel_url=panel_url))
-                    await s.commit()
-            await inter.followup.send(f"Alias `{alias}` → `{uuid}` saved. Panel: `{panel_url or 'unspecified'}`", ephemeral=True)
+                entry = await set_alias(s, _scope_guild_id(inter, scope), alias, uuid, panel_url)
+            where = "global" if entry.guild_id is None else "this server"
+            audit.emit("alias_set", user_id=inter.user.id, guild_id=inter.guild_id, target=entry.alias, detail=f"{uuid} ({where})")
+            await inter.followup.send(f"Alias `{entry.alias}` → `{uuid}` saved ({where}). Panel: `{panel_url or 'unspecified'}`", ephemeral=True)
         except Exception as e:
             msg = str(e)
             if len(msg) > 300:
                 msg = msg[:300] + "…"
             await inter.followup.send(f"Alias save failed: `{msg}`", ephemeral=True)
 
+    @app_commands.command(name="alias_list", description="List aliases visible in this server.")
+    @app_commands.describe(prefix="Only aliases starting with this")
+    async def alias_list(self, inter: discord.Interaction, prefix: str | None = None):
+        entries = aliases.suggest(inter.guild_id, prefix, limit=50) if prefix else aliases.entries(inter.guild_id)
+        if not entries:
+            await inter.response.send_message("No aliases.", ephemeral=True)
+            return
+        lines = [
+            f"• `{e.alias}` → `{e.uuid}`{' — _' + e.panel_url + '_' if e.panel_url else ''}{' (global)' if e.guild_id is None else ''}"
+            for e in entries[:50]
+        ]
+        await inter.response.send_message("\n".join(lines), ephemeral=True)
+
+    @app_commands.command(name="alias_delete", description="Delete an alias (admin-only).")
+    @app_commands.describe(alias="Alias to delete", scope="This server (default) or global")
+    @app_commands.choices(scope=SCOPE_CHOICES)
+    @app_commands.autocomplete(alias=alias_autocomplete)
+    async def alias_delete(self, inter: discord.Interaction, alias: str, scope: str = "guild"):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=True)
+        async with SessionLocal() as s:
+            removed = await delete_alias(s, _scope_guild_id(inter, scope), alias)
+        if removed:
+            audit.emit("alias_delete", user_id=inter.user.id, guild_id=inter.guild_id, target=alias, detail=scope)
+            await inter.followup.send(f"Alias `{alias}` deleted.", ephemeral=True)
+        else:
+            await inter.followup.send("No such alias in that scope.", ephemeral=True)
+
+    @app_commands.command(name="config_show", description="Show this server's bot configuration (admin-only).")
+    async def config_show(self, inter: discord.Interaction):
+        if not has_admin_role(inter) or not inter.guild:
+            await inter.response.send_message("You don't have permission.", ephemeral=True)
+            return
+        cfg = guild_configs.get(inter.guild.id)
+        def src(name: str) -> str:
+            return "" if name in cfg.overrides else " _(default)_"
+        roles = ", ".join(f"<@&{r}>" for r in sorted(cfg.admin_role_ids)) or "—"
+        lines = [
+            f"• Admin roles: {roles}{src('admin_role_ids')}",
+            f"• Log channel: {f'<#{cfg.log_channel_id}>' if cfg.log_channel_id else '—'}{src('log_channel_id')}",
+            f"• Alert channel: {f'<#{cfg.alert_channel_id}>' if cfg.alert_channel_id else '—'}{src('alert_channel_id')}",
+        ]
+        await inter.response.send_message("\n".join(lines), ephemeral=True)
+
+    @app_commands.command(name="config_admin_role", description="Add or remove a bot admin role for this server (admin-only).")
+    @app_commands.describe(action="Add or remove", role="Role")
+    @app_commands.choices(action=[
+        app_commands.Choice(name="Add", value="add"),
+        app_commands.Choice(name="Remove", value="remove"),
+    ])
+    async def config_admin_role(self, inter: discord.Interaction, action: str, role: discord.Role):
+        if not has_admin_role(inter) or not inter.guild:
+            await inter.response.send_message("You don't have permission.", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=True)
+        cfg = guild_configs.get(inter.guild.id)
+        roles = set(cfg.admin_role_ids) if "admin_role_ids" in cfg.overrides else set()
+        if action == "add":
+            roles.add(role.id)
+        else:
+            roles.discard(role.id)
+        async with SessionLocal() as s:
+            cfg = await guild_configs.update(s, inter.guild.id, admin_role_ids=roles)
+        shown = ", ".join(f"<@&{r}>" for r in sorted(cfg.admin_role_ids)) or "—"
+        audit.emit("config_admin_role", user_id=inter.user.id, guild_id=inter.guild.id, target=str(role.id), detail=action)
+        await inter.followup.send(f"Admin roles: {shown}", ephemeral=True)
+
+    @app_commands.command(name="config_channel", description="Set (or clear) the log/alert channel for this server (admin-only).")
+    @app_commands.describe(kind="Which channel", channel="Channel (omit to clear)")
+    @app_commands.choices(kind=[
+        app_commands.Choice(name="Log", value="log"),
+        app_commands.Choice(name="Alert", value="alert"),
+    ])
+    async def config_channel(self, inter: discord.Interaction, kind: str, channel: discord.TextChannel | None = None):
+        if not has_admin_role(inter) or not inter.guild:
+            await inter.response.send_message("You don't have permission.", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=True)
+        value = channel.id if channel else None
+        async with SessionLocal() as s:
+            if kind == "log":
+                await guild_configs.update(s, inter.guild.id, log_channel_id=value)
+            else:
+                await guild_configs.update(s, inter.guild.id, alert_channel_id=value)
+        audit.emit("config_channel", user_id=inter.user.id, guild_id=inter.guild.id, target=kind, detail=str(value or "cleared"))
+        await inter.followup.send(f"{kind.title()} channel {'set to ' + channel.mention if channel else 'cleared'}.", ephemeral=True)
+
+    @app_commands.command(name="panel_breakers", description="Show circuit breaker state per panel host (admin-only).")
+    async def panel_breakers(self, inter: discord.Interaction):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True)
+            return
+        snap = breakers.snapshot()
+        if not snap:
+            await inter.response.send_message("No panels contacted yet.", ephemeral=True)
+            return
+        icons = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}
+        lines = []
+        for b in snap:
+            line = f"{icons.get(b['state'], '•')} `{b['host']}` — {b['state']} — errors {b['error_rate']:.0%} of {b['calls']} — trips {b['trips']}"
+            if b["state"] == "open":
+                line += f" — retry in {b['retry_in']:.0f}s"
+            if b["last_error"]:
+                line += f"\n  last error: `{b['last_error']}`"
+            lines.append(line)
+        await inter.response.send_message("\n".join(lines)[:1900], ephemeral=True)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        guild_configs.evict(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        async with SessionLocal() as s:
+            await guild_configs.refresh(s, guild.id)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(AdminCog(bot))
@@ -4,8 +4,77 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from ..config import settings
+from ..core.executor import offload
 from ..core.permissions import has_admin_role
+from ..client.cache import stale_note
 from ..client.ptero_app import PteroApp
+from ..client.records import AllocationRecord
+from ..services.capacity import CapacityReport, GroupTotals, NodeUsage, capacity_report
+from ..utils.paginator import Paginator, RemotePageSource
+
+CAPACITY_TOP = 5
+CAPACITY_OFFLOAD_ROWS = 20_000
+
+
+def _render_nodes(nodes: list[dict]) -> str:
+    return "\n".join(f"• **{n.get('name','node')}** (id={n.get('id','?')}) — {n.get('fqdn','')}" for n in nodes)
+
+
+def _render_allocs(allocs: list[AllocationRecord]) -> str:
+    return "\n".join(f"{a.address} — {'assigned' if a.assigned else 'free'}" for a in allocs)
+
+
+def _alloc_match(a: AllocationRecord, text: str) -> bool:
+    t = text.lower()
+    if t in ("free", "assigned"):
+        return a.assigned == (t == "assigned")
+    return t in f"{a.alias or ''} {a.ip}:{a.port}".lower()
+
+
+def _pct(ratio: float | None) -> str:
+    return f"{ratio * 100:.0f}%" if ratio is not None else "n/a"
+
+
+def _gib(mib: int | None) -> str:
+    if mib is None:
+        return "∞"
+    return f"{mib / 1024:.1f} GiB" if abs(mib) < 1024 * 1024 else f"{mib / 1024 / 1024:.1f} TiB"
+
+
+def _group_line(label: str, g: GroupTotals) -> str:
+    return (f"**{label}** — {g.nodes} nodes, {g.used.servers} servers · "
+            f"mem {_pct(g.memory_ratio)} ({_gib(g.used.memory_mib)} / {_gib(g.memory_mib)}) · "
+            f"disk {_pct(g.disk_ratio)} ({_gib(g.used.disk_mib)} / {_gib(g.disk_mib)})")
+
+
+def _node_line(u: NodeUsage) -> str:
+    flag = " 🛠" if u.node and u.node.maintenance else ""
+    return (f"**{u.name}**{flag} — mem {_pct(u.memory_ratio)} · disk {_pct(u.disk_ratio)} · "
+            f"{u.used.servers} servers" + (f" ({u.used.unlimited} unlimited)" if u.used.unlimited else ""))
+
+
+def _render_capacity(report: CapacityReport, locations: dict[int, str], nodes_note: str | None) -> discord.Embed:
+    e = discord.Embed(title="Panel capacity", description=_group_line("Estate", report.estate))
+    loc_lines = [_group_line(locations.get(g.key) or f"location {g.key}", g) for g in report.locations]
+    e.add_field(name="Locations", value="\n".join(loc_lines)[:1024] or "—", inline=False)
+    over = report.most_overcommitted(CAPACITY_TOP)
+    e.add_field(name="Most overcommitted", value="\n".join(_node_line(u) for u in over)[:1024] or "—", inline=False)
+    head = report.most_headroom(CAPACITY_TOP)
+    e.add_field(
+        name="Most headroom (within overallocation limits)",
+        value="\n".join(f"**{u.name}** — {_gib(u.memory_headroom_mib)} mem · {_gib(u.disk_headroom_mib)} disk free"
+                        for u in head)[:1024] or "—",
+        inline=False,
+    )
+    orphans = sum(u.used.servers for u in report.nodes if u.node is None)
+    footer = "Ratios are allocated limits vs physical node size."
+    if orphans:
+        footer += f" {orphans} server(s) on unknown nodes."
+    if nodes_note:
+        footer += f" Node list {nodes_note}."
+    e.set_footer(text=footer)
+    return e
 
 
 class AppAdminCog(commands.Cog):
@@ -25,12 +94,13 @@ class AppAdminCog(commands.Cog):
             return
         await inter.response.defer(ephemeral=True)
         app = self.require_app()
-        nodes = await app.list_nodes()
-        if not nodes:
+        async def fetch(page: int, q: str | None):
+            return await app.list_nodes_page(page, settings.page_size, q)
+        source = RemotePageSource(fetch, _render_nodes, server_filter=True)
+        if not await source.get_page(0) and not source.error:
             await inter.followup.send("No nodes found.", ephemeral=True)
             return
-        lines = [f"• **{n.get('name','node')}** (id={n.get('id','?')}) — {n.get('fqdn','')}" for n in nodes[:25]]
-        await inter.followup.send("\n".join(lines), ephemeral=True)
+        await Paginator(inter.user.id, source, timeout=settings.page_view_timeout).send(inter)
 
     @app_commands.command(name="panel_allocations", description="List allocations for a node (admin-only).")
     @app_commands.describe(node_id="Numeric node id")
@@ -40,15 +110,29 @@ class AppAdminCog(commands.Cog):
             return
         await inter.response.defer(ephemeral=True)
         app = self.require_app()
-        allocs = await app.list_allocations(node_id)
-        if not allocs:
+        async def fetch(page: int, q: str | None):
+            return await app.list_allocations_page(node_id, page, settings.page_size)
+        source = RemotePageSource(fetch, _render_allocs, match=_alloc_match)
+        if not await source.get_page(0) and not source.error:
             await inter.followup.send("No allocations found.", ephemeral=True)
             return
-        lines = [
-            f"{a.get('ip_alias') or a.get('ip')}:{a.get('port')} — {'assigned' if a.get('assigned') else 'free'}"
-            for a in allocs[:25]
-        ]
-        await inter.followup.send("\n".join(lines), ephemeral=True)
+        await Paginator(inter.user.id, source, timeout=settings.page_view_timeout).send(inter)
+
+    @app_commands.command(name="panel_capacity", description="Allocated vs available memory/disk per node and location (admin-only).")
+    async def panel_capacity(self, inter: discord.Interaction):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=True)
+        app = self.require_app()
+        nodes = await app.node_records()
+        cols = await app.server_columns()
+        try:
+            locations = await app.location_names()
+        except Exception:
+            locations = {}
+        report = await offload(capacity_report, cols, nodes, size=len(cols), threshold=CAPACITY_OFFLOAD_ROWS)
+        await inter.followup.send(embed=_render_capacity(report, locations, stale_note(nodes)), ephemeral=True)
 
 
 async def setup(bot: commands.Bot):
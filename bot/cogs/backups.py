@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import aiohttp
+import discord
+from discord import app_commands
+from discord.ext import commands
+from sqlalchemy import or_, select
+
+from ..client.ptero_rest import PteroClient
+from ..core.permissions import has_admin_role
+from ..db import SessionLocal
+from ..db.models import BackupJob, BackupSchedule
+from ..services.audit import audit
+from ..services.backups import BackupOrchestrator, utcnow
+from ..services.cron import next_fire, parse_cron
+from .server import get_user_token_for_panel, resolve_identifier_and_panel, server_autocomplete
+
+
+def _guild_scope(model, inter: discord.Interaction):
+    # rows from before guild scoping carry no guild; only their owner still sees them
+    return or_(model.guild_id == inter.guild_id,
+               model.guild_id.is_(None) & (model.owner_user_id == inter.user.id))
+
+
+class BackupsCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.orchestrator = BackupOrchestrator()
+
+    async def cog_load(self) -> None:
+        await self.orchestrator.start()
+
+    async def cog_unload(self) -> None:
+        await self.orchestrator.stop()
+
+    async def _resolve(self, inter: discord.Interaction, server: str) -> tuple[str, str, str | None, str] | None:
+        uuid, panel = await resolve_identifier_and_panel(inter.user.id, server, inter.guild_id)
+        if not uuid or not panel:
+            await inter.followup.send("Server not found for your linked panels.", ephemeral=True)
+            return None
+        tok = await get_user_token_for_panel(inter.user.id, panel)
+        if not tok:
+            await inter.followup.send("No key for that panel.", ephemeral=True)
+            return None
+        async with aiohttp.ClientSession() as sess:
+            details = await PteroClient(sess, panel, tok).server_details(uuid)
+        return (uuid, panel, details.get("node"), str(details.get("name") or server)[:64])
+
+    @app_commands.command(name="backup_now", description="Queue a backup for a server (admin-only).")
+    @app_commands.describe(server="Alias/UUID")
+    @app_commands.autocomplete(server=server_autocomplete)
+    async def backup_now(self, inter: discord.Interaction, server: str):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True); return
+        await inter.response.defer(ephemeral=True)
+        found = await self._resolve(inter, server)
+        if not found:
+            return
+        uuid, panel, node, label = found
+        job = await self.orchestrator.enqueue(owner_user_id=inter.user.id, guild_id=inter.guild_id, uuid=uuid,
+                                              panel_url=panel, node=node, label=label)
+        if job is None:
+            await inter.followup.send("A backup for that server is already queued or running.", ephemeral=True); return
+        audit.emit("backup_now", user_id=inter.user.id, guild_id=inter.guild_id, target=label, detail=f"job #{job.id}")
+        await inter.followup.send(f"Backup job #{job.id} queued for **{label}** (node `{node or '?'}`).", ephemeral=True)
+
+    @app_commands.command(name="backup_schedule", description="Schedule recurring backups with a cron expression (admin-only).")
+    @app_commands.describe(server="Alias/UUID", cron="Cron (min hour day month weekday) or @daily/@weekly", retention="Scheduled backups to keep (default 5)")
+    @app_commands.autocomplete(server=server_autocomplete)
+    async def backup_schedule(self, inter: discord.Interaction, server: str, cron: str, retention: int = 5):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True); return
+        try:
+            # next_fire too: "0 0 31 2 *" parses but never fires
+            nxt = next_fire(parse_cron(cron), utcnow())
+        except ValueError as e:
+            await inter.response.send_message(f"Invalid cron: {e}", ephemeral=True); return
+        await inter.response.defer(ephemeral=True)
+        found = await self._resolve(inter, server)
+        if not found:
+            return
+        uuid, panel, node, label = found
+        async with SessionLocal() as s:
+            sch = BackupSchedule(owner_user_id=inter.user.id, guild_id=inter.guild_id, uuid=uuid, panel_url=panel,
+                                 node=node, label=label, cron=cron.strip(), retention=max(0, retention), enabled=True, next_run_at=nxt)
+            s.add(sch)
+            await s.commit()
+        audit.emit("backup_schedule", user_id=inter.user.id, guild_id=inter.guild_id, target=label, detail=f"#{sch.id} {sch.cron}")
+        await inter.followup.send(f"Schedule #{sch.id} for **{label}**: `{sch.cron}`, keep {sch.retention}. Next run {nxt:%Y-%m-%d %H:%M} UTC.", ephemeral=True)
+
+    @app_commands.command(name="backup_schedules", description="List backup schedules (admin-only).")
+    async def backup_schedules(self, inter: discord.Interaction):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True); return
+        async with SessionLocal() as s:
+            rows = (await s.execute(
+                select(BackupSchedule).where(_guild_scope(BackupSchedule, inter)).order_by(BackupSchedule.id)
+            )).scalars().all()
+        if not rows:
+            await inter.response.send_message("No backup schedules.", ephemeral=True); return
+        lines = [
+            f"• #{r.id} **{r.label}** `{r.cron}` keep {r.retention} — next {f'{r.next_run_at:%Y-%m-%d %H:%M}' if r.next_run_at else '—'}{'' if r.enabled else ' (disabled)'}"
+            for r in rows[:25]
+        ]
+        await inter.response.send_message("\n".join(lines), ephemeral=True)
+
+    @app_commands.command(name="backup_unschedule", description="Delete a backup schedule (admin-only).")
+    @app_commands.describe(schedule_id="Schedule number from /backup_schedules")
+    async def backup_unschedule(self, inter: discord.Interaction, schedule_id: int):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True); return
+        async with SessionLocal() as s:
+            sch = (await s.execute(select(BackupSchedule).where(
+                (BackupSchedule.id == schedule_id) & _guild_scope(BackupSchedule, inter)
+            ))).scalar_one_or_none()
+            if sch:
+                await s.delete(sch)
+                await s.commit()
+        if sch:
+            audit.emit("backup_unschedule", user_id=inter.user.id, guild_id=inter.guild_id, target=sch.label, detail=f"#{schedule_id}")
+        await inter.response.send_message("Removed." if sch else "No such schedule.", ephemeral=True)
+
+    @app_commands.command(name="backup_jobs", description="Recent backup jobs (admin-only).")
+    async def backup_jobs(self, inter: discord.Interaction):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True); return
+        async with SessionLocal() as s:
+            rows = (await s.execute(
+                select(BackupJob).where(_guild_scope(BackupJob, inter)).order_by(BackupJob.id.desc()).limit(20)
+            )).scalars().all()
+        if not rows:
+            await inter.response.send_message("No backup jobs yet.", ephemeral=True); return
+        lines = [
+            f"• #{j.id} **{j.label}** — {j.status}{f' ({j.error})' if j.error else ''} — node `{j.node or '?'}` — tries {j.attempts}"
+            for j in rows
+        ]
+        usage = self.orchestrator.node_usage()
+        if usage:
+            lines.append("Active per node: " + ", ".join(f"`{k}` {v}" for k, v in usage.items()))
+        await inter.response.send_message("\n".join(lines)[:1900], ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(BackupsCog(bot))
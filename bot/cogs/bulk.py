@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import io
+import time
+
+import aiohttp
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from ..config import settings
+from ..core.permissions import has_admin_role
+from ..services.audit import LOW, audit
+from ..services.bulk_ops import POWER_SIGNALS, BulkRun, render_summary, select_targets
+from .server import get_user_tokens_for_panels
+
+PROGRESS_EDIT_INTERVAL = 2.0
+
+
+class BulkCog(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    async def _run(self, inter: discord.Interaction, *, op: str, arg: str, targets: str | None, filter: str | None,
+                   panel: str | None, batch: int, wait_running: bool) -> None:
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True)
+            return
+        names = [n.strip() for n in (targets or "").split(",") if n.strip()]
+        needle = (filter or "").strip() or None
+        panel = (panel or "").strip() or None
+        # checked after parsing: targets="," must not fall through to "every server everywhere"
+        if not (names or needle or panel):
+            await inter.response.send_message("Give `targets`, `filter` or `panel` to choose servers.", ephemeral=True)
+            return
+        await inter.response.defer(ephemeral=True)
+        tokens = await get_user_tokens_for_panels(inter.user.id, [panel] if panel else None)
+        if not tokens:
+            await inter.followup.send("No key for that panel. Use `/link`.", ephemeral=True)
+            return
+
+        async with aiohttp.ClientSession() as sess:
+            chosen, missing = await select_targets(sess, tokens, names=names, needle=needle, guild_id=inter.guild_id,
+                                                   whole_panel=panel is not None)
+            if missing:
+                await inter.followup.send(f"Could not resolve: {', '.join(f'`{m}`' for m in missing)}", ephemeral=True)
+                return
+            if not chosen:
+                await inter.followup.send("No servers matched.", ephemeral=True)
+                return
+
+            run = BulkRun(
+                sess, chosen, op=op, arg=arg,
+                concurrency=settings.bulk_concurrency,
+                batch_size=batch,
+                wait_running=wait_running,
+                wait_timeout=settings.bulk_wait_timeout_seconds,
+            )
+            await inter.edit_original_response(content=run.progress_line())
+            last_edit = time.monotonic()
+
+            async def on_progress(r: BulkRun) -> None:
+                nonlocal last_edit
+                if time.monotonic() - last_edit < PROGRESS_EDIT_INTERVAL:
+                    return
+                last_edit = time.monotonic()
+                try:
+                    await inter.edit_original_response(content=r.progress_line())
+                except discord.HTTPException:
+                    pass
+
+            audit.emit(f"bulk_{op}", user_id=inter.user.id, guild_id=inter.guild_id,
+                       target=f"{len(chosen)} server(s)", detail=arg if op == "command" else None)
+            await run.run(on_progress)
+            for res in run.results:
+                audit.emit(f"bulk_{op}_result", user_id=inter.user.id, guild_id=inter.guild_id, target=res.target.label,
+                           detail=f"{res.status} {res.detail}".strip(), priority=LOW)
+
+        summary = render_summary(run)
+        try:
+            if len(summary) > 1900:
+                await inter.edit_original_response(
+                    content=run.progress_line(),
+                    attachments=[discord.File(io.BytesIO(summary.encode("utf-8")), filename="bulk_summary.txt")],
+                )
+            else:
+                await inter.edit_original_response(content=summary)
+        except discord.HTTPException:
+            # interaction token expired on a long rolling run
+            if isinstance(inter.channel, discord.abc.Messageable):
+                await inter.channel.send(summary[:1900])
+
+    @app_commands.command(name="bulk_power", description="Send a power signal to many servers (admin-only).")
+    @app_commands.describe(
+        signal="Power signal",
+        targets="Comma-separated aliases / UUIDs (8+ chars) / exact names",
+        filter="Name or UUID-prefix filter",
+        panel="Limit to one panel URL (on its own: every server there)",
+        batch="Rolling batch size (0 = all at once)",
+        wait_running="Wait for each batch to report running before the next",
+    )
+    @app_commands.choices(signal=[app_commands.Choice(name=s, value=s) for s in POWER_SIGNALS])
+    async def bulk_power(self, inter: discord.Interaction, signal: str, targets: str | None = None, filter: str | None = None,
+                         panel: str | None = None, batch: int = 0, wait_running: bool = False):
+        await self._run(inter, op="power", arg=signal, targets=targets, filter=filter, panel=panel,
+                        batch=max(0, batch), wait_running=wait_running and signal in ("start", "restart"))
+
+    @app_commands.command(name="bulk_command", description="Send one console command to many servers (admin-only).")
+    @app_commands.describe(
+        command="Console command (e.g. save-all)",
+        targets="Comma-separated aliases / UUIDs (8+ chars) / exact names",
+        filter="Name or UUID-prefix filter",
+        panel="Limit to one panel URL (on its own: every server there)",
+        batch="Rolling batch size (0 = all at once)",
+    )
+    async def bulk_command(self, inter: discord.Interaction, command: str, targets: str | None = None, filter: str | None = None,
+                           panel: str | None = None, batch: int = 0):
+        await self._run(inter, op="command", arg=command, targets=targets, filter=filter, panel=panel,
+                        batch=max(0, batch), wait_running=False)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(BulkCog(bot))
@@ -8,6 +8,7 @@ from discord.ext import commands
 from ..client.ptero_rest import PteroClient
 from ..core.permissions import has_admin_role
 from ..db import SessionLocal
+from ..services.audit import LOW, audit
 from ..services.credentials import (
     add_or_update_credential,
     delete_credential,
@@ -54,6 +55,7 @@ class KeysCog(commands.Cog):
                 s, inter.user.id, panel_url, token, label=str(label) if label else None
             )
         masked = "…" + cred.token_fingerprint
+        audit.emit("key_link", user_id=inter.user.id, guild_id=inter.guild_id, target=panel_url, priority=LOW)
         await inter.followup.send(
             f"Linked **{panel_url}** as label **{cred.label or '-'}** (fp `{masked}`).",
             ephemeral=True,
@@ -93,6 +95,7 @@ class KeysCog(commands.Cog):
         async with SessionLocal() as s:
             removed = await delete_credential(s, inter.user.id, panel_url, str(label) if label else None)
         if removed:
+            audit.emit("key_unlink", user_id=inter.user.id, guild_id=inter.guild_id, target=panel_url, priority=LOW)
             await inter.followup.send("Removed.", ephemeral=True)
         else:
             await inter.followup.send("No matching key found.", ephemeral=True)
@@ -106,6 +109,7 @@ class KeysCog(commands.Cog):
             return
         async with SessionLocal() as s:
             count = await wipe_user_credentials(s, inter.user.id)
+        audit.emit("keys_wipe_mine", user_id=inter.user.id, guild_id=inter.guild_id, detail=f"{count} removed")
         await inter.followup.send(f"Wiped {count} key(s) from your account.", ephemeral=True)
 
     @app_commands.command(name="keys_wipe_all", description='(Admin) Delete ALL keys (type "CONFIRM").')
@@ -120,6 +124,7 @@ class KeysCog(commands.Cog):
             return
         async with SessionLocal() as s:
             count = await wipe_all_credentials(s)
+        audit.emit("keys_wipe_all", user_id=inter.user.id, guild_id=inter.guild_id, detail=f"{count} removed")
         await inter.followup.send(f"Wiped ALL keys: {count} removed.", ephemeral=True)
 
 
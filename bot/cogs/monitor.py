@@ -1,9 +1,287 @@
 from __future__ import annotations
-from discord.ext import commands
+import asyncio, time
+import aiohttp
+import discord
+import structlog
+from discord import app_commands
+from discord.ext import commands, tasks
+from sqlalchemy import select
+from ..client.ptero_rest import PteroClient
+from ..config import settings
+from ..core.permissions import has_admin_role
+from ..db import SessionLocal
+from ..db.models import StatusBoard
+from ..services.boards import (
+    MAX_TARGETS,
+    BoardState,
+    BoardTarget,
+    TargetKey,
+    decode_targets,
+    encode_targets,
+    fetch_buckets,
+    render_board,
+)
+from ..services.credentials import get_user_tokens
+from ..services.stats_hub import StatsEvent
+from .server import (
+    _fmt_bytes,
+    _fmt_uptime,
+    get_user_token_for_panel,
+    resolve_identifier_and_panel,
+    server_autocomplete,
+)
+
+log = structlog.get_logger()
+
+def _board_from_row(row: StatusBoard) -> BoardState:
+    return BoardState(
+        id=row.id,
+        guild_id=row.guild_id,
+        channel_id=row.channel_id,
+        message_id=row.message_id,
+        owner_user_id=row.owner_user_id,
+        title=row.title,
+        targets=decode_targets(row.targets),
+    )
+
+def _render_watch(label: str, stats: StatsEvent | None, state: str | None, ends_at: float, done: bool = False) -> str:
+    lines = [f"**{label}** — {'stream ended' if done else 'live'} (`{state or 'unknown'}`)"]
+    if stats is None:
+        lines.append("Waiting for the first stats event…")
+    else:
+        mem = _fmt_bytes(stats.memory_bytes)
+        if stats.memory_limit_bytes:
+            mem += f" / {_fmt_bytes(stats.memory_limit_bytes)}"
+        lines.append(f"CPU: {stats.cpu or 0:.1f}% • Memory: {mem} • Disk: {_fmt_bytes(stats.disk_bytes)}")
+        lines.append(f"Net: ↓ {_fmt_bytes(stats.rx_bytes)} ↑ {_fmt_bytes(stats.tx_bytes)} • Uptime: {_fmt_uptime(stats.uptime_ms)}")
+    if not done:
+        lines.append(f"-# updates until <t:{int(ends_at)}:t>")
+    return "\n".join(lines)
 
 class MonitorCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.boards: dict[int, BoardState] = {}
+        self._refresh_lock = asyncio.Lock()
+
+    async def cog_load(self) -> None:
+        async with SessionLocal() as s:
+            rows = (await s.execute(select(StatusBoard))).scalars().all()
+        self.boards = {r.id: _board_from_row(r) for r in rows}
+        self.board_loop.change_interval(seconds=max(5, settings.board_refresh_seconds))
+        self.board_loop.start()
+
+    async def cog_unload(self) -> None:
+        self.board_loop.cancel()
+
+    @tasks.loop(seconds=30)
+    async def board_loop(self):
+        try:
+            await self.refresh_boards(list(self.boards.values()))
+        except Exception as e:
+            log.warning("board_refresh_error", error=str(e))
+
+    @board_loop.before_loop
+    async def before_board_loop(self):
+        await self.bot.wait_until_ready()
+
+    async def refresh_boards(self, boards: list[BoardState]) -> None:
+        """One pass for all boards: each (panel, uuid) is fetched once, and a
+        message is edited only when its rendered content actually changed."""
+        now = time.monotonic()
+        boards = [b for b in boards if b.retry_at <= now]
+        if not boards:
+            return
+        async with self._refresh_lock:
+            owners: dict[TargetKey, int] = {}
+            for b in boards:
+                for t in b.targets:
+                    owners.setdefault(t.key, b.owner_user_id)
+
+            wanted: dict[int, set[str]] = {}
+            for key, owner in owners.items():
+                wanted.setdefault(owner, set()).add(key[0])
+            # each owner's keys resolved once per tick (one batched lookup each, one DB session in all)
+            async with SessionLocal() as s:
+                owner_tokens = {o: await get_user_tokens(s, o, sorted(p)) for o, p in wanted.items()}
+            tokens: dict[TargetKey, str] = {}
+            for key, owner in owners.items():
+                tok = owner_tokens[owner].get(key[0])
+                if tok:
+                    tokens[key] = tok
+
+            async with aiohttp.ClientSession() as sess:
+                buckets = await fetch_buckets(sess, tokens, concurrency=settings.fleet_concurrency)
+
+            for b in boards:
+                sig = tuple(buckets.get(t.key) for t in b.targets)
+                if sig == b.signature:
+                    continue
+                b.signature = sig
+                content = render_board(b, sig)
+                if content == b.content:
+                    continue
+                if await self._edit_board(b, content):
+                    b.content = content
+
+    async def _edit_board(self, board: BoardState, content: str) -> bool:
+        channel = self.bot.get_channel(board.channel_id)
+        try:
+            if channel is None:
+                channel = await self.bot.fetch_channel(board.channel_id)
+            await channel.get_partial_message(board.message_id).edit(content=content)
+            board.denied = 0
+            return True
+        except discord.NotFound:
+            log.info("board_dropped", board=board.id, channel=board.channel_id)
+            await self._delete_board(board.id)
+        except discord.Forbidden:
+            # often temporary (a role or channel override edited): keep the board and retry later
+            board.signature = None
+            board.back_off(time.monotonic(), max(5, settings.board_refresh_seconds))
+            log.warning("board_forbidden", board=board.id, channel=board.channel_id, attempts=board.denied)
+        except discord.HTTPException as e:
+            board.signature = None
+            log.warning("board_edit_error", board=board.id, error=str(e))
+        return False
+
+    async def _delete_board(self, board_id: int) -> bool:
+        self.boards.pop(board_id, None)
+        async with SessionLocal() as s:
+            row = await s.get(StatusBoard, board_id)
+            if not row:
+                return False
+            await s.delete(row)
+            await s.commit()
+        return True
+
+    @app_commands.command(name="board_create", description="Pin an auto-refreshing status board in this channel (admin-only).")
+    @app_commands.describe(targets="Comma-separated aliases or UUIDs", title="Optional board title")
+    async def board_create(self, inter: discord.Interaction, targets: str, title: str | None = None):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True); return
+        if not inter.guild or not isinstance(inter.channel, discord.abc.Messageable):
+            await inter.response.send_message("Boards can only be created in a server channel.", ephemeral=True); return
+        await inter.response.defer(ephemeral=True)
+        wanted = [t.strip() for t in targets.split(",") if t.strip()]
+        if not wanted:
+            await inter.followup.send("No targets given.", ephemeral=True); return
+        if len(wanted) > MAX_TARGETS:
+            await inter.followup.send(f"A board holds at most {MAX_TARGETS} servers ({len(wanted)} given).",
+                                      ephemeral=True); return
+        resolved: list[BoardTarget] = []
+        missing: list[str] = []
+        for name in wanted:
+            uuid, panel = await resolve_identifier_and_panel(inter.user.id, name, inter.guild.id)
+            if uuid and panel:
+                resolved.append(BoardTarget(label=name, uuid=uuid, panel=panel))
+            else:
+                missing.append(name)
+        if missing:
+            await inter.followup.send(f"Could not resolve: {', '.join(f'`{m}`' for m in missing)}", ephemeral=True); return
+
+        msg = await inter.channel.send("Loading status board…")
+        async with SessionLocal() as s:
+            row = StatusBoard(
+                guild_id=inter.guild.id,
+                channel_id=msg.channel.id,
+                message_id=msg.id,
+                owner_user_id=inter.user.id,
+                title=title,
+                targets=encode_targets(resolved),
+            )
+            s.add(row)
+            await s.commit()
+            board = _board_from_row(row)
+        self.boards[board.id] = board
+        await self.refresh_boards([board])
+        await inter.followup.send(f"Board #{board.id} created with {len(resolved)} server(s).", ephemeral=True)
+
+    @app_commands.command(name="board_list", description="List status boards in this server (admin-only).")
+    async def board_list(self, inter: discord.Interaction):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True); return
+        boards = [b for b in self.boards.values() if inter.guild and b.guild_id == inter.guild.id]
+        if not boards:
+            await inter.response.send_message("No status boards.", ephemeral=True); return
+        lines = [f"• #{b.id} **{b.title or 'Server status'}** — <#{b.channel_id}> — {len(b.targets)} server(s)" for b in boards]
+        await inter.response.send_message("\n".join(lines), ephemeral=True)
+
+    @app_commands.command(name="board_delete", description="Delete a status board (admin-only).")
+    @app_commands.describe(board_id="Board number from /board_list")
+    async def board_delete(self, inter: discord.Interaction, board_id: int):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True); return
+        board = self.boards.get(board_id)
+        if not board or not inter.guild or board.guild_id != inter.guild.id:
+            await inter.response.send_message("No such board.", ephemeral=True); return
+        await inter.response.defer(ephemeral=True)
+        await self._delete_board(board_id)
+        channel = self.bot.get_channel(board.channel_id)
+        if channel is not None:
+            try:
+                await channel.get_partial_message(board.message_id).delete()
+            except discord.HTTPException:
+                pass
+        await inter.followup.send(f"Board #{board_id} deleted.", ephemeral=True)
+
+    @app_commands.command(name="watch", description="Live CPU/memory/network for a server, pushed by the panel.")
+    @app_commands.describe(server="Alias/UUID", minutes="How long to keep updating (default 5)")
+    @app_commands.autocomplete(server=server_autocomplete)
+    async def watch(self, inter: discord.Interaction, server: str, minutes: int = 5):
+        hub = getattr(self.bot, "stats_hub", None)
+        if hub is None:
+            await inter.response.send_message("Live stats are not available.", ephemeral=True); return
+        await inter.response.defer(ephemeral=True)
+        uuid, panel = await resolve_identifier_and_panel(inter.user.id, server, inter.guild_id)
+        if not uuid or not panel:
+            await inter.followup.send("Server not found for your linked panels.", ephemeral=True); return
+        token = await get_user_token_for_panel(inter.user.id, panel)
+        if not token:
+            await inter.followup.send("No key for that panel.", ephemeral=True); return
+        # an alias can point at any server; only watch what the caller's own key can see
+        try:
+            async with aiohttp.ClientSession() as sess:
+                await PteroClient(sess, panel, token).server_details(uuid)
+        except aiohttp.ClientResponseError as e:
+            if e.status in (401, 403, 404):
+                await inter.followup.send("Your key does not have access to that server.", ephemeral=True); return
+            await inter.followup.send(f"Panel error: HTTP {e.status}", ephemeral=True); return
+        except Exception as e:
+            await inter.followup.send(f"Could not reach the panel: {e}", ephemeral=True); return
+
+        minutes = max(1, min(minutes, settings.watch_max_minutes))
+        ends_at = time.time() + minutes * 60
+        msg = await inter.followup.send(f"Connecting to live stats for **{server}**…", ephemeral=True, wait=True)
+        stats: StatsEvent | None = None
+        state: str | None = None
+        shown: str | None = None
+        last_edit = 0.0
+        # one socket per (user, panel, server): repeat /watch calls by the same user share it,
+        # other users get their own under their own key; only the newest event is rendered
+        async with hub.subscribe(panel, uuid, inter.user.id) as sub:
+            while (left := ends_at - time.time()) > 0:
+                try:
+                    ev = await asyncio.wait_for(sub.get(), timeout=min(left, 5.0))
+                except TimeoutError:
+                    continue
+                ev = sub.queue.latest() or ev
+                state = ev.state or state
+                if ev.kind == "stats":
+                    stats = ev
+                content = _render_watch(server, stats, state, ends_at)
+                if content == shown or time.monotonic() - last_edit < 3.0:
+                    continue
+                try:
+                    await msg.edit(content=content)
+                except discord.HTTPException as e:
+                    log.info("watch_edit_error", error=str(e))
+                    return
+                shown, last_edit = content, time.monotonic()
+        try:
+            await msg.edit(content=_render_watch(server, stats, state, ends_at, done=True))
+        except discord.HTTPException:
+            pass
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(MonitorCog(bot))
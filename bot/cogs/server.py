@@ -1,16 +1,30 @@
 from __future__ import annotations
 
+import asyncio
 import io
 import discord
+import structlog
 from discord import app_commands
 from discord.ext import commands
 from sqlalchemy import select
 
 from ..db import SessionLocal
-from ..db.models import ServerAlias, UserCredential
+from ..db.models import UserCredential
 from ..core.permissions import SERVER_UUID_RE, has_admin_role
+from ..client.breaker import CircuitOpenError
+from ..client.cache import stale_note
 from ..client.ptero_rest import PteroClient
 from ..client.ptero_ws import fetch_recent_logs, send_console_command
+from ..config import settings
+from ..core.admission import AdmissionRejected, admission, busy_message
+from ..core.executor import gzip_bytes, offload
+from ..services.aliases import aliases
+from ..services.audit import audit
+from ..services.uploads import UploadProgress, UploadTooLarge, panel_slot, stream_upload
+from ..services.fleet import FleetRow, gather_fleet, render_rows, sort_rows, summarize
+from ..utils.paginator import ChainedPageSource, ListPageSource, PageSource, Paginator, RemotePageSource
+
+log = structlog.get_logger()
 
 
 def _fmt_bytes(n: int | None) -> str:
@@ -27,6 +41,10 @@ def _fmt_bytes(n: int | None) -> str:
     return f"{f:.1f} {units[i]}"
 
 
+def _join_lines(lines: list[str]) -> str:
+    return "\n".join(lines)
+
+
 def _fmt_gib_mib_pair(used_bytes: int, limit_mib: int | None) -> tuple[str, float | None]:
     used_s = _fmt_bytes(int(used_bytes or 0))
     if not limit_mib or limit_mib <= 0:
@@ -65,7 +83,13 @@ async def get_user_token_for_panel(user_id: int, panel_url: str) -> str | None:
         return await get_user_token(s, user_id, panel_url)
 
 
-async def resolve_identifier_and_panel(user_id: int, value: str) -> tuple[str | None, str | None]:
+async def get_user_tokens_for_panels(user_id: int, panels: list[str] | None = None) -> dict[str, str]:
+    async with SessionLocal() as s:
+        from ..services.credentials import get_user_tokens
+        return await get_user_tokens(s, user_id, panels)
+
+
+async def resolve_identifier_and_panel(user_id: int, value: str, guild_id: int | None = None) -> tuple[str | None, str | None]:
     val = value.strip()
     if SERVER_UUID_RE.match(val):
         panels = await list_user_panels(user_id)
@@ -86,15 +110,10 @@ async def resolve_identifier_and_panel(user_id: int, value: str) -> tuple[str |
                     continue
         return (val, None)
 
-    async with SessionLocal() as s:
-        res = await s.execute(select(ServerAlias).where(ServerAlias.alias == val))
-        alias = res.scalar_one_or_none()
-        if alias:
-            if alias.panel_url:
-                return (alias.uuid, alias.panel_url)
-            uuid_guess = alias.uuid
-        else:
-            uuid_guess = None
+    alias = aliases.get(guild_id, val)
+    if alias and alias.panel_url:
+        return (alias.uuid, alias.panel_url)
+    uuid_guess = alias.uuid if alias else None
 
     panels = await list_user_panels(user_id)
     if not panels:
@@ -109,201 +128,350 @@ async def resolve_identifier_and_panel(user_id: int, value: str) -> tuple[str |
                 servers = await cli.list_servers()
                 needle = val.lower()
                 for srv in servers:
-                    if uuid_guess and srv.get("uuid") == uuid_guess:
-                        return (srv["uuid"], p)
-                    uuid = srv.get("uuid","")
-                    name = srv.get("name","")
-                    if uuid.startswith(val) or needle in name.lower():
-                        return (uuid, p)
+                    if uuid_guess and srv.uuid == uuid_guess:
+                        return (srv.uuid, p)
+                    if srv.uuid.startswith(val) or needle in srv.name.lower():
+                        return (srv.uuid, p)
             except Exception:
                 continue
     return (None, None)
 
 
+async def server_autocomplete(inter: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    return [app_commands.Choice(name=f"{e.alias} ({e.uuid[:8]})", value=e.alias) for e in aliases.suggest(inter.guild_id, current)]
+
+
+def _fleet_match(row: FleetRow, text: str) -> bool:
+    return text.lower() in row.name.lower() or row.uuid.startswith(text)
+
+
+def _render_servers(items: list[dict]) -> str:
+    lines = [f"• **{s.get('name','(unknown)')}** — `{s.get('uuid','?')}`" for s in items]
+    note = stale_note(items)
+    if note:
+        lines.insert(0, f"⚠ {note}")
+    return "\n".join(lines)
+
+
+def _render_backups(items: list[dict]) -> str:
+    lines = []
+    for b in items:
+        size = b.get("bytes") or b.get("size") or 0
+        size_mb = f"{(size or 0)/1024/1024:.1f} MiB"
+        created = b.get("created_at") or b.get("createdAt") or "unknown"
+        lines.append(f"• `{b.get('uuid','')[:8]}…` {b.get('name') or ''} — {size_mb} — {created}")
+    return "\n".join(lines)
+
+
+def _backup_match(b: dict, text: str) -> bool:
+    return text.lower() in str(b.get("name") or "").lower() or str(b.get("uuid", "")).startswith(text)
+
+
+class FleetView(Paginator):
+    def __init__(self, owner_id: int, rows: list[FleetRow], sort: str):
+        self.rows = rows
+        self.sort = sort
+        super().__init__(owner_id, self._source(), header=self._header(), timeout=settings.page_view_timeout)
+
+    def _source(self) -> ListPageSource:
+        return ListPageSource(sort_rows(self.rows, self.sort), settings.page_size, render_rows, match=_fleet_match)
+
+    def _header(self) -> str:
+        return f"{summarize(self.rows)} • sort: {self.sort}"
+
+    @discord.ui.select(placeholder="Sort by…", row=2, options=[
+        discord.SelectOption(label="CPU", value="cpu"),
+        discord.SelectOption(label="Memory", value="memory"),
+        discord.SelectOption(label="State", value="state"),
+        discord.SelectOption(label="Name", value="name"),
+    ])
+    async def sort_select(self, inter: discord.Interaction, select: discord.ui.Select):
+        self.sort = select.values[0]
+        self.header = self._header()
+        self.set_source(self._source())
+        await self.show(inter, 0)
+
+
 class ServerCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    async def cog_app_command_error(self, inter: discord.Interaction, error: app_commands.AppCommandError) -> None:
+        err = getattr(error, "original", error)
+        if not isinstance(err, AdmissionRejected):
+            log.error("server_command_error", command=inter.command.name if inter.command else None, exc_info=err)
+            return
+        if inter.response.is_done():
+            await inter.followup.send(busy_message(err), ephemeral=True)
+        else:
+            await inter.response.send_message(busy_message(err), ephemeral=True)
+
     @app_commands.command(name="list", description="List your Pterodactyl servers.")
     @app_commands.describe(filter="Filter by name or UUID prefix", panel_url="Filter by a specific panel URL (optional)")
     async def server_list(self, inter: discord.Interaction, filter: str | None = None, panel_url: str | None = None):
-        await inter.response.defer(ephemeral=True)
-        panels = [panel_url] if panel_url else await list_user_panels(inter.user.id)
-        if not panels:
-            await inter.followup.send("You have no linked keys. Use `/link` first.", ephemeral=True)
-            return
-        lines = []
-        import aiohttp
-        for p in panels:
-            tok = await get_user_token_for_panel(inter.user.id, p)
-            if not tok: 
-                continue
+        async with admission.enter(inter) as ticket:
+            await inter.response.defer(ephemeral=True)
+            tokens = await get_user_tokens_for_panels(inter.user.id, [panel_url] if panel_url else None)
+            if not tokens and not panel_url:
+                await inter.followup.send("You have no linked keys. Use `/link` first.", ephemeral=True)
+                return
+            sources: list[PageSource] = []
+            for p, tok in sorted(tokens.items()):
+                cli = PteroClient(self.bot.http_session, p, tok)
+                async def fetch(page: int, q: str | None, cli: PteroClient = cli):
+                    return await cli.list_servers_page(page, settings.page_size, q, allow_warm=True)
+                sources.append(RemotePageSource(fetch, _render_servers, server_filter=True, title=p))
+            if not sources:
+                await inter.followup.send("No key for that panel. Use `/link`.", ephemeral=True); return
+            await ticket.panels(tokens)
+            view = Paginator(inter.user.id, ChainedPageSource(sources), filter_text=filter, timeout=settings.page_view_timeout)
+            await view.send(inter)
+
+    @app_commands.command(name="status_all", description="Resource table for all your servers across linked panels.")
+    @app_commands.describe(panel="Only this panel URL (optional)", filter="Filter by name or UUID prefix", sort="Initial sort order")
+    @app_commands.choices(sort=[
+        app_commands.Choice(name="CPU", value="cpu"),
+        app_commands.Choice(name="Memory", value="memory"),
+        app_commands.Choice(name="State", value="state"),
+        app_commands.Choice(name="Name", value="name"),
+    ])
+    async def server_status_all(self, inter: discord.Interaction, panel: str | None = None, filter: str | None = None, sort: str = "cpu"):
+        async with admission.enter(inter) as ticket:
+            await inter.response.defer(ephemeral=True)
+            tokens = await get_user_tokens_for_panels(inter.user.id, [panel] if panel else None)
+            if not tokens and not panel:
+                await inter.followup.send("You have no linked keys. Use `/link` first.", ephemeral=True); return
+            if not tokens:
+                await inter.followup.send("No key for that panel. Use `/link`.", ephemeral=True); return
+            await ticket.panels(tokens)
+
+            import aiohttp
             async with aiohttp.ClientSession() as sess:
-                cli = PteroClient(sess, p, tok)
-                try:
-                    servers = await cli.list_servers()
-                except Exception:
-                    continue
-                if filter:
-                    f = filter.lower().strip()
-                    servers = [s for s in servers if f in s.get("name","").lower() or s.get("uuid","").startswith(filter)]
-                for s in servers[:25]:
-                    lines.append(f"• **{s.get('name','(unknown)')}** — `{s.get('uuid','?')}` — _{p}_")
-        if not lines:
-            await inter.followup.send("No servers found.", ephemeral=True); return
-        await inter.followup.send("\n".join(lines[:25]), ephemeral=True)
+                rows = await gather_fleet(sess, tokens, needle=filter, concurrency=settings.fleet_concurrency)
+            if not rows:
+                await inter.followup.send("No servers found.", ephemeral=True); return
+            await FleetView(inter.user.id, rows, sort).send(inter)
 
     @app_commands.command(name="status", description="Show power + live stats for a server (using your key).")
     @app_commands.describe(server="Alias, partial, or full UUID.")
+    @app_commands.autocomplete(server=server_autocomplete)
     async def server_status(self, inter: discord.Interaction, server: str):
-        await inter.response.defer(ephemeral=True)
-        uuid, panel = await resolve_identifier_and_panel(inter.user.id, server)
-        if not uuid or not panel:
-            await inter.followup.send("Server not found for your linked panels. Try `/link` or specify the correct alias.", ephemeral=True)
-            return
-        tok = await get_user_token_for_panel(inter.user.id, panel)
-        if not tok:
-            await inter.followup.send("No key for that panel. Use `/link`.", ephemeral=True); return
-
-        import aiohttp
-        async with aiohttp.ClientSession() as sess:
-            cli = PteroClient(sess, panel, tok)
-            details = await cli.server_details(uuid)
-            res = await cli.server_resources(uuid)
-            try:
-                backups = await cli.list_backups(uuid)
-                backups_used = len(backups)
-            except Exception:
-                backups_used = 0
-
-        attrs = details
-        limits = attrs.get("limits", {}) or {}
-        features = attrs.get("feature_limits", {}) or {}
-        sftp = (attrs.get("sftp_details") or {})
-        sftp_host = sftp.get("ip")
-        sftp_port = sftp.get("port")
-
-        r = res.get("resources") or {}
-        cpu_now = float(r.get("cpu_absolute") or 0.0)
-        mem_used = int(r.get("memory_bytes") or 0)
-        disk_used = int(r.get("disk_bytes") or 0)
-        rx = int(r.get("network_rx_bytes") or r.get("rx_bytes") or 0)
-        tx = int(r.get("network_tx_bytes") or r.get("tx_bytes") or 0)
-        uptime_ms = int(r.get("uptime") or res.get("uptime") or 0)
-        power = res.get("current_state") or res.get("state") or "unknown"
-        suspended = bool(res.get("is_suspended"))
-
-        cpu_limit = int(limits.get("cpu") or 0)
-        cpu_limit_s = "Unlimited" if cpu_limit == 0 else f"{cpu_limit}%"
-        def pair(used, limit): return _fmt_gib_mib_pair(used, limit)[0]
-        mem_s = pair(mem_used, limits.get("memory"))
-        disk_s = pair(disk_used, limits.get("disk"))
-        net_s = f"RX {_fmt_bytes(rx)} • TX {_fmt_bytes(tx)}"
-        up_s = _fmt_uptime(uptime_ms)
-
-        backups_limit = int(features.get("backups") or 0)
-        backups_s = f"{backups_used}/{backups_limit or '∞'}" if backups_limit else f"{backups_used}/∞"
-
-        docker_image = attrs.get("docker_image") or ""
-        engine = docker_image.split(":")[-1] if ":" in docker_image else docker_image
-
-        uuid_short = (attrs.get("uuid") or uuid)[:8]
-
-        e = discord.Embed(title=f"{attrs.get('name','(unknown)')} — {uuid_short}")
-        node = attrs.get("node")
-        maint = attrs.get("is_node_under_maintenance")
-        if node:
-            value = f"{node}" + (" (maintenance)" if maint else "")
-            e.add_field(name="Node", value=value, inline=True)
-        e.add_field(name="Power", value=str(power), inline=True)
-        e.add_field(name="Uptime", value=up_s, inline=True)
-        e.add_field(name="Suspended", value="Yes" if suspended else "No", inline=True)
-        e.add_field(name="CPU", value=f"{cpu_now:.1f}% / {cpu_limit_s}", inline=True)
-        e.add_field(name="Memory", value=mem_s, inline=True)
-        e.add_field(name="Disk", value=disk_s, inline=True)
-        e.add_field(name="Network (since boot)", value=net_s, inline=False)
-        e.add_field(name="Backups", value=backups_s, inline=True)
-        e.add_field(name="Engine", value=engine or "—", inline=True)
-        if sftp_host and sftp_port:
-            e.add_field(name="SFTP", value=f"{sftp_host}:{sftp_port}", inline=False)
-
-        await inter.followup.send(embed=e, ephemeral=True)
+        async with admission.enter(inter) as ticket:
+            await inter.response.defer(ephemeral=True)
+            uuid, panel = await resolve_identifier_and_panel(inter.user.id, server, inter.guild_id)
+            if not uuid or not panel:
+                await inter.followup.send("Server not found for your linked panels. Try `/link` or specify the correct alias.", ephemeral=True)
+                return
+            tok = await get_user_token_for_panel(inter.user.id, panel)
+            if not tok:
+                await inter.followup.send("No key for that panel. Use `/link`.", ephemeral=True); return
+            await ticket.panels([panel])
+
+            import aiohttp
+            async with aiohttp.ClientSession() as sess:
+                cli = PteroClient(sess, panel, tok)
+                try:
+                    details = await cli.server_details(uuid, allow_warm=True)
+                    res = await cli.server_resources(uuid, allow_warm=True)
+                except CircuitOpenError as e:
+                    await inter.followup.send(f"⚠ {e}", ephemeral=True); return
+                try:
+                    backups = await cli.list_backups(uuid, allow_warm=True)
+                    backups_used = len(backups)
+                except Exception:
+                    backups_used = 0
+
+            attrs = details
+            limits = attrs.get("limits", {}) or {}
+            features = attrs.get("feature_limits", {}) or {}
+            sftp = (attrs.get("sftp_details") or {})
+            sftp_host = sftp.get("ip")
+            sftp_port = sftp.get("port")
+
+            cpu_now = res.cpu
+            mem_used = res.memory_bytes
+            disk_used = res.disk_bytes
+            rx, tx = res.rx_bytes, res.tx_bytes
+            uptime_ms = res.uptime_ms
+            power = res.state
+            suspended = res.is_suspended
+
+            cpu_limit = int(limits.get("cpu") or 0)
+            cpu_limit_s = "Unlimited" if cpu_limit == 0 else f"{cpu_limit}%"
+            def pair(used, limit): return _fmt_gib_mib_pair(used, limit)[0]
+            mem_s = pair(mem_used, limits.get("memory"))
+            disk_s = pair(disk_used, limits.get("disk"))
+            net_s = f"RX {_fmt_bytes(rx)} • TX {_fmt_bytes(tx)}"
+            up_s = _fmt_uptime(uptime_ms)
+
+            backups_limit = int(features.get("backups") or 0)
+            backups_s = f"{backups_used}/{backups_limit or '∞'}" if backups_limit else f"{backups_used}/∞"
+
+            docker_image = attrs.get("docker_image") or ""
+            engine = docker_image.split(":")[-1] if ":" in docker_image else docker_image
+
+            uuid_short = (attrs.get("uuid") or uuid)[:8]
+
+            e = discord.Embed(title=f"{attrs.get('name','(unknown)')} — {uuid_short}")
+            node = attrs.get("node")
+            maint = attrs.get("is_node_under_maintenance")
+            if node:
+                value = f"{node}" + (" (maintenance)" if maint else "")
+                e.add_field(name="Node", value=value, inline=True)
+            e.add_field(name="Power", value=str(power), inline=True)
+            e.add_field(name="Uptime", value=up_s, inline=True)
+            e.add_field(name="Suspended", value="Yes" if suspended else "No", inline=True)
+            e.add_field(name="CPU", value=f"{cpu_now:.1f}% / {cpu_limit_s}", inline=True)
+            e.add_field(name="Memory", value=mem_s, inline=True)
+            e.add_field(name="Disk", value=disk_s, inline=True)
+            e.add_field(name="Network (since boot)", value=net_s, inline=False)
+            e.add_field(name="Backups", value=backups_s, inline=True)
+            e.add_field(name="Engine", value=engine or "—", inline=True)
+            if sftp_host and sftp_port:
+                e.add_field(name="SFTP", value=f"{sftp_host}:{sftp_port}", inline=False)
+            note = stale_note(res)
+            if note:
+                e.set_footer(text=f"⚠ Stale data: {note}")
+
+            await inter.followup.send(embed=e, ephemeral=True)
 
     @app_commands.command(name="logs", description="Tail recent console logs (fast, recent only; your key).")
     @app_commands.describe(server="Alias/UUID", lines="How many lines (default 50, max 200)")
+    @app_commands.autocomplete(server=server_autocomplete)
     async def server_logs(self, inter: discord.Interaction, server: str, lines: int = 50):
-        await inter.response.defer(ephemeral=True)
-        uuid, panel = await resolve_identifier_and_panel(inter.user.id, server)
-        if not uuid or not panel:
-            await inter.followup.send("Server not found for your linked panels.", ephemeral=True); return
-        tok = await get_user_token_for_panel(inter.user.id, panel)
-        if not tok:
-            await inter.followup.send("No key for that panel.", ephemeral=True); return
-
-        lines = max(1, min(lines, 200))
-        import aiohttp
-        async with aiohttp.ClientSession() as sess:
-            cli = PteroClient(sess, panel, tok)
-            info = await cli.websocket_info(uuid)
-            token = info["data"]["token"]; socket = info["data"]["socket"]
-        try:
-            logs = await fetch_recent_logs(socket, panel, token, max_lines=lines, total_timeout=2.5, idle_timeout=0.4)
-        except Exception as e:
-            await inter.followup.send(f"WS error: {e}", ephemeral=True); return
+        async with admission.enter(inter) as ticket:
+            await inter.response.defer(ephemeral=True)
+            uuid, panel = await resolve_identifier_and_panel(inter.user.id, server, inter.guild_id)
+            if not uuid or not panel:
+                await inter.followup.send("Server not found for your linked panels.", ephemeral=True); return
+            tok = await get_user_token_for_panel(inter.user.id, panel)
+            if not tok:
+                await inter.followup.send("No key for that panel.", ephemeral=True); return
+            await ticket.panels([panel])
+
+            lines = max(1, min(lines, 200))
+            import aiohttp
+            async with aiohttp.ClientSession() as sess:
+                cli = PteroClient(sess, panel, tok)
+                info = await cli.websocket_info(uuid)
+                token = info["data"]["token"]; socket = info["data"]["socket"]
+            try:
+                logs = await fetch_recent_logs(socket, panel, token, max_lines=lines, total_timeout=2.5, idle_timeout=0.4)
+            except Exception as e:
+                await inter.followup.send(f"WS error: {e}", ephemeral=True); return
 
-        if not logs:
-            await inter.followup.send("No logs available.", ephemeral=True); return
-        text = "\n".join(logs)
-        if len(text) > 1900:
-            await inter.followup.send(file=discord.File(io.BytesIO(text.encode("utf-8")), filename="logs_tail.txt"), ephemeral=True)
-        else:
-            await inter.followup.send(f"```{text}```", ephemeral=True)
+            if not logs:
+                await inter.followup.send("No logs available.", ephemeral=True); return
+            text = await offload(_join_lines, logs, size=sum(map(len, logs)), threshold=settings.offload_text_bytes)
+            if len(text) <= 1900:
+                await inter.followup.send(f"```{text}```", ephemeral=True); return
+            data = text.encode("utf-8")
+            if len(data) > settings.log_gzip_bytes:
+                await inter.followup.send(file=discord.File(io.BytesIO(await gzip_bytes(data)), filename="logs_tail.txt.gz"), ephemeral=True)
+            else:
+                await inter.followup.send(file=discord.File(io.BytesIO(data), filename="logs_tail.txt"), ephemeral=True)
 
     @app_commands.command(name="console", description="Send a console command (admin-only; your key).")
     @app_commands.describe(server="Alias/UUID", command="Command to run")
+    @app_commands.autocomplete(server=server_autocomplete)
     async def server_console(self, inter: discord.Interaction, server: str, command: str):
         if not has_admin_role(inter):
             await inter.response.send_message("You don't have permission.", ephemeral=True); return
-        await inter.response.defer(ephemeral=True)
-        uuid, panel = await resolve_identifier_and_panel(inter.user.id, server)
-        if not uuid or not panel:
-            await inter.followup.send("Server not found for your linked panels.", ephemeral=True); return
-        tok = await get_user_token_for_panel(inter.user.id, panel)
-        if not tok:
-            await inter.followup.send("No key for that panel.", ephemeral=True); return
-        import aiohttp
-        async with aiohttp.ClientSession() as sess:
-            cli = PteroClient(sess, panel, tok)
-            info = await cli.websocket_info(uuid)
-            try:
-                await send_console_command(info["data"]["socket"], panel, info["data"]["token"], command)
-            except Exception as e:
-                await inter.followup.send(f"WS error: {e}", ephemeral=True); return
-        await inter.followup.send("Command sent.", ephemeral=True)
+        async with admission.enter(inter) as ticket:
+            await inter.response.defer(ephemeral=True)
+            uuid, panel = await resolve_identifier_and_panel(inter.user.id, server, inter.guild_id)
+            if not uuid or not panel:
+                await inter.followup.send("Server not found for your linked panels.", ephemeral=True); return
+            tok = await get_user_token_for_panel(inter.user.id, panel)
+            if not tok:
+                await inter.followup.send("No key for that panel.", ephemeral=True); return
+            await ticket.panels([panel])
+            import aiohttp
+            async with aiohttp.ClientSession() as sess:
+                cli = PteroClient(sess, panel, tok)
+                info = await cli.websocket_info(uuid)
+                try:
+                    await send_console_command(info["data"]["socket"], panel, info["data"]["token"], command)
+                except Exception as e:
+                    await inter.followup.send(f"WS error: {e}", ephemeral=True); return
+            audit.emit("console", user_id=inter.user.id, guild_id=inter.guild_id, target=server, detail=command)
+            await inter.followup.send("Command sent.", ephemeral=True)
 
     @app_commands.command(name="backups", description="List server backups (your key).")
     @app_commands.describe(server="Alias/UUID")
+    @app_commands.autocomplete(server=server_autocomplete)
     async def server_backups(self, inter: discord.Interaction, server: str):
+        async with admission.enter(inter) as ticket:
+            await inter.response.defer(ephemeral=True)
+            uuid, panel = await resolve_identifier_and_panel(inter.user.id, server, inter.guild_id)
+            if not uuid or not panel:
+                await inter.followup.send("Server not found for your linked panels.", ephemeral=True); return
+            tok = await get_user_token_for_panel(inter.user.id, panel)
+            if not tok:
+                await inter.followup.send("No key for that panel.", ephemeral=True); return
+            await ticket.panels([panel])
+            cli = PteroClient(self.bot.http_session, panel, tok)
+            async def fetch(page: int, q: str | None):
+                return await cli.list_backups_page(uuid, page, settings.page_size, allow_warm=True)
+            source = RemotePageSource(fetch, _render_backups, match=_backup_match)
+            first = await source.get_page(0)
+            if not first and not source.error:
+                await inter.followup.send("No backups found.", ephemeral=True); return
+            await Paginator(inter.user.id, source, timeout=settings.page_view_timeout).send(inter)
+
+    @app_commands.command(name="upload", description="Upload a Discord attachment into a server directory (admin-only; your key).")
+    @app_commands.describe(server="Alias/UUID", file="File to upload", path="Target directory (default /)")
+    @app_commands.autocomplete(server=server_autocomplete)
+    async def server_upload(self, inter: discord.Interaction, server: str, file: discord.Attachment, path: str = "/"):
+        if not has_admin_role(inter):
+            await inter.response.send_message("You don't have permission.", ephemeral=True); return
+        if file.size > settings.upload_max_bytes:
+            await inter.response.send_message(
+                f"File is too large ({file.size / 1024 / 1024:.1f} MiB, limit {settings.upload_max_bytes / 1024 / 1024:.0f} MiB).",
+                ephemeral=True,
+            ); return
         await inter.response.defer(ephemeral=True)
-        uuid, panel = await resolve_identifier_and_panel(inter.user.id, server)
+        uuid, panel = await resolve_identifier_and_panel(inter.user.id, server, inter.guild_id)
         if not uuid or not panel:
             await inter.followup.send("Server not found for your linked panels.", ephemeral=True); return
         tok = await get_user_token_for_panel(inter.user.id, panel)
         if not tok:
             await inter.followup.send("No key for that panel.", ephemeral=True); return
-        import aiohttp
-        async with aiohttp.ClientSession() as sess:
-            cli = PteroClient(sess, panel, tok)
-            backups = await cli.list_backups(uuid)
-        if not backups:
-            await inter.followup.send("No backups found.", ephemeral=True); return
-        lines = []
-        for b in backups[:10]:
-            size = b.get("bytes") or b.get("size") or 0
-            size_mb = f"{(size or 0)/1024/1024:.1f} MiB"
-            created = b.get("created_at") or b.get("createdAt") or "unknown"
-            lines.append(f"• `{b.get('uuid','')[:8]}…` {b.get('name') or ''} — {size_mb} — {created}")
-        await inter.followup.send("\n".join(lines), ephemeral=True)
+
+        progress = UploadProgress(file.filename, file.size)
+        await inter.edit_original_response(content=progress.line())
+
+        async def do_upload() -> None:
+            import aiohttp
+            async with panel_slot(panel):
+                progress.begin()
+                async with aiohttp.ClientSession() as sess:
+                    upload_url = await PteroClient(sess, panel, tok).get_upload_url(uuid)
+                    await stream_upload(sess, file.url, upload_url, path, progress)
+
+        task = asyncio.create_task(do_upload())
+        while not task.done():
+            await asyncio.wait({task}, timeout=2.0)
+            if not task.done():
+                try:
+                    await inter.edit_original_response(content=progress.line())
+                except discord.HTTPException:
+                    pass
+        try:
+            task.result()
+        except UploadTooLarge as e:
+            result = f"Upload rejected: {e}"
+        except Exception as e:
+            result = f"Upload failed: `{str(e)[:300]}`"
+        else:
+            audit.emit("upload", user_id=inter.user.id, guild_id=inter.guild_id, target=server, detail=f"{file.filename} -> {path}")
+            result = f"Uploaded `{file.filename}` ({file.size / 1024 / 1024:.1f} MiB) to `{path}`."
+        try:
+            await inter.edit_original_response(content=result)
+        except discord.HTTPException:
+            # interaction token expired on a long upload
+            if isinstance(inter.channel, discord.abc.Messageable):
+                await inter.channel.send(f"{inter.user.mention} {result}")
 
 
 async def setup(bot: commands.Bot):
@@ -25,6 +25,92 @@ class Settings(BaseSettings):
     data_key_version: int = Field(default=1, alias="DATA_KEY_VERSION")
     cred_purge_days: int = Field(default=7, alias="CRED_PURGE_DAYS")
 
+    # Database engine profile (SQLite pragmas / connection pool)
+    sqlite_journal_mode: str = Field(default="WAL", alias="SQLITE_JOURNAL_MODE")
+    sqlite_synchronous: str = Field(default="NORMAL", alias="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, alias="DB_POOL_TIMEOUT")
+    db_pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")  # Postgres only
+    db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE_SECONDS")  # Postgres only
+
+    # Panel client resilience
+    panel_timeout_seconds: float = Field(default=10.0, alias="PANEL_TIMEOUT_SECONDS")
+    breaker_window_seconds: float = Field(default=60.0, alias="BREAKER_WINDOW_SECONDS")
+    breaker_min_calls: int = Field(default=5, alias="BREAKER_MIN_CALLS")
+    breaker_error_rate: float = Field(default=0.5, alias="BREAKER_ERROR_RATE")
+    breaker_max_consecutive: int = Field(default=3, alias="BREAKER_MAX_CONSECUTIVE")
+    breaker_open_seconds: float = Field(default=30.0, alias="BREAKER_OPEN_SECONDS")
+    panel_cache_entries: int = Field(default=5000, alias="PANEL_CACHE_ENTRIES")
+
+    # Fleet & result views
+    fleet_concurrency: int = Field(default=10, alias="FLEET_CONCURRENCY")  # per panel
+    page_size: int = Field(default=15, alias="PAGE_SIZE")
+    page_view_timeout: int = Field(default=180, alias="PAGE_VIEW_TIMEOUT")
+    bulk_concurrency: int = Field(default=5, alias="BULK_CONCURRENCY")
+    bulk_wait_timeout_seconds: float = Field(default=300.0, alias="BULK_WAIT_TIMEOUT_SECONDS")
+    board_refresh_seconds: int = Field(default=30, alias="BOARD_REFRESH_SECONDS")
+    capacity_page_concurrency: int = Field(default=4, alias="CAPACITY_PAGE_CONCURRENCY")  # Application API pages in flight
+
+    # Uploads
+    upload_max_bytes: int = Field(default=512 * 1024 * 1024, alias="UPLOAD_MAX_BYTES")
+    upload_per_panel: int = Field(default=2, alias="UPLOAD_PER_PANEL")
+    upload_chunk_bytes: int = Field(default=256 * 1024, alias="UPLOAD_CHUNK_BYTES")
+
+    # Backup orchestration
+    backup_workers: int = Field(default=4, alias="BACKUP_WORKERS")
+    backup_per_node: int = Field(default=2, alias="BACKUP_PER_NODE")
+    backup_timeout_seconds: int = Field(default=3600, alias="BACKUP_TIMEOUT_SECONDS")
+    backup_max_attempts: int = Field(default=3, alias="BACKUP_MAX_ATTEMPTS")
+
+    # Live stats (console WebSocket subscriptions)
+    stats_queue_size: int = Field(default=16, alias="STATS_QUEUE_SIZE")  # per consumer, oldest dropped when full
+    stats_idle_grace_seconds: float = Field(default=30.0, alias="STATS_IDLE_GRACE_SECONDS")
+    watch_max_minutes: int = Field(default=10, alias="WATCH_MAX_MINUTES")
+
+    # Health endpoint & loop-lag watchdog
+    health_enabled: bool = Field(default=True, alias="HEALTH_ENABLED")
+    health_host: str = Field(default="127.0.0.1", alias="HEALTH_HOST")
+    health_port: int = Field(default=8080, alias="HEALTH_PORT")
+    loop_lag_interval: float = Field(default=0.5, alias="LOOP_LAG_INTERVAL")
+    loop_lag_warn_ms: float = Field(default=250.0, alias="LOOP_LAG_WARN_MS")
+    loop_lag_budget_ms: float = Field(default=1000.0, alias="LOOP_LAG_BUDGET_MS")  # p95 above this fails health
+    loop_stall_dump_seconds: float = Field(default=2.0, alias="LOOP_STALL_DUMP_SECONDS")
+
+    # CPU offload (work above these sizes leaves the event loop)
+    executor_threads: int = Field(default=4, alias="EXECUTOR_THREADS")
+    executor_processes: int = Field(default=0, alias="EXECUTOR_PROCESSES")  # 0 = no process pool
+    offload_json_bytes: int = Field(default=256 * 1024, alias="OFFLOAD_JSON_BYTES")
+    offload_gzip_bytes: int = Field(default=64 * 1024, alias="OFFLOAD_GZIP_BYTES")
+    offload_text_bytes: int = Field(default=64 * 1024, alias="OFFLOAD_TEXT_BYTES")
+    offload_decrypt_batch: int = Field(default=8, alias="OFFLOAD_DECRYPT_BATCH")
+    log_gzip_bytes: int = Field(default=1024 * 1024, alias="LOG_GZIP_BYTES")
+    token_cache_ttl_seconds: float = Field(default=300.0, alias="TOKEN_CACHE_TTL_SECONDS")
+
+    # Audit trail (DB table + combined posts to the guild log channel)
+    audit_queue_size: int = Field(default=1000, alias="AUDIT_QUEUE_SIZE")
+    audit_batch_size: int = Field(default=50, alias="AUDIT_BATCH_SIZE")
+    audit_flush_seconds: float = Field(default=5.0, alias="AUDIT_FLUSH_SECONDS")
+
+    # Cross-process cache invalidation: auto (LISTEN/NOTIFY on Postgres, local on SQLite) | notify | local
+    invalidation_mode: str = Field(default="auto", alias="INVALIDATION_MODE")
+    cache_ttl_seconds: float = Field(default=300.0, alias="CACHE_TTL_SECONDS")  # full reload as a fallback
+
+    # Admission control for heavy server commands
+    admission_per_user: int = Field(default=2, alias="ADMISSION_PER_USER")
+    admission_per_panel: int = Field(default=8, alias="ADMISSION_PER_PANEL")
+    admission_queue: int = Field(default=4, alias="ADMISSION_QUEUE")  # waiters per user (x4 per panel)
+    admission_user_wait_seconds: float = Field(default=2.0, alias="ADMISSION_USER_WAIT_SECONDS")
+    admission_panel_wait_seconds: float = Field(default=10.0, alias="ADMISSION_PANEL_WAIT_SECONDS")
+
+    # Warm-restart snapshot of panel caches (no tokens; keys hold fingerprints only)
+    snapshot_path: str = Field(default="/data/cache_snapshot.json.gz", alias="SNAPSHOT_PATH")  # empty = off
+    snapshot_interval_seconds: float = Field(default=300.0, alias="SNAPSHOT_INTERVAL_SECONDS")
+    snapshot_max_age_seconds: float = Field(default=6 * 3600.0, alias="SNAPSHOT_MAX_AGE_SECONDS")
+    revalidate_per_second: float = Field(default=2.0, alias="REVALIDATE_PER_SECOND")
+    revalidate_concurrency: int = Field(default=2, alias="REVALIDATE_CONCURRENCY")
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
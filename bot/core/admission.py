@@ -0,0 +1,164 @@
+from __future__ import annotations
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from collections.abc import AsyncIterator, Iterable
+from typing import Any
+import discord
+from discord import app_commands
+from yarl import URL
+from ..config import settings
+
+# Discord drops an interaction that is not acknowledged within 3 seconds;
+# a request still waiting for a user slot when this budget is spent is refused.
+INTERACTION_BUDGET = 2.5
+
+class AdmissionRejected(app_commands.AppCommandError):
+    def __init__(self, scope: str, reason: str):
+        super().__init__(f"{scope} {reason}")
+        self.scope = scope
+        self.reason = reason
+
+class _Slots:
+    """Counting slots with a short FIFO wait line; a released slot is handed
+    straight to the oldest waiter so late arrivals cannot overtake it."""
+
+    __slots__ = ("active", "limit", "waiters")
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.waiters: deque[asyncio.Future] = deque()
+
+    def try_take(self) -> bool:
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return True
+        return False
+
+    async def wait(self, timeout: float) -> bool:
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters.append(fut)
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout=max(0.0, timeout))
+            return True
+        except TimeoutError:
+            if fut.done() and not fut.cancelled():
+                return True  # handed over at the last moment
+            fut.cancel()
+            return False
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # pass on the slot we were just given
+            fut.cancel()
+            raise
+        finally:
+            try:
+                self.waiters.remove(fut)
+            except ValueError:
+                pass
+
+    def release(self) -> None:
+        while self.waiters:
+            fut = self.waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)  # slot passes to the waiter; active stays the same
+                return
+        self.active -= 1
+
+class _Scope:
+    def __init__(self, name: str, limit: int, queue: int):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue = max(0, queue)
+        self._slots: dict[Any, _Slots] = {}
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    async def acquire(self, key: Any, timeout: float) -> None:
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = self._slots[key] = _Slots(self.limit)
+        if slots.try_take():
+            self.admitted += 1
+            return
+        if len(slots.waiters) >= self.queue:
+            self.rejected += 1
+            raise AdmissionRejected(self.name, "wait line is full")
+        self.queued += 1
+        if not await slots.wait(timeout):
+            self.rejected += 1
+            raise AdmissionRejected(self.name, "is busy")
+        self.admitted += 1
+
+    def release(self, key: Any) -> None:
+        slots = self._slots.get(key)
+        if slots is None:
+            return
+        slots.release()
+        if slots.active <= 0 and not slots.waiters:
+            del self._slots[key]
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": sum(s.active for s in self._slots.values()),
+            "waiting": sum(len(s.waiters) for s in self._slots.values()),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
+
+class Ticket:
+    """Held for the life of one command; panel slots taken through it are released with it."""
+
+    def __init__(self, control: AdmissionControl):
+        self.control = control
+        self.hosts: list[str] = []
+
+    async def panels(self, panel_urls: Iterable[str], timeout: float | None = None) -> None:
+        timeout = settings.admission_panel_wait_seconds if timeout is None else timeout
+        wanted = sorted({URL(p).host or p for p in panel_urls} - set(self.hosts))  # fixed order: no lock cycles
+        for host in wanted:
+            await self.control.panel.acquire(host, timeout)
+            self.hosts.append(host)
+
+    def release(self) -> None:
+        for host in self.hosts:
+            self.control.panel.release(host)
+        self.hosts.clear()
+
+class AdmissionControl:
+    """Per-user and per-panel concurrency slots in front of heavy commands.
+
+    The user slot is taken before the interaction is acknowledged, so its
+    wait is bounded by what is left of Discord's 3 second window; panel
+    slots are taken after deferring and may wait longer.
+    """
+
+    def __init__(self):
+        self.user = _Scope("user", settings.admission_per_user, settings.admission_queue)
+        self.panel = _Scope("panel", settings.admission_per_panel, settings.admission_queue * 4)
+
+    @asynccontextmanager
+    async def enter(self, inter: discord.Interaction) -> AsyncIterator[Ticket]:
+        age = (discord.utils.utcnow() - inter.created_at).total_seconds()
+        budget = min(settings.admission_user_wait_seconds, INTERACTION_BUDGET - age)
+        await self.user.acquire(inter.user.id, budget)
+        ticket = Ticket(self)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+            self.user.release(inter.user.id)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"user": self.user.snapshot(), "panel": self.panel.snapshot()}
+
+def busy_message(err: AdmissionRejected) -> str:
+    if err.scope == "user":
+        return "You already have commands running — try again in a moment."
+    return "That panel is busy right now — try again in a few seconds."
+
+admission = AdmissionControl()
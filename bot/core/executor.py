@@ -0,0 +1,125 @@
+from __future__ import annotations
+import asyncio, gzip, json, time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from collections.abc import Callable
+from typing import Any, TypeVar
+import structlog
+from ..config import settings
+
+log = structlog.get_logger()
+
+R = TypeVar("R")
+
+class BoundedExecutor:
+    """A pool plus an admission semaphore, so at most ``max_pending`` jobs are
+    queued or running; further callers wait on the loop (backpressure) instead
+    of piling unbounded work into the pool's queue."""
+
+    def __init__(self, name: str, factory: Callable[[], Executor], workers: int, max_pending: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max(workers, max_pending)
+        self._factory = factory
+        self._pool: Executor | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self.waiting = 0
+        self.peak = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _ensure(self) -> tuple[Executor, asyncio.Semaphore]:
+        if self._pool is None:
+            self._pool = self._factory()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._pool, self._slots
+
+    async def run(self, fn: Callable[..., R], *args: Any) -> R:
+        pool, slots = self._ensure()
+        self.waiting += 1
+        t0 = time.monotonic()
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - t0
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.submitted += 1
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        except BaseException:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            slots.release()
+        self.completed += 1
+        return result
+
+    def saturation(self) -> float:
+        return min(1.0, self.running / self.workers) if self.workers else 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak": self.peak,
+            "saturation": round(self.saturation(), 2),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait_avg_ms": round(self.wait_total / self.submitted * 1000, 2) if self.submitted else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 2),
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+_threads = max(1, settings.executor_threads)
+thread_pool = BoundedExecutor(
+    "thread", lambda: ThreadPoolExecutor(_threads, thread_name_prefix="offload"), _threads, _threads * 4,
+)
+process_pool: BoundedExecutor | None = None
+if settings.executor_processes > 0:
+    process_pool = BoundedExecutor(
+        "process", lambda: ProcessPoolExecutor(settings.executor_processes),
+        settings.executor_processes, settings.executor_processes * 2,
+    )
+
+async def offload(fn: Callable[..., R], *args: Any, size: int = 0, threshold: int = 0, cpu: bool = False) -> R:
+    """Run ``fn(*args)`` inline when ``size`` is below ``threshold``, else in a pool.
+
+    ``cpu=True`` prefers the process pool (arguments and result must pickle);
+    without one configured it falls back to the thread pool.
+    """
+    if size < threshold:
+        return fn(*args)
+    pool = process_pool if cpu and process_pool is not None else thread_pool
+    return await pool.run(fn, *args)
+
+async def loads_json(raw: bytes | str) -> Any:
+    return await offload(json.loads, raw, size=len(raw), threshold=settings.offload_json_bytes)
+
+async def gzip_bytes(data: bytes) -> bytes:
+    return await offload(gzip.compress, data, size=len(data), threshold=settings.offload_gzip_bytes, cpu=True)
+
+def snapshot() -> dict[str, Any]:
+    out = {"thread": thread_pool.snapshot()}
+    if process_pool is not None:
+        out["process"] = process_pool.snapshot()
+    return out
+
+def shutdown() -> None:
+    thread_pool.shutdown()
+    if process_pool is not None:
+        process_pool.shutdown()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+import asyncio, sys, threading, time, traceback
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+import structlog
+from aiohttp import web
+from sqlalchemy import text
+from ..config import settings
+from ..db import SessionLocal
+
+log = structlog.get_logger()
+
+MetricsProvider = Callable[[], dict[str, Any]]
+_metrics: dict[str, MetricsProvider] = {}
+
+def register_metrics(name: str, provider: MetricsProvider) -> None:
+    """Expose ``provider()`` under ``name`` on the /metrics endpoint."""
+    _metrics[name] = provider
+
+def collect_metrics() -> dict[str, Any]:
+    out: dict[str, Any] = {}
+    for name, fn in _metrics.items():
+        try:
+            out[name] = fn()
+        except Exception as e:
+            out[name] = {"error": str(e)[:200]}
+    return out
+
+def _percentile(sorted_vals: list[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, int(q * len(sorted_vals)))
+    return sorted_vals[idx]
+
+class LoopLagMonitor:
+    """Measures event-loop scheduling delay.
+
+    A task asks to wake every ``interval`` seconds and records how late it
+    actually ran. A watchdog thread watches the same heartbeat from outside
+    the loop: if the loop has not ticked for ``stall_seconds`` it dumps the
+    loop thread's stack (the code that is blocking) once per stall. Lag
+    spikes seen after the fact log the stacks of the other pending tasks.
+    """
+
+    def __init__(self, interval: float | None = None, warn_ms: float | None = None,
+                 stall_seconds: float | None = None, window: int = 600):
+        self.interval = interval or settings.loop_lag_interval
+        self.warn = (warn_ms or settings.loop_lag_warn_ms) / 1000
+        self.stall_seconds = stall_seconds or settings.loop_stall_dump_seconds
+        self.samples: deque[float] = deque(maxlen=window)
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._last_tick = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._task = asyncio.create_task(self._sample(), name="loop-lag")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self._last_tick = time.monotonic()
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.warn:
+                log.warning("loop_lag", lag_ms=round(lag * 1000), tasks=self._task_stacks())
+
+    def _task_stacks(self, limit: int = 5) -> list[str]:
+        out = []
+        for t in asyncio.all_tasks():
+            if t is self._task or t.done():
+                continue
+            frames = t.get_stack(limit=1)
+            if frames:
+                f = frames[-1]
+                out.append(f"{t.get_name()} @ {f.f_code.co_filename}:{f.f_lineno} ({f.f_code.co_name})")
+            if len(out) >= limit:
+                break
+        return out
+
+    def _watchdog(self) -> None:
+        dumped = False
+        while not self._stop.wait(self.stall_seconds / 4):
+            stalled_for = time.monotonic() - self._last_tick - self.interval
+            if stalled_for < self.stall_seconds:
+                dumped = False
+                continue
+            if dumped:
+                continue
+            dumped = True
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id or 0)
+            stack = "".join(traceback.format_stack(frame)) if frame else "(loop thread not found)"
+            log.error("loop_stalled", stalled_s=round(stalled_for, 2), stack=stack[-4000:])
+
+    def current_stall(self) -> float:
+        return max(0.0, time.monotonic() - self._last_tick - self.interval)
+
+    def percentiles(self) -> dict[str, float]:
+        vals = sorted(self.samples)
+        return {
+            "p50_ms": round(_percentile(vals, 0.50) * 1000, 1),
+            "p95_ms": round(_percentile(vals, 0.95) * 1000, 1),
+            "p99_ms": round(_percentile(vals, 0.99) * 1000, 1),
+            "max_ms": round(self.max_lag * 1000, 1),
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        return {**self.percentiles(), "samples": len(self.samples), "stalls": self.stalls,
+                "current_stall_ms": round(self.current_stall() * 1000, 1)}
+
+async def db_reachable(timeout: float = 2.0) -> bool:
+    async def ping() -> None:
+        async with SessionLocal() as s:
+            await s.execute(text("SELECT 1"))
+    try:
+        await asyncio.wait_for(ping(), timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+class HealthServer:
+    """Small local HTTP server for the container orchestrator.
+
+    /healthz  liveness: the loop answers and recent lag is under budget
+    /readyz   readiness: liveness + gateway connected + DB reachable
+    /metrics  JSON from every registered metrics provider
+    """
+
+    def __init__(self, monitor: LoopLagMonitor, gateway_ready: Callable[[], bool],
+                 db_check: Callable[[], Awaitable[bool]] = db_reachable):
+        self.monitor = monitor
+        self.gateway_ready = gateway_ready
+        self.db_check = db_check
+        self.budget = settings.loop_lag_budget_ms
+        self._runner: web.AppRunner | None = None
+
+    def _lag_ok(self) -> bool:
+        return self.monitor.percentiles()["p95_ms"] <= self.budget
+
+    async def _healthz(self, request: web.Request) -> web.Response:
+        ok = self._lag_ok()
+        return web.json_response({"ok": ok, "loop": self.monitor.snapshot()}, status=200 if ok else 503)
+
+    async def _readyz(self, request: web.Request) -> web.Response:
+        checks = {"loop": self._lag_ok(), "gateway": self.gateway_ready(), "db": await self.db_check()}
+        ok = all(checks.values())
+        return web.json_response({"ok": ok, **checks}, status=200 if ok else 503)
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        return web.json_response(collect_metrics())
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/healthz", self._healthz)
+        app.router.add_get("/readyz", self._readyz)
+        app.router.add_get("/metrics", self._metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, settings.health_host, settings.health_port).start()
+        log.info("health_server_started", host=settings.health_host, port=settings.health_port)
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
@@ -1,6 +1,6 @@
 import re
 import discord
-from ..config import settings
+from ..services.guild_config import guild_configs
 
 SERVER_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
 
@@ -12,7 +12,7 @@ def has_admin_role(inter: discord.Interaction) -> bool:
         return True
     if getattr(member.guild_permissions, "administrator", False):
         return True
-    allowed = set(settings.admin_role_ids)
+    allowed = guild_configs.get(inter.guild.id).admin_role_ids
     if not allowed:
         return False
     return any(role.id in allowed for role in member.roles)
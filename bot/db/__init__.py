@@ -1,12 +1,122 @@
 from __future__ import annotations
+import time
+from typing import Any
+import structlog
+from sqlalchemy import event, exc
+from sqlalchemy.engine import URL, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from .models import Base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from ..config import settings
+from .migrations import migrate
 
-engine = create_async_engine(settings.database_url, future=True, echo=False)
+log = structlog.get_logger()
+
+SQLITE_JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"}
+SQLITE_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+# Upper bounds (seconds) of the checkout-wait buckets exposed on /metrics
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 1.0)
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def record(self, waited: float) -> None:
+        self.checkouts += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        for i, bound in enumerate(WAIT_BUCKETS):
+            if waited <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+pool_stats = PoolStats()
+
+class TimedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        t0 = time.monotonic()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record(time.monotonic() - t0)
+
+def _is_memory(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def engine_options(url: URL) -> dict[str, Any]:
+    if _is_memory(url):
+        return {}  # one shared in-memory connection; the dialect picks a static pool
+    opts: dict[str, Any] = {
+        "poolclass": TimedPool,
+        "pool_size": max(1, settings.db_pool_size),
+        "max_overflow": max(0, settings.db_max_overflow),
+        "pool_timeout": settings.db_pool_timeout,
+    }
+    if url.get_backend_name() == "postgresql":
+        opts["pool_pre_ping"] = settings.db_pool_pre_ping
+        opts["pool_recycle"] = settings.db_pool_recycle_seconds
+    return opts
+
+def _pragma(value: str, allowed: set[str], default: str, name: str) -> str:
+    v = value.strip().upper()
+    if v in allowed:
+        return v
+    log.warning("sqlite_pragma_ignored", pragma=name, value=value, using=default)
+    return default
+
+def _install_sqlite_pragmas(engine) -> None:
+    journal = _pragma(settings.sqlite_journal_mode, SQLITE_JOURNAL_MODES, "WAL", "journal_mode")
+    sync = _pragma(settings.sqlite_synchronous, SQLITE_SYNCHRONOUS, "NORMAL", "synchronous")
+    busy = max(0, int(settings.sqlite_busy_timeout_ms))
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_conn, _record) -> None:
+        # WAL lets readers proceed while one writer commits; busy_timeout makes
+        # a second writer wait instead of failing with "database is locked".
+        cur = dbapi_conn.cursor()
+        cur.execute(f"PRAGMA journal_mode={journal}")
+        cur.execute(f"PRAGMA synchronous={sync}")
+        cur.execute(f"PRAGMA busy_timeout={busy}")
+        cur.close()
+
+_url = make_url(settings.database_url)
+engine = create_async_engine(_url, future=True, echo=False, **engine_options(_url))
+if _url.get_backend_name() == "sqlite" and not _is_memory(_url):
+    _install_sqlite_pragmas(engine)
 SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
-async def init_db():
+def pool_snapshot() -> dict[str, Any]:
+    pool = engine.pool
+    n = pool_stats.checkouts
+    out: dict[str, Any] = {
+        "backend": _url.get_backend_name(),
+        "checkouts": n,
+        "timeouts": pool_stats.timeouts,
+        "wait_avg_ms": round(pool_stats.wait_total / n * 1000, 3) if n else 0.0,
+        "wait_max_ms": round(pool_stats.wait_max * 1000, 3),
+        "wait_buckets": {
+            **{f"le_{int(b * 1000)}ms": c for b, c in zip(WAIT_BUCKETS, pool_stats.buckets, strict=False)},
+            "over": pool_stats.buckets[-1],
+        },
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        out.update(size=pool.size(), checked_out=pool.checkedout(), overflow=pool.overflow())
+    return out
+
+async def init_db() -> list[int]:
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        applied = await conn.run_sync(migrate)
+    if applied:
+        log.info("schema_migrated", versions=applied)
+    return applied
@@ -0,0 +1,127 @@
+from __future__ import annotations
+from collections.abc import Callable
+import structlog
+from sqlalchemy import inspect, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+from .models import Base, GuildConfig, SchemaMigration, ServerAlias
+
+log = structlog.get_logger()
+
+# Postgres advisory lock held for the migration transaction, so processes
+# starting together apply each step once.
+LOCK_KEY = 0x4A585001
+
+Step = Callable[[Connection], None]
+
+def _add_missing_columns(conn: Connection) -> None:
+    # Catch-up for deployments that predate versioning: create_all never
+    # alters existing tables, so nullable columns were added in place.
+    insp = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not insp.has_table(table.name):
+            continue
+        have = {c["name"] for c in insp.get_columns(table.name)}
+        for col in table.columns:
+            if col.name in have or not col.nullable:
+                continue
+            col_type = col.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}")
+
+def _widen_guild_snowflakes(conn: Connection) -> None:
+    # Discord ids need 64 bits. SQLite INTEGER already is; Postgres integer is not.
+    if conn.dialect.name != "postgresql":
+        return
+    for col in ("guild_id", "log_channel_id", "alert_channel_id"):
+        conn.exec_driver_sql(f"ALTER TABLE guild_config ALTER COLUMN {col} TYPE BIGINT")
+
+def _alias_unique_per_guild(conn: Connection) -> None:
+    # The first schema made an alias unique across all guilds (uq_alias).
+    insp = inspect(conn)
+    names = {u["name"] for u in insp.get_unique_constraints("server_alias")}
+    if "uq_alias" not in names:
+        return
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("ALTER TABLE server_alias DROP CONSTRAINT uq_alias")
+        if "uq_guild_alias" not in names:
+            conn.exec_driver_sql("ALTER TABLE server_alias ADD CONSTRAINT uq_guild_alias UNIQUE (guild_id, alias)")
+        return
+    # SQLite cannot drop a constraint: rebuild the table from the model.
+    for idx in insp.get_indexes("server_alias"):
+        conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{idx["name"]}"')
+    conn.exec_driver_sql("ALTER TABLE server_alias RENAME TO server_alias_old")
+    ServerAlias.__table__.create(conn)
+    conn.exec_driver_sql(
+        "INSERT INTO server_alias (id, alias, uuid, panel_url, guild_id) "
+        "SELECT id, alias, uuid, panel_url, guild_id FROM server_alias_old"
+    )
+    conn.exec_driver_sql("DROP TABLE server_alias_old")
+
+HOT_INDEXES = ("ix_server_alias_guild_lower", "ix_backup_schedule_due", "ix_backup_job_claim")
+
+def _hot_query_indexes(conn: Connection) -> None:
+    for table in Base.metadata.sorted_tables:
+        for idx in table.indexes:
+            if idx.name in HOT_INDEXES:
+                # IF NOT EXISTS: reflection does not see expression indexes, so checkfirst would miss them
+                conn.execute(CreateIndex(idx, if_not_exists=True))
+
+def _backup_guild_scope(conn: Connection) -> None:
+    insp = inspect(conn)
+    for table in ("backup_schedule", "backup_job"):
+        if "guild_id" not in {c["name"] for c in insp.get_columns(table)}:
+            conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN guild_id BIGINT")
+        conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_{table}_guild_id ON {table} (guild_id)")
+
+def _guild_roles_nullable(conn: Connection) -> None:
+    # "" used to mean "inherit ADMIN_ROLE_IDS"; NULL takes that over so "" can mean "no roles".
+    insp = inspect(conn)
+    col = next(c for c in insp.get_columns("guild_config") if c["name"] == "admin_role_ids")
+    if not col["nullable"]:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("ALTER TABLE guild_config ALTER COLUMN admin_role_ids DROP NOT NULL")
+        else:
+            # SQLite cannot relax NOT NULL in place: rebuild the table from the model.
+            for idx in insp.get_indexes("guild_config"):
+                conn.exec_driver_sql(f'DROP INDEX IF EXISTS "{idx["name"]}"')
+            conn.exec_driver_sql("ALTER TABLE guild_config RENAME TO guild_config_old")
+            GuildConfig.__table__.create(conn)
+            conn.exec_driver_sql(
+                "INSERT INTO guild_config (id, guild_id, admin_role_ids, log_channel_id, alert_channel_id, created_at) "
+                "SELECT id, guild_id, admin_role_ids, log_channel_id, alert_channel_id, created_at FROM guild_config_old"
+            )
+            conn.exec_driver_sql("DROP TABLE guild_config_old")
+    conn.exec_driver_sql("UPDATE guild_config SET admin_role_ids = NULL WHERE admin_role_ids = ''")
+
+# Append only; a released version number is never reused or edited.
+MIGRATIONS: list[tuple[int, str, Step]] = [
+    (1, "add_missing_columns", _add_missing_columns),
+    (2, "widen_guild_config_snowflakes", _widen_guild_snowflakes),
+    (3, "server_alias_unique_per_guild", _alias_unique_per_guild),
+    (4, "hot_query_indexes", _hot_query_indexes),
+    (5, "backup_guild_scope", _backup_guild_scope),
+    (6, "guild_admin_roles_nullable", _guild_roles_nullable),
+]
+
+def migrate(conn: Connection) -> list[int]:
+    """Create missing tables, then apply pending steps in order; returns the versions applied.
+
+    A new database is created at the current schema by ``create_all``, so
+    every step is only recorded, not run.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({LOCK_KEY})")
+    insp = inspect(conn)
+    fresh = not any(insp.has_table(t.name) for t in Base.metadata.sorted_tables)
+    Base.metadata.create_all(conn)
+    done = set(conn.execute(select(SchemaMigration.version)).scalars())
+    applied: list[int] = []
+    for version, name, step in MIGRATIONS:
+        if version in done:
+            continue
+        if not fresh:
+            log.info("schema_migration", version=version, name=name)
+            step(conn)
+        conn.execute(insert(SchemaMigration).values(version=version, name=name))
+        applied.append(version)
+    return applied
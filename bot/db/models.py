@@ -1,17 +1,17 @@
 from __future__ import annotations
 from datetime import datetime
 from sqlalchemy.orm import declarative_base, Mapped, mapped_column
-from sqlalchemy import Integer, String, DateTime, func, UniqueConstraint, Boolean, BigInteger
+from sqlalchemy import Integer, String, DateTime, func, UniqueConstraint, Boolean, BigInteger, Index
 
 Base = declarative_base()
 
 class GuildConfig(Base):
     __tablename__ = "guild_config"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    guild_id: Mapped[int] = mapped_column(Integer, index=True, unique=True)
-    admin_role_ids: Mapped[str] = mapped_column(String, default="")
-    log_channel_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    alert_channel_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    guild_id: Mapped[int] = mapped_column(BigInteger, index=True, unique=True)
+    admin_role_ids: Mapped[str | None] = mapped_column(String, nullable=True)  # None = inherit ADMIN_ROLE_IDS
+    log_channel_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    alert_channel_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 class ServerAlias(Base):
@@ -20,7 +20,72 @@ class ServerAlias(Base):
     alias: Mapped[str] = mapped_column(String(64), index=True)
     uuid: Mapped[str] = mapped_column(String(36), index=True)
     panel_url: Mapped[str | None] = mapped_column(String, nullable=True)
-    __table_args__ = (UniqueConstraint("alias", name="uq_alias"),)
+    guild_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True, index=True)  # None = global
+    __table_args__ = (UniqueConstraint("guild_id", "alias", name="uq_guild_alias"),)
+
+# set_alias/delete_alias look up case-insensitively within a guild
+Index("ix_server_alias_guild_lower", ServerAlias.guild_id, func.lower(ServerAlias.alias))
+
+class StatusBoard(Base):
+    __tablename__ = "status_board"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    guild_id: Mapped[int] = mapped_column(BigInteger, index=True)
+    channel_id: Mapped[int] = mapped_column(BigInteger)
+    message_id: Mapped[int] = mapped_column(BigInteger, unique=True)
+    owner_user_id: Mapped[int] = mapped_column(BigInteger)
+    title: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    targets: Mapped[str] = mapped_column(String, default="")  # "uuid|panel_url|label" per line
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+class BackupSchedule(Base):
+    __tablename__ = "backup_schedule"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    owner_user_id: Mapped[int] = mapped_column(BigInteger, index=True)
+    guild_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True, index=True)  # None = created before scoping
+    uuid: Mapped[str] = mapped_column(String(36), index=True)
+    panel_url: Mapped[str] = mapped_column(String)
+    node: Mapped[str | None] = mapped_column(String, nullable=True)
+    label: Mapped[str] = mapped_column(String(64))
+    cron: Mapped[str] = mapped_column(String(64))
+    retention: Mapped[int] = mapped_column(Integer, default=5)
+    enabled: Mapped[bool] = mapped_column(Boolean, default=True)
+    next_run_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_run_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("ix_backup_schedule_due", "enabled", "next_run_at"),)
+
+class BackupJob(Base):
+    __tablename__ = "backup_job"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    schedule_id: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    owner_user_id: Mapped[int] = mapped_column(BigInteger)
+    guild_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True, index=True)
+    uuid: Mapped[str] = mapped_column(String(36), index=True)
+    panel_url: Mapped[str] = mapped_column(String)
+    node: Mapped[str | None] = mapped_column(String, nullable=True)
+    label: Mapped[str] = mapped_column(String(64))
+    status: Mapped[str] = mapped_column(String(16), index=True, default="queued")  # queued|creating|running|done|failed
+    backup_uuid: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[str | None] = mapped_column(String, nullable=True)
+    run_after: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_backup_job_claim", "status", "run_after"),)
+
+class AuditEvent(Base):
+    __tablename__ = "audit_events"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, index=True)  # naive UTC, set when emitted
+    guild_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True, index=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, index=True)
+    action: Mapped[str] = mapped_column(String(64))
+    target: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    detail: Mapped[str | None] = mapped_column(String, nullable=True)
+    priority: Mapped[int] = mapped_column(Integer, default=1)
 
 class UserCredential(Base):
     __tablename__ = "user_credentials"
@@ -40,3 +105,9 @@ class UserCredential(Base):
     __table_args__ = (
         UniqueConstraint("discord_user_id", "panel_url", "label", name="uq_user_panel_label"),
     )
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+    version: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(100))
+    applied_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -1,10 +1,21 @@
 from __future__ import annotations
-import asyncio, structlog, aiohttp, discord
+import asyncio, math, structlog, aiohttp, discord
 from discord.ext import commands, tasks
 from .config import settings
-from .db import init_db, SessionLocal
+from .db import init_db, pool_snapshot, SessionLocal
+from .client.breaker import breakers
+from .client.cache import panel_cache, revalidator
 from .client.ptero_app import PteroApp
+from .core import executor
+from .core.admission import admission
+from .core.health import HealthServer, LoopLagMonitor, register_metrics
+from .services.aliases import aliases
+from .services.audit import audit
 from .services.credentials import purge_old_credentials
+from .services.guild_config import guild_configs
+from .services.invalidation import invalidation
+from .services.snapshot import cache_snapshot
+from .services.stats_hub import StatsHub
 
 log = structlog.get_logger()
 
@@ -17,18 +28,48 @@ class Bot(commands.Bot):
         super().__init__(command_prefix="!", intents=INTENTS)
         self.http_session: aiohttp.ClientSession | None = None
         self.app_client: PteroApp | None = None
+        self.stats_hub: StatsHub | None = None
+        self.loop_monitor = LoopLagMonitor()
+        self.health_server: HealthServer | None = None
         self.purge_loop.start()
 
     async def setup_hook(self) -> None:
+        self.loop_monitor.start()
+        register_metrics("loop", self.loop_monitor.snapshot)
+        register_metrics("breakers", breakers.snapshot)
+        register_metrics("panel_cache", panel_cache.stats)
+        register_metrics("executor", executor.snapshot)
+        register_metrics("admission", admission.snapshot)
+        register_metrics("db_pool", pool_snapshot)
+        if settings.health_enabled:
+            self.health_server = HealthServer(self.loop_monitor, self.gateway_connected)
+            await self.health_server.start()
         await init_db()
+        async with SessionLocal() as s:
+            n = await aliases.load(s)
+            g = await guild_configs.load(s)
+        log.info("caches_loaded", aliases=n, guild_configs=g)
+        await invalidation.start()
+        register_metrics("invalidation", invalidation.stats)
         self.http_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        revalidator.bind(self.http_session)
+        cache_snapshot.start()  # loads in the background; commands never wait on it
+        register_metrics("revalidator", revalidator.stats)
+        register_metrics("snapshot", cache_snapshot.stats)
         if settings.app_api_key:
             self.app_client = PteroApp(self.http_session)
+        self.stats_hub = StatsHub(self.http_session)
+        audit.start(self)
+        register_metrics("audit", audit.stats)
+        register_metrics("stats_hub", self.stats_hub.stats)
 
         await self.load_extension("bot.cogs.keys")
         await self.load_extension("bot.cogs.server")
         await self.load_extension("bot.cogs.admin")
         await self.load_extension("bot.cogs.app_admin")
+        await self.load_extension("bot.cogs.monitor")
+        await self.load_extension("bot.cogs.bulk")
+        await self.load_extension("bot.cogs.backups")
 
         if settings.command_sync_scope == "dev" and settings.discord_guild_id:
             guild = discord.Object(id=settings.discord_guild_id)
@@ -39,13 +80,25 @@ class Bot(commands.Bot):
             synced = await self.tree.sync()
             log.info("commands_synced", scope="global", count=len(synced))
 
+    def gateway_connected(self) -> bool:
+        return self.is_ready() and not self.is_closed() and math.isfinite(self.latency)
+
     async def on_ready(self):
         log.info("bot_ready", user=str(self.user))
 
     async def close(self):
+        if self.health_server:
+            await self.health_server.stop()
+        await self.loop_monitor.stop()
+        await audit.stop()
+        await invalidation.stop()
+        if self.stats_hub:
+            await self.stats_hub.close()
+        await cache_snapshot.stop()
         if self.http_session:
             await self.http_session.close()
         await super().close()
+        executor.shutdown()
 
     @tasks.loop(hours=24)
     async def purge_loop(self):
@@ -0,0 +1,150 @@
+from __future__ import annotations
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db import SessionLocal
+from ..db.models import ServerAlias
+from .invalidation import invalidation
+
+@dataclass(slots=True, frozen=True)
+class AliasEntry:
+    alias: str
+    uuid: str
+    panel_url: str | None
+    guild_id: int | None  # None = global
+
+def _key(alias: str) -> str:
+    return alias.strip().casefold()
+
+class AliasTable:
+    """In-memory alias map, scoped per guild with a global (``None``) fallback.
+
+    Keys are case-folded; each scope keeps a sorted key list so prefix
+    suggestions are a bisect instead of a scan.
+    """
+
+    def __init__(self):
+        self._scopes: dict[int | None, dict[str, AliasEntry]] = {}
+        self._sorted: dict[int | None, list[str]] = {}
+        self.loaded = False
+
+    def _replace_all(self, entries: list[AliasEntry]) -> None:
+        scopes: dict[int | None, dict[str, AliasEntry]] = {}
+        for e in entries:
+            scopes.setdefault(e.guild_id, {})[_key(e.alias)] = e
+        self._scopes = scopes
+        self._sorted = {g: sorted(m) for g, m in scopes.items()}
+        self.loaded = True
+
+    async def load(self, s: AsyncSession) -> int:
+        rows = (await s.execute(select(ServerAlias))).scalars().all()
+        self._replace_all([AliasEntry(r.alias, r.uuid, r.panel_url, r.guild_id) for r in rows])
+        return len(rows)
+
+    async def refresh(self, s: AsyncSession, guild_id: int | None, alias: str) -> AliasEntry | None:
+        """Reload one alias from the DB (after another process changed it)."""
+        row = (await s.execute(select(ServerAlias).where(
+            _scope_clause(guild_id) & (func.lower(ServerAlias.alias) == alias.strip().lower())
+        ))).scalars().first()
+        self.discard(guild_id, alias)
+        if row is None:
+            return None
+        entry = AliasEntry(row.alias, row.uuid, row.panel_url, row.guild_id)
+        self.put(entry)
+        return entry
+
+    def put(self, entry: AliasEntry) -> None:
+        k = _key(entry.alias)
+        scope = self._scopes.setdefault(entry.guild_id, {})
+        if k not in scope:
+            insort(self._sorted.setdefault(entry.guild_id, []), k)
+        scope[k] = entry
+
+    def discard(self, guild_id: int | None, alias: str) -> AliasEntry | None:
+        k = _key(alias)
+        entry = self._scopes.get(guild_id, {}).pop(k, None)
+        if entry is not None:
+            keys = self._sorted[guild_id]
+            del keys[bisect_left(keys, k)]
+        return entry
+
+    def get(self, guild_id: int | None, alias: str) -> AliasEntry | None:
+        k = _key(alias)
+        if guild_id is not None:
+            hit = self._scopes.get(guild_id, {}).get(k)
+            if hit:
+                return hit
+        return self._scopes.get(None, {}).get(k)
+
+    def _prefixed(self, guild_id: int | None, prefix: str, limit: int) -> list[str]:
+        keys = self._sorted.get(guild_id) or []
+        out: list[str] = []
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and len(out) < limit and keys[i].startswith(prefix):
+            out.append(keys[i])
+            i += 1
+        return out
+
+    def suggest(self, guild_id: int | None, prefix: str, limit: int = 25) -> list[AliasEntry]:
+        p = _key(prefix)
+        seen: dict[str, AliasEntry] = {}
+        scopes = [guild_id, None] if guild_id is not None else [None]
+        for g in scopes:
+            for k in self._prefixed(g, p, limit):
+                seen.setdefault(k, self._scopes[g][k])
+        return [seen[k] for k in sorted(seen)[:limit]]
+
+    def entries(self, guild_id: int | None) -> list[AliasEntry]:
+        out = list(self._scopes.get(guild_id, {}).values())
+        if guild_id is not None:
+            local = self._scopes.get(guild_id, {})
+            out += [e for k, e in self._scopes.get(None, {}).items() if k not in local]
+        return sorted(out, key=lambda e: _key(e.alias))
+
+aliases = AliasTable()
+
+def _scope_clause(guild_id: int | None):
+    return ServerAlias.guild_id.is_(None) if guild_id is None else ServerAlias.guild_id == guild_id
+
+async def set_alias(s: AsyncSession, guild_id: int | None, alias: str, uuid: str, panel_url: str | None) -> AliasEntry:
+    alias = alias.strip()
+    res = await s.execute(select(ServerAlias).where(
+        _scope_clause(guild_id) & (func.lower(ServerAlias.alias) == alias.lower())
+    ))
+    existing = res.scalars().first()
+    if existing:
+        existing.alias = alias
+        existing.uuid = uuid
+        existing.panel_url = panel_url
+    else:
+        s.add(ServerAlias(alias=alias, uuid=uuid, panel_url=panel_url, guild_id=guild_id))
+    await s.commit()
+    entry = AliasEntry(alias, uuid, panel_url, guild_id)
+    aliases.put(entry)
+    invalidation.publish("alias", guild_id, alias)
+    return entry
+
+async def delete_alias(s: AsyncSession, guild_id: int | None, alias: str) -> int:
+    res = await s.execute(select(ServerAlias).where(
+        _scope_clause(guild_id) & (func.lower(ServerAlias.alias) == alias.strip().lower())
+    ))
+    rows = res.scalars().all()
+    for r in rows:
+        await s.delete(r)
+    await s.commit()
+    aliases.discard(guild_id, alias)
+    invalidation.publish("alias", guild_id, alias)
+    return len(rows)
+
+async def _on_alias_changed(key: list) -> None:
+    guild_id, alias = key
+    async with SessionLocal() as s:
+        await aliases.refresh(s, guild_id, alias)
+
+async def _reload_aliases() -> None:
+    async with SessionLocal() as s:
+        await aliases.load(s)
+
+invalidation.subscribe("alias", _on_alias_changed)
+invalidation.on_resync(_reload_aliases)
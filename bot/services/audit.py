@@ -0,0 +1,199 @@
+from __future__ import annotations
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+import discord
+import structlog
+from sqlalchemy import insert
+from ..config import settings
+from ..db import SessionLocal
+from ..db.models import AuditEvent
+from .guild_config import guild_configs
+
+log = structlog.get_logger()
+
+LOW = 0
+HIGH = 1
+
+# Discord limits for one combined post
+EMBED_LINES = 20
+EMBEDS_PER_MESSAGE = 10
+DESCRIPTION_MAX = 4000
+MESSAGE_CHARS_MAX = 6000  # summed over every embed in one message
+
+@dataclass(slots=True)
+class AuditRecord:
+    created_at: datetime
+    guild_id: int | None
+    user_id: int
+    action: str
+    target: str | None
+    detail: str | None
+    priority: int
+
+    def line(self) -> str:
+        ts = int(self.created_at.replace(tzinfo=UTC).timestamp())
+        out = f"<t:{ts}:T> <@{self.user_id}> **{self.action}**"
+        if self.target:
+            out += f" `{self.target[:80]}`"
+        if self.detail:
+            out += f" — {self.detail[:200]}"
+        return out
+
+class AuditPipeline:
+    """Non-blocking audit trail.
+
+    ``emit`` only appends to a bounded in-memory queue. A background task
+    drains it in batches: one bulk INSERT per batch, and one combined post
+    per guild log channel, flushed when ``batch_size`` events are waiting or
+    ``flush_seconds`` have passed. When the queue is full low-priority events
+    are dropped first; a high-priority event evicts the oldest low-priority
+    one and is only dropped if the queue holds nothing else.
+    """
+
+    def __init__(self, max_queue: int | None = None, batch_size: int | None = None, flush_seconds: float | None = None):
+        self.max_queue = max(1, max_queue or settings.audit_queue_size)
+        self.batch_size = max(1, batch_size or settings.audit_batch_size)
+        self.flush_seconds = flush_seconds or settings.audit_flush_seconds
+        self._queue: deque[AuditRecord] = deque()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._bot: discord.Client | None = None
+        self.emitted = 0
+        self.written = 0
+        self.posted = 0
+        self.dropped_low = 0
+        self.dropped_high = 0
+        self.write_errors = 0
+
+    def emit(self, action: str, *, user_id: int, guild_id: int | None = None, target: str | None = None,
+             detail: str | None = None, priority: int = HIGH) -> bool:
+        rec = AuditRecord(datetime.utcnow(), guild_id, user_id, action, target, detail, priority)
+        if len(self._queue) >= self.max_queue and not self._make_room(rec):
+            return False
+        self._queue.append(rec)
+        self.emitted += 1
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def _make_room(self, rec: AuditRecord) -> bool:
+        if rec.priority <= LOW:
+            self.dropped_low += 1
+            return False
+        for i, queued in enumerate(self._queue):
+            if queued.priority <= LOW:
+                del self._queue[i]
+                self.dropped_low += 1
+                return True
+        self._queue.popleft()
+        self.dropped_high += 1
+        return True
+
+    def start(self, bot: discord.Client) -> None:
+        self._bot = bot
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="audit-flush")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self._queue:
+            await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            except TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                log.warning("audit_flush_error", error=str(e))
+
+    async def flush(self) -> int:
+        batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.batch_size * 4))]
+        if not batch:
+            return 0
+        await self._write(batch)
+        await self._post(batch)
+        return len(batch)
+
+    async def _write(self, batch: list[AuditRecord]) -> None:
+        rows = [{"created_at": r.created_at, "guild_id": r.guild_id, "user_id": r.user_id, "action": r.action,
+                 "target": r.target, "detail": r.detail, "priority": r.priority} for r in batch]
+        try:
+            async with SessionLocal() as s:
+                await s.execute(insert(AuditEvent), rows)
+                await s.commit()
+            self.written += len(rows)
+        except Exception as e:
+            self.write_errors += 1
+            log.warning("audit_write_error", count=len(rows), error=str(e))
+
+    async def _post(self, batch: list[AuditRecord]) -> None:
+        if self._bot is None:
+            return
+        by_channel: dict[int, list[AuditRecord]] = {}
+        for r in batch:
+            channel_id = guild_configs.get(r.guild_id).log_channel_id
+            if channel_id:
+                by_channel.setdefault(channel_id, []).append(r)
+        for channel_id, records in by_channel.items():
+            channel = self._bot.get_channel(channel_id)
+            if not isinstance(channel, discord.abc.Messageable):
+                continue
+            for embeds in _messages(_combined_embeds(records)):
+                try:
+                    await channel.send(embeds=embeds)
+                    self.posted += 1
+                except discord.HTTPException as e:
+                    log.info("audit_post_error", channel=channel_id, error=str(e))
+                    break
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "emitted": self.emitted,
+            "written": self.written,
+            "posted_messages": self.posted,
+            "dropped_low": self.dropped_low,
+            "dropped_high": self.dropped_high,
+            "write_errors": self.write_errors,
+        }
+
+def _combined_embeds(records: list[AuditRecord]) -> list[discord.Embed]:
+    embeds: list[discord.Embed] = []
+    lines: list[str] = []
+    size = 0
+    for r in records:
+        line = r.line()
+        if lines and (len(lines) >= EMBED_LINES or size + len(line) + 1 > DESCRIPTION_MAX):
+            embeds.append(discord.Embed(title="Audit log", description="\n".join(lines), color=discord.Color.dark_grey()))
+            lines, size = [], 0
+        lines.append(line)
+        size += len(line) + 1
+    if lines:
+        embeds.append(discord.Embed(title="Audit log", description="\n".join(lines), color=discord.Color.dark_grey()))
+    return embeds
+
+def _messages(embeds: list[discord.Embed]) -> list[list[discord.Embed]]:
+    """Group embeds into posts within Discord's per-message embed count and total size."""
+    out: list[list[discord.Embed]] = []
+    size = 0
+    for e in embeds:
+        n = len(e)
+        if not out or len(out[-1]) >= EMBEDS_PER_MESSAGE or size + n > MESSAGE_CHARS_MAX:
+            out.append([])
+            size = 0
+        out[-1].append(e)
+        size += n
+    return out
+
+audit = AuditPipeline()
@@ -0,0 +1,265 @@
+from __future__ import annotations
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+import aiohttp
+import structlog
+from sqlalchemy import select, update
+from yarl import URL
+from ..client.cache import stale_age
+from ..client.ptero_rest import PteroClient
+from ..config import settings
+from ..db import SessionLocal
+from ..db.models import BackupJob, BackupSchedule
+from .credentials import get_user_token
+from .cron import next_fire, parse_cron
+from .fleet import short_error
+
+log = structlog.get_logger()
+
+ACTIVE = ("queued", "creating", "running")
+SCHEDULER_INTERVAL = 30.0
+
+def utcnow() -> datetime:
+    return datetime.utcnow()
+
+def backup_name(job: BackupJob) -> str:
+    # Deterministic so a restarted worker can find a backup it already asked for.
+    if job.schedule_id:
+        return f"{schedule_prefix(job.schedule_id)}j{job.id}"
+    return f"bot-j{job.id}"
+
+def schedule_prefix(schedule_id: int) -> str:
+    return f"bot-s{schedule_id}-"
+
+class RetryableError(RuntimeError):
+    pass
+
+class BackupOrchestrator:
+    """DB-backed backup queue: a cron scheduler feeding a worker pool with per-node limits.
+
+    Jobs move queued -> creating -> running -> done/failed. Backups are named
+    after their job, so a job interrupted by a restart is resumed by adopting
+    the existing panel backup instead of creating a second one.
+    """
+
+    def __init__(self, workers: int | None = None, per_node: int | None = None):
+        self.workers = max(1, workers or settings.backup_workers)
+        self.per_node = max(1, per_node or settings.backup_per_node)
+        self._node_active: dict[str, int] = defaultdict(int)
+        self._wake = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        await self.recover()
+        self._tasks = [asyncio.create_task(self._scheduler_loop(), name="backup-scheduler")]
+        self._tasks += [asyncio.create_task(self._worker_loop(i), name=f"backup-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def recover(self) -> int:
+        """Re-queue jobs that were in flight when the process stopped (keeping backup_uuid)."""
+        async with SessionLocal() as s:
+            res = await s.execute(
+                update(BackupJob).where(BackupJob.status.in_(("creating", "running"))).values(status="queued")
+            )
+            await s.commit()
+        if res.rowcount:
+            log.info("backup_jobs_recovered", count=res.rowcount)
+        return res.rowcount or 0
+
+    async def enqueue(self, *, owner_user_id: int, guild_id: int | None, uuid: str, panel_url: str, node: str | None,
+                      label: str, schedule_id: int | None = None) -> BackupJob | None:
+        """Queue a backup; returns None when one is already active for the same server."""
+        async with SessionLocal() as s:
+            dup = await s.execute(select(BackupJob.id).where(
+                (BackupJob.uuid == uuid) & (BackupJob.panel_url == panel_url) & BackupJob.status.in_(ACTIVE)
+            ))
+            if dup.first():
+                return None
+            job = BackupJob(owner_user_id=owner_user_id, guild_id=guild_id, uuid=uuid, panel_url=panel_url, node=node,
+                            label=label, schedule_id=schedule_id, status="queued", attempts=0)
+            s.add(job)
+            await s.commit()
+        self._wake.set()
+        return job
+
+    # --- scheduler -------------------------------------------------------
+
+    async def _scheduler_loop(self) -> None:
+        while True:
+            try:
+                await self.run_due_schedules()
+            except Exception as e:
+                log.warning("backup_scheduler_error", error=str(e))
+            await asyncio.sleep(SCHEDULER_INTERVAL)
+
+    async def run_due_schedules(self) -> int:
+        now = utcnow()
+        async with SessionLocal() as s:
+            res = await s.execute(select(BackupSchedule).where(
+                BackupSchedule.enabled.is_(True) & (BackupSchedule.next_run_at <= now)
+            ))
+            due = list(res.scalars().all())
+            for sch in due:
+                sch.last_run_at = now
+                try:
+                    sch.next_run_at = next_fire(parse_cron(sch.cron), now)
+                except ValueError:
+                    sch.enabled = False
+            await s.commit()
+        queued = 0
+        for sch in due:
+            job = await self.enqueue(owner_user_id=sch.owner_user_id, guild_id=sch.guild_id, uuid=sch.uuid,
+                                     panel_url=sch.panel_url, node=sch.node, label=sch.label, schedule_id=sch.id)
+            queued += job is not None
+        return queued
+
+    # --- workers ---------------------------------------------------------
+
+    def _node_key(self, job: BackupJob) -> str:
+        return f"{URL(job.panel_url).host}/{job.node or '?'}"
+
+    async def _claim(self) -> BackupJob | None:
+        now = utcnow()
+        async with SessionLocal() as s:
+            res = await s.execute(select(BackupJob).where(
+                (BackupJob.status == "queued") & ((BackupJob.run_after.is_(None)) | (BackupJob.run_after <= now))
+            ).order_by(BackupJob.id).limit(50))
+            for job in res.scalars().all():
+                node = self._node_key(job)
+                if self._node_active[node] >= self.per_node:
+                    continue
+                # reserve the node slot before awaiting, so concurrent workers see it taken
+                self._node_active[node] += 1
+                try:
+                    claimed = await s.execute(
+                        update(BackupJob).where((BackupJob.id == job.id) & (BackupJob.status == "queued"))
+                        .values(status="creating", started_at=now, attempts=BackupJob.attempts + 1)
+                    )
+                    await s.commit()
+                except BaseException:
+                    self._node_active[node] -= 1
+                    raise
+                if claimed.rowcount == 1:
+                    job.status, job.started_at, job.attempts = "creating", now, (job.attempts or 0) + 1
+                    return job
+                self._node_active[node] -= 1
+        return None
+
+    async def _worker_loop(self, idx: int) -> None:
+        backoff = 1.0
+        while True:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                # a DB hiccup must not end the worker; the queue would silently stall
+                log.warning("backup_claim_error", worker=idx, error=short_error(e))
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+                continue
+            backoff = 1.0
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=15)
+                except TimeoutError:
+                    pass
+                continue
+            try:
+                await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                try:
+                    await self._fail_or_retry(job, e)
+                except Exception as e2:
+                    # left in "creating"/"running"; recover() re-queues it on the next start
+                    log.warning("backup_job_update_error", job=job.id, error=short_error(e2))
+            finally:
+                self._node_active[self._node_key(job)] -= 1
+                self._wake.set()
+
+    async def _save(self, job_id: int, **values) -> None:
+        async with SessionLocal() as s:
+            await s.execute(update(BackupJob).where(BackupJob.id == job_id).values(**values))
+            await s.commit()
+
+    async def _fail_or_retry(self, job: BackupJob, e: BaseException) -> None:
+        msg = short_error(e)
+        if job.attempts < settings.backup_max_attempts and (isinstance(e, RetryableError) or not job.backup_uuid):
+            delay = timedelta(seconds=60 * 2 ** (job.attempts - 1))
+            await self._save(job.id, status="queued", error=msg, run_after=utcnow() + delay)
+            log.info("backup_job_retry", job=job.id, attempts=job.attempts, error=msg)
+        else:
+            await self._save(job.id, status="failed", error=msg, finished_at=utcnow())
+            log.warning("backup_job_failed", job=job.id, error=msg)
+
+    async def _process(self, job: BackupJob) -> None:
+        async with SessionLocal() as s:
+            token = await get_user_token(s, job.owner_user_id, job.panel_url)
+        if not token:
+            await self._save(job.id, status="failed", error="no key for panel", finished_at=utcnow())
+            return
+        name = backup_name(job)
+        async with aiohttp.ClientSession() as sess:
+            cli = PteroClient(sess, job.panel_url, token)
+            if not job.backup_uuid:
+                existing = await cli.list_backups(job.uuid)
+                if stale_age(existing) is not None:
+                    raise RetryableError("panel unavailable")
+                found = next((b.uuid for b in existing if b.name == name), None)
+                job.backup_uuid = found or (await cli.create_backup(job.uuid, name)).get("uuid")
+                if not job.backup_uuid:
+                    raise RetryableError("panel did not return a backup uuid")
+            await self._save(job.id, status="running", backup_uuid=job.backup_uuid)
+
+            ok, detail = await self._await_completion(cli, job)
+            await self._save(job.id, status="done" if ok else "failed", error=None if ok else detail, finished_at=utcnow())
+            log.info("backup_job_finished", job=job.id, ok=ok, detail=detail)
+            if ok and job.schedule_id:
+                await self._enforce_retention(cli, job)
+
+    async def _await_completion(self, cli: PteroClient, job: BackupJob) -> tuple[bool, str]:
+        deadline = asyncio.get_running_loop().time() + settings.backup_timeout_seconds
+        delay = 5.0
+        while asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+            try:
+                b = await cli.get_backup(job.uuid, job.backup_uuid)
+            except Exception as e:
+                log.info("backup_poll_error", job=job.id, error=short_error(e))
+                continue
+            if b.get("completed_at"):
+                return (bool(b.get("is_successful", True)), "completed")
+        return (False, "timed out waiting for completion")
+
+    async def _enforce_retention(self, cli: PteroClient, job: BackupJob) -> int:
+        async with SessionLocal() as s:
+            sch = await s.get(BackupSchedule, job.schedule_id)
+        if not sch or sch.retention <= 0:
+            return 0
+        backups = await cli.list_backups(job.uuid)
+        if stale_age(backups) is not None:
+            return 0
+        prefix = schedule_prefix(sch.id)
+        ours = [b for b in backups if b.name.startswith(prefix) and b.completed_at]
+        ours.sort(key=lambda b: b.created_at or "", reverse=True)
+        removed = 0
+        for b in ours[sch.retention:]:
+            if b.is_locked:
+                continue
+            try:
+                await cli.delete_backup(job.uuid, b.uuid)
+                removed += 1
+            except Exception as e:
+                log.warning("backup_retention_error", schedule=sch.id, backup=b.uuid, error=short_error(e))
+        return removed
+
+    def node_usage(self) -> dict[str, int]:
+        return {k: v for k, v in self._node_active.items() if v}
@@ -0,0 +1,103 @@
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass, field
+import aiohttp
+from ..client.cache import stale_age
+from ..client.ptero_rest import PteroClient
+from ..client.records import ResourceRecord
+from .fleet import short_error
+
+CPU_BUCKET = 5          # percent
+MEM_BUCKET_MIB = 64
+MAX_TARGETS = 25        # rows that fit one board message
+BACKOFF_MAX = 3600.0    # seconds between edit attempts while the bot lacks permission
+
+# (state, cpu bucket, memory bucket MiB); errors carry the message in the state slot
+Bucket = tuple[str, int | None, int | None]
+TargetKey = tuple[str, str]  # (panel_url, uuid)
+
+@dataclass(slots=True)
+class BoardTarget:
+    label: str
+    uuid: str
+    panel: str
+
+    @property
+    def key(self) -> TargetKey:
+        return (self.panel, self.uuid)
+
+@dataclass(slots=True)
+class BoardState:
+    id: int
+    guild_id: int
+    channel_id: int
+    message_id: int
+    owner_user_id: int
+    title: str | None
+    targets: list[BoardTarget]
+    signature: tuple[Bucket | None, ...] | None = None
+    content: str | None = field(default=None, repr=False)
+    retry_at: float = 0.0   # monotonic; skipped until then after a permission error
+    denied: int = 0         # consecutive permission errors
+
+    def back_off(self, now: float, base: float) -> None:
+        """Postpone the next refresh after a permission error, doubling up to BACKOFF_MAX."""
+        self.denied += 1
+        self.retry_at = now + min(BACKOFF_MAX, base * 2 ** self.denied)
+
+def encode_targets(targets: list[BoardTarget]) -> str:
+    return "\n".join(f"{t.uuid}|{t.panel}|{t.label}" for t in targets)
+
+def decode_targets(raw: str) -> list[BoardTarget]:
+    out: list[BoardTarget] = []
+    for line in (raw or "").splitlines():
+        parts = line.split("|", 2)
+        if len(parts) == 3:
+            out.append(BoardTarget(uuid=parts[0], panel=parts[1], label=parts[2]))
+    return out
+
+def to_bucket(res: ResourceRecord) -> Bucket:
+    state = res.state
+    if stale_age(res) is not None:
+        state += "*"
+    mem_mib = res.memory_bytes // (1024 * 1024)
+    return (state, int(res.cpu // CPU_BUCKET) * CPU_BUCKET, (mem_mib // MEM_BUCKET_MIB) * MEM_BUCKET_MIB)
+
+async def fetch_buckets(session: aiohttp.ClientSession, tokens: dict[TargetKey, str], concurrency: int = 10) -> dict[TargetKey, Bucket]:
+    """Fetch resources once per (panel, uuid) and reduce them to display buckets."""
+    sem = asyncio.Semaphore(max(1, concurrency))
+    out: dict[TargetKey, Bucket] = {}
+
+    async def one(key: TargetKey, token: str) -> None:
+        panel, uuid = key
+        async with sem:
+            try:
+                res = await PteroClient(session, panel, token).server_resources(uuid)
+            except Exception as e:
+                out[key] = (f"!{short_error(e)}", None, None)
+                return
+        out[key] = to_bucket(res)
+
+    await asyncio.gather(*(one(k, t) for k, t in tokens.items()))
+    return out
+
+def _fmt_mem(mib: int | None) -> str:
+    if mib is None:
+        return "—"
+    return f"{mib / 1024:.1f}G" if mib >= 1024 else f"{mib}M"
+
+def render_board(board: BoardState, buckets: tuple[Bucket | None, ...]) -> str:
+    lines = [f"{'SERVER':<20} {'STATE':<10} {'CPU':>5} {'MEM':>7}"]
+    for t, b in zip(board.targets, buckets, strict=True):
+        label = t.label if len(t.label) <= 20 else t.label[:19] + "…"
+        if b is None:
+            lines.append(f"{label:<20} {'no key':<10} {'—':>5} {'—':>7}")
+            continue
+        state, cpu, mem = b
+        cpu_s = "—" if cpu is None else f"{cpu}%"
+        lines.append(f"{label:<20} {state[:10]:<10} {cpu_s:>5} {_fmt_mem(mem):>7}")
+    head = f"**{board.title or 'Server status'}** (board #{board.id})"
+    body = head + "\n```\n" + "\n".join(lines) + "\n```"
+    if any(b and b[0].endswith("*") for b in buckets):
+        body += "\n_* last known value, panel unavailable_"
+    return body
@@ -0,0 +1,196 @@
+from __future__ import annotations
+import asyncio, time
+from dataclasses import dataclass, field
+from collections.abc import Awaitable, Callable
+import aiohttp
+from ..client.cache import stale_age
+from ..client.ptero_rest import PteroClient
+from ..client.records import ServerRecord
+from .aliases import aliases
+from .fleet import short_error
+
+POWER_SIGNALS = ("start", "stop", "restart", "kill")
+# as long as the short ids shown everywhere else; "a" must not select every uuid starting with a
+MIN_UUID_PREFIX = 8
+
+@dataclass(slots=True)
+class BulkTarget:
+    label: str
+    uuid: str
+    panel: str
+    token: str = field(repr=False)
+
+@dataclass(slots=True)
+class BulkResult:
+    target: BulkTarget
+    status: str  # "ok" | "failed" | "skipped"
+    detail: str = ""
+    elapsed: float = 0.0
+
+async def select_targets(
+    session: aiohttp.ClientSession,
+    tokens: dict[str, str],
+    *,
+    names: list[str] | None = None,
+    needle: str | None = None,
+    guild_id: int | None = None,
+    whole_panel: bool = False,
+) -> tuple[list[BulkTarget], list[str]]:
+    """Expand aliases / UUIDs / names and a substring filter into concrete targets.
+
+    Returns (targets, unmatched names). One directory listing per panel is
+    fetched concurrently and every name is matched against it. With neither
+    names nor a filter nothing is selected, unless ``whole_panel`` is set:
+    then every server on the given panels is (callers narrow ``tokens`` to
+    the one panel the user named).
+    """
+    panels = list(tokens)
+    listings = await asyncio.gather(
+        *(PteroClient(session, p, tokens[p]).list_servers() for p in panels), return_exceptions=True
+    )
+    directory: list[tuple[str, ServerRecord]] = []
+    for p, servers in zip(panels, listings, strict=True):
+        if isinstance(servers, BaseException):
+            continue
+        directory.extend((p, srv) for srv in servers)
+
+    chosen: dict[tuple[str, str], BulkTarget] = {}
+
+    def add(p: str, srv: ServerRecord, label: str | None = None) -> None:
+        if srv.uuid:
+            chosen.setdefault((p, srv.uuid), BulkTarget(label or srv.name, srv.uuid, p, tokens[p]))
+
+    missing: list[str] = []
+    for name in names or []:
+        entry = aliases.get(guild_id, name)
+        want_uuid = entry.uuid if entry else None
+        want_panel = entry.panel_url if entry else None
+        low = name.lower()
+        hits = [
+            (p, srv) for p, srv in directory
+            if (want_uuid and srv.uuid == want_uuid and (not want_panel or want_panel == p))
+            or (not want_uuid and ((len(name) >= MIN_UUID_PREFIX and srv.uuid.startswith(name))
+                                   or srv.name.lower() == low))
+        ]
+        if not hits:
+            missing.append(name)
+        for p, srv in hits:
+            add(p, srv, name if entry else None)
+
+    if needle:
+        n = needle.strip()
+        for p, srv in directory:
+            if srv.matches(n):
+                add(p, srv)
+    if whole_panel and not names and not needle:
+        for p, srv in directory:
+            add(p, srv)
+    return list(chosen.values()), missing
+
+ProgressCallback = Callable[["BulkRun"], Awaitable[None]]
+
+class BulkRun:
+    """Runs one power signal or console command over many targets.
+
+    ``concurrency`` bounds in-flight requests. With ``batch_size`` the run is
+    rolling: each batch must finish (and, with ``wait_running``, every server
+    in it must report ``running``) before the next starts; a batch that does
+    not come up halts the run and the rest are skipped.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, targets: list[BulkTarget], *, op: str, arg: str,
+                 concurrency: int, batch_size: int = 0, wait_running: bool = False, wait_timeout: float = 300.0):
+        self.session = session
+        self.targets = targets
+        self.op = op
+        self.arg = arg
+        self.concurrency = max(1, concurrency)
+        self.batch_size = batch_size if batch_size > 0 else len(targets) or 1
+        self.wait_running = wait_running
+        self.wait_timeout = wait_timeout
+        self.results: list[BulkResult] = []
+        self.in_flight = 0
+        self.batch_no = 0
+        self.halted = False
+
+    @property
+    def batches(self) -> int:
+        return max(1, -(-len(self.targets) // self.batch_size))
+
+    def count(self, status: str) -> int:
+        return sum(1 for r in self.results if r.status == status)
+
+    def progress_line(self) -> str:
+        verb = self.arg if self.op == "power" else "command"
+        line = f"**{verb}**: {len(self.results)}/{len(self.targets)} done • {self.count('ok')} ok • {self.count('failed')} failed"
+        if self.in_flight:
+            line += f" • {self.in_flight} in flight"
+        if self.batches > 1:
+            line += f" • batch {self.batch_no}/{self.batches}"
+        return line
+
+    async def _send(self, cli: PteroClient, t: BulkTarget) -> None:
+        if self.op == "power":
+            await cli.send_power(t.uuid, self.arg)
+        else:
+            await cli.send_command(t.uuid, self.arg)
+
+    async def _await_running(self, cli: PteroClient, t: BulkTarget, deadline: float) -> bool:
+        delay = 2.0
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            try:
+                res = await cli.server_resources(t.uuid)
+            except Exception:
+                res = None
+            if res is not None and stale_age(res) is None and res.state == "running":
+                return True
+            delay = min(delay * 1.5, 10.0)
+        return False
+
+    async def _one(self, t: BulkTarget, sem: asyncio.Semaphore, on_progress: ProgressCallback | None) -> BulkResult:
+        start = time.monotonic()
+        cli = PteroClient(self.session, t.panel, t.token)
+        async with sem:
+            self.in_flight += 1
+            try:
+                await self._send(cli, t)
+                result = BulkResult(t, "ok", "sent")
+                if self.wait_running:
+                    if await self._await_running(cli, t, start + self.wait_timeout):
+                        result.detail = "running"
+                    else:
+                        result.status, result.detail = "failed", "not running before timeout"
+            except Exception as e:
+                result = BulkResult(t, "failed", short_error(e))
+            finally:
+                self.in_flight -= 1
+        result.elapsed = time.monotonic() - start
+        self.results.append(result)
+        if on_progress:
+            await on_progress(self)
+        return result
+
+    async def run(self, on_progress: ProgressCallback | None = None) -> list[BulkResult]:
+        sem = asyncio.Semaphore(self.concurrency)
+        for i in range(0, len(self.targets), self.batch_size):
+            batch = self.targets[i:i + self.batch_size]
+            if self.halted:
+                self.results.extend(BulkResult(t, "skipped", "halted after failed batch") for t in batch)
+                continue
+            self.batch_no += 1
+            done = await asyncio.gather(*(self._one(t, sem, on_progress) for t in batch))
+            if self.wait_running and self.batches > 1 and any(r.status == "failed" for r in done):
+                self.halted = True
+        if on_progress:
+            await on_progress(self)
+        return self.results
+
+def render_summary(run: BulkRun) -> str:
+    icons = {"ok": "✅", "failed": "❌", "skipped": "⏭"}
+    lines = [run.progress_line()]
+    lines.extend(
+        f"{icons[r.status]} {r.target.label} (`{r.target.uuid[:8]}`) — {r.detail} ({r.elapsed:.1f}s)"
+        for r in sorted(run.results, key=lambda r: (r.status != "failed", r.target.label.lower()))
+    )
+    return "\n".join(lines)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from ..client.records import NodeRecord, ServerColumns
+
+try:
+    import numpy as np
+except ImportError:  # optional: the plain-array path below gives the same numbers
+    np = None
+
+@dataclass(slots=True)
+class Usage:
+    servers: int = 0
+    memory_mib: int = 0
+    disk_mib: int = 0
+    cpu_pct: int = 0
+    unlimited: int = 0  # servers with no memory or disk limit
+
+    def add(self, other: Usage) -> None:
+        self.servers += other.servers
+        self.memory_mib += other.memory_mib
+        self.disk_mib += other.disk_mib
+        self.cpu_pct += other.cpu_pct
+        self.unlimited += other.unlimited
+
+def _limit(size: int, overallocate: int) -> int | None:
+    """What the panel will let a node hand out; None when overallocation is unlimited (-1)."""
+    if overallocate < 0:
+        return None
+    return size * (100 + overallocate) // 100
+
+@dataclass(slots=True)
+class NodeUsage:
+    node_id: int
+    node: NodeRecord | None
+    used: Usage
+
+    @property
+    def name(self) -> str:
+        return self.node.name if self.node else f"node {self.node_id}"
+
+    @property
+    def memory_ratio(self) -> float | None:
+        return self.used.memory_mib / self.node.memory_mib if self.node and self.node.memory_mib else None
+
+    @property
+    def disk_ratio(self) -> float | None:
+        return self.used.disk_mib / self.node.disk_mib if self.node and self.node.disk_mib else None
+
+    @property
+    def overcommit(self) -> float:
+        return max(self.memory_ratio or 0.0, self.disk_ratio or 0.0)
+
+    @property
+    def memory_headroom_mib(self) -> int | None:
+        if self.node is None:
+            return None
+        limit = _limit(self.node.memory_mib, self.node.memory_overallocate)
+        return None if limit is None else limit - self.used.memory_mib
+
+    @property
+    def disk_headroom_mib(self) -> int | None:
+        if self.node is None:
+            return None
+        limit = _limit(self.node.disk_mib, self.node.disk_overallocate)
+        return None if limit is None else limit - self.used.disk_mib
+
+@dataclass(slots=True)
+class GroupTotals:
+    key: int
+    nodes: int
+    used: Usage
+    memory_mib: int  # physical capacity of the group's nodes
+    disk_mib: int
+
+    @property
+    def memory_ratio(self) -> float | None:
+        return self.used.memory_mib / self.memory_mib if self.memory_mib else None
+
+    @property
+    def disk_ratio(self) -> float | None:
+        return self.used.disk_mib / self.disk_mib if self.disk_mib else None
+
+@dataclass(slots=True)
+class CapacityReport:
+    nodes: list[NodeUsage]
+    locations: list[GroupTotals]
+    estate: GroupTotals
+
+    def most_overcommitted(self, n: int) -> list[NodeUsage]:
+        known = [u for u in self.nodes if u.node is not None]
+        return sorted(known, key=lambda u: u.overcommit, reverse=True)[:n]
+
+    def most_headroom(self, n: int) -> list[NodeUsage]:
+        free = [u for u in self.nodes if u.memory_headroom_mib is not None and not u.node.maintenance]
+        return sorted(free, key=lambda u: u.memory_headroom_mib, reverse=True)[:n]
+
+def _group_numpy(cols: ServerColumns) -> dict[int, Usage]:
+    node = np.frombuffer(cols.node_id, dtype=np.int64)
+    mem = np.frombuffer(cols.memory, dtype=np.int64)
+    disk = np.frombuffer(cols.disk, dtype=np.int64)
+    cpu = np.frombuffer(cols.cpu, dtype=np.int64)
+    keys, idx = np.unique(node, return_inverse=True)
+    k = len(keys)
+    count = np.bincount(idx, minlength=k)
+    mem_sum = np.bincount(idx, weights=mem, minlength=k)
+    disk_sum = np.bincount(idx, weights=disk, minlength=k)
+    cpu_sum = np.bincount(idx, weights=cpu, minlength=k)
+    unlimited = np.bincount(idx, weights=((mem == 0) | (disk == 0)), minlength=k)
+    return {
+        int(keys[i]): Usage(int(count[i]), int(mem_sum[i]), int(disk_sum[i]), int(cpu_sum[i]), int(unlimited[i]))
+        for i in range(k)
+    }
+
+def _group_plain(cols: ServerColumns) -> dict[int, Usage]:
+    out: dict[int, Usage] = {}
+    for node_id, mem, disk, cpu in zip(cols.node_id, cols.memory, cols.disk, cols.cpu, strict=True):
+        u = out.get(node_id)
+        if u is None:
+            u = out[node_id] = Usage()
+        u.servers += 1
+        u.memory_mib += mem
+        u.disk_mib += disk
+        u.cpu_pct += cpu
+        if not mem or not disk:
+            u.unlimited += 1
+    return out
+
+def group_by_node(cols: ServerColumns, vectorized: bool | None = None) -> dict[int, Usage]:
+    if vectorized is None:
+        vectorized = np is not None
+    return _group_numpy(cols) if vectorized and np is not None else _group_plain(cols)
+
+def capacity_report(cols: ServerColumns, nodes: list[NodeRecord], vectorized: bool | None = None) -> CapacityReport:
+    by_id = {n.id: n for n in nodes}
+    per_node = group_by_node(cols, vectorized)
+    usage = [NodeUsage(n.id, n, per_node.get(n.id) or Usage()) for n in nodes]
+    usage += [NodeUsage(node_id, None, u) for node_id, u in per_node.items() if node_id not in by_id]
+
+    locations: dict[int, GroupTotals] = {}
+    estate = GroupTotals(0, 0, Usage(), 0, 0)
+    for u in usage:
+        loc_id = u.node.location_id if u.node else 0
+        g = locations.get(loc_id)
+        if g is None:
+            g = locations[loc_id] = GroupTotals(loc_id, 0, Usage(), 0, 0)
+        for t in (g, estate):
+            t.used.add(u.used)
+            if u.node:
+                t.nodes += 1
+                t.memory_mib += u.node.memory_mib
+                t.disk_mib += u.node.disk_mib
+    return CapacityReport(usage, sorted(locations.values(), key=lambda g: g.key), estate)
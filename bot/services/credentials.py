@@ -1,13 +1,74 @@
 from __future__ import annotations
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import datetime, timezone
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..db.models import UserCredential
 from ..crypto import encrypt_token, decrypt_token, fingerprint
 from ..config import settings
+from ..core.executor import offload
+from .invalidation import invalidation
 
 TZUTC = timezone.utc
 
+# last_used_at drives purge_old_credentials, so cache hits still refresh it, at most this often (seconds).
+TOUCH_INTERVAL = 3600.0
+
+# Decrypted tokens, kept in process memory only (never persisted or snapshotted).
+# (user_id, panel_url) -> (expires, token, credential id, last touched)
+_token_cache: dict[tuple[int, str], tuple[float, str, int, float]] = {}
+
+def _cached_token(user_id: int, panel_url: str) -> str | None:
+    hit = _token_cache.get((user_id, panel_url))
+    if hit is None or hit[0] < time.monotonic():
+        return None
+    return hit[1]
+
+def _due_touch(user_id: int, panel_url: str) -> int | None:
+    """Credential id behind a cache hit if its last_used_at is due a refresh (and mark it refreshed)."""
+    key = (user_id, panel_url)
+    hit = _token_cache.get(key)
+    now = time.monotonic()
+    if hit is None or now - hit[3] < TOUCH_INTERVAL:
+        return None
+    _token_cache[key] = (hit[0], hit[1], hit[2], now)
+    return hit[2]
+
+async def _touch(s: AsyncSession, cred_ids: list[int]) -> None:
+    if not cred_ids:
+        return
+    await s.execute(update(UserCredential).where(UserCredential.id.in_(cred_ids))
+                    .values(last_used_at=_to_naive_utc(datetime.utcnow())))
+    await s.commit()
+
+def _remember_token(user_id: int, panel_url: str, token: str, cred_id: int) -> None:
+    now = time.monotonic()
+    _token_cache[(user_id, panel_url)] = (now + settings.token_cache_ttl_seconds, token, cred_id, now)
+
+def forget_tokens(user_id: int | None = None, panel_url: str | None = None) -> None:
+    """Drop cached tokens for a user (optionally one panel); no arguments clears everything."""
+    if user_id is None:
+        _token_cache.clear()
+        return
+    for key in [k for k in _token_cache if k[0] == user_id and (panel_url is None or k[1] == panel_url)]:
+        del _token_cache[key]
+
+def _changed(user_id: int | None = None, panel_url: str | None = None) -> None:
+    forget_tokens(user_id, panel_url)
+    invalidation.publish("tok", user_id, panel_url)
+
+async def _on_tokens_changed(key: list) -> None:
+    forget_tokens(*key)
+
+async def _forget_all() -> None:
+    forget_tokens()
+
+invalidation.subscribe("tok", _on_tokens_changed)
+invalidation.on_resync(_forget_all)
+
+def _decrypt_many(items: list[tuple[int, str, str]]) -> list[str]:
+    return [decrypt_token(uid, panel, ct) for uid, panel, ct in items]
+
 def _to_naive_utc(dt: datetime | None) -> datetime | None:
     if dt is None:
         return None
@@ -38,6 +99,7 @@ async def add_or_update_credential(s: AsyncSession, discord_user_id: int, panel_
     )
     s.add(cred)
     await s.commit()
+    _changed(discord_user_id, panel_url)
     return cred
 
 async def list_user_credentials(s: AsyncSession, user_id: int):
@@ -56,6 +118,7 @@ async def set_default_credential(s: AsyncSession, user_id: int, panel_url: str,
         return 0
     cred.is_default = True
     await s.commit()
+    _changed(user_id, panel_url)
     return 1
 
 async def delete_credential(s: AsyncSession, user_id: int, panel_url: str, label: str | None) -> int:
@@ -68,6 +131,7 @@ async def delete_credential(s: AsyncSession, user_id: int, panel_url: str, label
             return 0
         await s.delete(cred)
         await s.commit()
+        _changed(user_id, panel_url)
         return 1
     else:
         res = await s.execute(select(UserCredential).where(
@@ -78,6 +142,7 @@ async def delete_credential(s: AsyncSession, user_id: int, panel_url: str, label
             return 0
         await s.delete(cred)
         await s.commit()
+        _changed(user_id, panel_url)
         return 1
 
 async def wipe_user_credentials(s: AsyncSession, user_id: int) -> int:
@@ -87,6 +152,7 @@ async def wipe_user_credentials(s: AsyncSession, user_id: int) -> int:
     for c in creds:
         await s.delete(c)
     await s.commit()
+    _changed(user_id)
     return count
 
 async def wipe_all_credentials(s: AsyncSession) -> int:
@@ -96,10 +162,16 @@ async def wipe_all_credentials(s: AsyncSession) -> int:
     for c in creds:
         await s.delete(c)
     await s.commit()
+    _changed()
     return count
 
 async def get_user_token(s: AsyncSession, user_id: int, panel_url: str, prefer_label: str | None = None) -> str | None:
-    from sqlalchemy import select
+    if not prefer_label:
+        cached = _cached_token(user_id, panel_url)
+        if cached is not None:
+            cred_id = _due_touch(user_id, panel_url)
+            await _touch(s, [cred_id] if cred_id is not None else [])
+            return cached
     q = select(UserCredential).where(
         (UserCredential.discord_user_id == user_id) & (UserCredential.panel_url == panel_url)
     )
@@ -116,7 +188,50 @@ async def get_user_token(s: AsyncSession, user_id: int, panel_url: str, prefer_l
         chosen = next((r for r in rows if r.is_default), rows[0])
     chosen.last_used_at = _to_naive_utc(datetime.utcnow())
     await s.commit()
-    return decrypt_token(user_id, panel_url, chosen.ciphertext_b64)
+    token = decrypt_token(user_id, panel_url, chosen.ciphertext_b64)
+    if not prefer_label:
+        _remember_token(user_id, panel_url, token, chosen.id)
+    return token
+
+async def get_user_tokens(s: AsyncSession, user_id: int, panels: list[str] | None = None) -> dict[str, str]:
+    """Default token per panel for ``user_id`` (all linked panels unless ``panels`` is given).
+
+    Cache misses are loaded in one query and decrypted as a batch, off the
+    event loop once the batch is large enough to matter.
+    """
+    out: dict[str, str] = {}
+    if panels is not None:
+        due: list[int] = []
+        for p in panels:
+            cached = _cached_token(user_id, p)
+            if cached is not None:
+                out[p] = cached
+                cred_id = _due_touch(user_id, p)
+                if cred_id is not None:
+                    due.append(cred_id)
+        await _touch(s, due)
+        if len(out) == len(panels):
+            return out
+    q = select(UserCredential).where(UserCredential.discord_user_id == user_id)
+    if panels is not None:
+        q = q.where(UserCredential.panel_url.in_([p for p in panels if p not in out]))
+    rows = (await s.execute(q)).scalars().all()
+    chosen: dict[str, UserCredential] = {}
+    for r in rows:
+        if r.panel_url not in chosen or (r.is_default and not chosen[r.panel_url].is_default):
+            chosen[r.panel_url] = r
+    if not chosen:
+        return out
+    now = _to_naive_utc(datetime.utcnow())
+    for r in chosen.values():
+        r.last_used_at = now
+    await s.commit()
+    items = [(user_id, p, r.ciphertext_b64) for p, r in chosen.items()]
+    tokens = await offload(_decrypt_many, items, size=len(items), threshold=settings.offload_decrypt_batch)
+    for (_, p, _), tok in zip(items, tokens, strict=True):
+        _remember_token(user_id, p, tok, chosen[p].id)
+        out[p] = tok
+    return out
 
 async def purge_old_credentials(s: AsyncSession, days: int) -> int:
     cutoff = datetime.utcnow()
@@ -134,4 +249,6 @@ async def purge_old_credentials(s: AsyncSession, days: int) -> int:
     for r in to_delete:
         await s.delete(r)
     await s.commit()
+    for r in to_delete:
+        _changed(r.discord_user_id, r.panel_url)
     return len(to_delete)
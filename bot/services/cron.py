@@ -0,0 +1,90 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+MACROS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+_BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+@dataclass(slots=True, frozen=True)
+class CronSpec:
+    minutes: tuple[int, ...]
+    hours: tuple[int, ...]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]  # 0 = Sunday
+    dom_any: bool
+    dow_any: bool
+
+def _field(raw: str, lo: int, hi: int) -> set[int]:
+    out: set[int] = set()
+    for part in raw.split(","):
+        step = 1
+        if "/" in part:
+            part, s = part.split("/", 1)
+            step = int(s)
+            if step <= 0:
+                raise ValueError("cron step must be positive")
+        if part in ("*", ""):
+            a, b = lo, hi
+        elif "-" in part:
+            x, y = part.split("-", 1)
+            a, b = int(x), int(y)
+        else:
+            a = int(part)
+            b = hi if step > 1 else a
+        if a < lo or b > hi or a > b:
+            raise ValueError(f"cron value out of range {lo}-{hi}: {part}")
+        out.update(range(a, b + 1, step))
+    return out
+
+def parse_cron(expr: str) -> CronSpec:
+    """Parse a 5-field cron expression (minute hour day month weekday) or an @macro."""
+    expr = MACROS.get(expr.strip().lower(), expr.strip())
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ValueError("cron needs 5 fields: minute hour day month weekday")
+    parsed = [_field(f, lo, hi + (1 if i == 4 else 0)) for i, (f, (lo, hi)) in enumerate(zip(fields, _BOUNDS, strict=True))]
+    weekdays = {d % 7 for d in parsed[4]}  # allow 7 for Sunday
+    return CronSpec(
+        minutes=tuple(sorted(parsed[0])),
+        hours=tuple(sorted(parsed[1])),
+        days=frozenset(parsed[2]),
+        months=frozenset(parsed[3]),
+        weekdays=frozenset(weekdays),
+        dom_any=fields[2].startswith("*"),
+        dow_any=fields[4].startswith("*"),
+    )
+
+def _day_matches(spec: CronSpec, d: datetime) -> bool:
+    if d.month not in spec.months:
+        return False
+    dom = d.day in spec.days
+    dow = (d.isoweekday() % 7) in spec.weekdays
+    if spec.dom_any and spec.dow_any:
+        return True
+    if spec.dom_any:
+        return dow
+    if spec.dow_any:
+        return dom
+    return dom or dow  # classic cron: either restricted field may match
+
+def next_fire(spec: CronSpec, after: datetime) -> datetime:
+    """First minute strictly after ``after`` that matches ``spec`` (naive datetimes)."""
+    start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    day = start.replace(hour=0, minute=0)
+    for _ in range(366 * 5):
+        if _day_matches(spec, day):
+            for h in spec.hours:
+                for m in spec.minutes:
+                    cand = day.replace(hour=h, minute=m)
+                    if cand >= start:
+                        return cand
+        day += timedelta(days=1)
+    raise ValueError("cron expression never fires")
@@ -0,0 +1,119 @@
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass
+import aiohttp
+from yarl import URL
+from ..client.cache import stale_age
+from ..client.ptero_rest import PteroClient
+from ..client.records import ServerRecord
+
+SORT_KEYS = ("cpu", "memory", "state", "name")
+
+@dataclass(slots=True)
+class FleetRow:
+    name: str
+    uuid: str
+    panel: str
+    node: str | None = None
+    state: str = "unknown"
+    cpu: float | None = None
+    cpu_limit: int = 0
+    memory_bytes: int | None = None
+    memory_limit_mib: int = 0
+    error: str | None = None
+    stale: bool = False
+
+def short_error(e: BaseException) -> str:
+    if isinstance(e, aiohttp.ClientResponseError):
+        return f"HTTP {e.status}"
+    if isinstance(e, asyncio.TimeoutError):
+        return "timeout"
+    msg = str(e) or type(e).__name__
+    return msg[:40]
+
+def _row_from_server(srv: ServerRecord, panel: str) -> FleetRow:
+    return FleetRow(
+        name=srv.name,
+        uuid=srv.uuid,
+        panel=panel,
+        node=srv.node,
+        cpu_limit=srv.cpu_pct,
+        memory_limit_mib=srv.memory_mib,
+    )
+
+async def _fill_resources(cli: PteroClient, row: FleetRow, sem: asyncio.Semaphore) -> None:
+    async with sem:
+        try:
+            res = await cli.server_resources(row.uuid, allow_warm=True)
+        except Exception as e:
+            row.state = "error"
+            row.error = short_error(e)
+            return
+    row.stale = stale_age(res) is not None
+    row.state = res.state
+    row.cpu = res.cpu
+    row.memory_bytes = res.memory_bytes
+
+async def _gather_panel(session: aiohttp.ClientSession, panel: str, token: str, needle: str | None, concurrency: int) -> list[FleetRow]:
+    cli = PteroClient(session, panel, token)
+    try:
+        servers = await cli.list_servers(allow_warm=True)
+    except Exception as e:
+        return [FleetRow(name="(panel unreachable)", uuid="", panel=panel, state="error", error=short_error(e))]
+    if needle:
+        servers = [s for s in servers if s.matches(needle)]
+    rows = [_row_from_server(s, panel) for s in servers]
+    sem = asyncio.Semaphore(max(1, concurrency))
+    await asyncio.gather(*(_fill_resources(cli, row, sem) for row in rows))
+    return rows
+
+async def gather_fleet(session: aiohttp.ClientSession, tokens: dict[str, str], needle: str | None = None, concurrency: int = 10) -> list[FleetRow]:
+    """Collect resources for every server visible through ``tokens`` (panel_url -> token).
+
+    Panels are crawled in parallel and each panel gets its own bound of
+    ``concurrency`` in-flight resource requests, so wall time tracks the
+    slowest panel rather than the sum of all of them.
+    """
+    needle = needle.strip() if needle else None
+    per_panel = await asyncio.gather(*(
+        _gather_panel(session, p, t, needle, concurrency) for p, t in tokens.items()
+    ))
+    return [row for rows in per_panel for row in rows]
+
+def sort_rows(rows: list[FleetRow], key: str) -> list[FleetRow]:
+    if key == "cpu":
+        return sorted(rows, key=lambda r: (r.cpu is None, -(r.cpu or 0.0), r.name.lower()))
+    if key == "memory":
+        return sorted(rows, key=lambda r: (r.memory_bytes is None, -(r.memory_bytes or 0), r.name.lower()))
+    if key == "state":
+        return sorted(rows, key=lambda r: (r.error is not None, r.state, r.name.lower()))
+    return sorted(rows, key=lambda r: r.name.lower())
+
+def _clip(s: str, n: int) -> str:
+    return s if len(s) <= n else s[: n - 1] + "…"
+
+def _fmt_mem(b: int | None) -> str:
+    if b is None:
+        return "—"
+    mib = b / 1024 / 1024
+    return f"{mib / 1024:.1f}G" if mib >= 1024 else f"{mib:.0f}M"
+
+def render_rows(rows: list[FleetRow]) -> str:
+    lines = [f"{'NAME':<20} {'STATE':<10} {'CPU':>6} {'MEM':>7}  PANEL"]
+    for r in rows:
+        host = URL(r.panel).host or r.panel
+        if r.error:
+            state, cpu, mem = _clip(f"!{r.error}", 10), "—", "—"
+        else:
+            state = _clip(r.state + ("*" if r.stale else ""), 10)
+            cpu = "—" if r.cpu is None else f"{r.cpu:.0f}%"
+            mem = _fmt_mem(r.memory_bytes)
+        lines.append(f"{_clip(r.name, 20):<20} {state:<10} {cpu:>6} {mem:>7}  {_clip(host, 24)}")
+    return "```\n" + "\n".join(lines) + "\n```"
+
+def summarize(rows: list[FleetRow]) -> str:
+    running = sum(1 for r in rows if r.state == "running")
+    errors = sum(1 for r in rows if r.error)
+    stale = sum(1 for r in rows if r.stale)
+    out = f"{len(rows)} server(s) • {running} running • {errors} error(s)"
+    return out + (f" • {stale} stale* (cached: panel unavailable or refreshing)" if stale else "")
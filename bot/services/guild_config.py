@@ -0,0 +1,120 @@
+from __future__ import annotations
+from dataclasses import dataclass, field, replace
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..db import SessionLocal
+from ..db.models import GuildConfig
+from .invalidation import invalidation
+
+_UNSET = object()
+
+@dataclass(slots=True, frozen=True)
+class GuildSettings:
+    """Effective per-guild settings; ``overrides`` names the fields set on the guild itself."""
+    guild_id: int | None
+    admin_role_ids: frozenset[int]
+    log_channel_id: int | None
+    alert_channel_id: int | None
+    overrides: frozenset[str] = field(default_factory=frozenset)
+
+def parse_role_ids(raw: str | None) -> frozenset[int]:
+    out: set[int] = set()
+    for p in (raw or "").split(","):
+        p = p.strip()
+        if p.isdigit():
+            out.add(int(p))
+    return frozenset(out)
+
+def _defaults() -> GuildSettings:
+    return GuildSettings(
+        guild_id=None,
+        admin_role_ids=frozenset(settings.admin_role_ids),
+        log_channel_id=settings.log_channel_id,
+        alert_channel_id=settings.alert_channel_id,
+    )
+
+class GuildConfigCache:
+    """Write-through cache of ``GuildConfig`` rows, parsed once per write.
+
+    Unknown guilds resolve to the global settings from the environment, as
+    do the admin roles of a guild that never set any (``NULL``); an empty
+    string is an explicit "no roles".
+    """
+
+    def __init__(self):
+        self._by_guild: dict[int, GuildSettings] = {}
+        self._default: GuildSettings | None = None
+
+    @property
+    def default(self) -> GuildSettings:
+        if self._default is None:
+            self._default = _defaults()
+        return self._default
+
+    def _from_row(self, row: GuildConfig) -> GuildSettings:
+        d = self.default
+        roles = parse_role_ids(row.admin_role_ids)
+        overrides = {name for name, v in (
+            ("admin_role_ids", row.admin_role_ids is not None),
+            ("log_channel_id", row.log_channel_id),
+            ("alert_channel_id", row.alert_channel_id),
+        ) if v}
+        return GuildSettings(
+            guild_id=row.guild_id,
+            admin_role_ids=d.admin_role_ids if row.admin_role_ids is None else roles,
+            log_channel_id=row.log_channel_id or d.log_channel_id,
+            alert_channel_id=row.alert_channel_id or d.alert_channel_id,
+            overrides=frozenset(overrides),
+        )
+
+    async def load(self, s: AsyncSession) -> int:
+        rows = (await s.execute(select(GuildConfig))).scalars().all()
+        self._by_guild = {r.guild_id: self._from_row(r) for r in rows}
+        return len(rows)
+
+    async def refresh(self, s: AsyncSession, guild_id: int) -> GuildSettings:
+        row = (await s.execute(select(GuildConfig).where(GuildConfig.guild_id == guild_id))).scalar_one_or_none()
+        if row is None:
+            self._by_guild.pop(guild_id, None)
+            return self.get(guild_id)
+        cfg = self._by_guild[guild_id] = self._from_row(row)
+        return cfg
+
+    def get(self, guild_id: int | None) -> GuildSettings:
+        if guild_id is None:
+            return self.default
+        cfg = self._by_guild.get(guild_id)
+        return cfg if cfg is not None else replace(self.default, guild_id=guild_id)
+
+    def evict(self, guild_id: int) -> None:
+        self._by_guild.pop(guild_id, None)
+
+    async def update(self, s: AsyncSession, guild_id: int, *, admin_role_ids=_UNSET, log_channel_id=_UNSET, alert_channel_id=_UNSET) -> GuildSettings:
+        row = (await s.execute(select(GuildConfig).where(GuildConfig.guild_id == guild_id))).scalar_one_or_none()
+        if row is None:
+            row = GuildConfig(guild_id=guild_id)
+            s.add(row)
+        if admin_role_ids is not _UNSET:
+            row.admin_role_ids = ",".join(str(r) for r in sorted(admin_role_ids))
+        if log_channel_id is not _UNSET:
+            row.log_channel_id = log_channel_id
+        if alert_channel_id is not _UNSET:
+            row.alert_channel_id = alert_channel_id
+        await s.commit()
+        cfg = self._by_guild[guild_id] = self._from_row(row)
+        invalidation.publish("guild", guild_id)
+        return cfg
+
+guild_configs = GuildConfigCache()
+
+async def _on_guild_changed(key: list) -> None:
+    async with SessionLocal() as s:
+        await guild_configs.refresh(s, key[0])
+
+async def _reload_guild_configs() -> None:
+    async with SessionLocal() as s:
+        await guild_configs.load(s)
+
+invalidation.subscribe("guild", _on_guild_changed)
+invalidation.on_resync(_reload_guild_configs)
@@ -0,0 +1,173 @@
+from __future__ import annotations
+import asyncio, json, os
+from collections.abc import Awaitable, Callable
+from typing import Any
+import structlog
+from sqlalchemy.engine import make_url
+from ..config import settings
+
+log = structlog.get_logger()
+
+CHANNEL = "jexpanel_invalidate"
+
+Handler = Callable[[list[Any]], Awaitable[None]]
+Resync = Callable[[], Awaitable[None]]
+
+class InvalidationBus:
+    """Cross-process cache invalidation over Postgres LISTEN/NOTIFY.
+
+    Writers call ``publish(kind, *key)`` after committing; it never blocks.
+    Every process keeps one dedicated asyncpg connection that LISTENs and
+    runs the handler registered for ``kind``, which evicts or reloads only
+    that key. Our own messages are skipped (the local cache was already
+    updated by the write). If the connection drops, messages may have been
+    missed, so every resync hook runs after reconnecting, and the same
+    hooks also run every ``cache_ttl_seconds`` as a safety net.
+
+    In ``local`` mode (default for SQLite) nothing is sent or listened
+    for: a single process updates its caches in place on every write.
+    """
+
+    def __init__(self):
+        self.origin = os.urandom(4).hex()
+        self._handlers: dict[str, Handler] = {}
+        self._resync: list[Resync] = []
+        self._outbox: asyncio.Queue[str] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._conn: Any = None
+        self.mode = "local"
+        self.sent = 0
+        self.received = 0
+        self.applied = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.dropped = 0
+
+    def subscribe(self, kind: str, handler: Handler) -> None:
+        self._handlers[kind] = handler
+
+    def on_resync(self, hook: Resync) -> None:
+        self._resync.append(hook)
+
+    def publish(self, kind: str, *key: Any) -> None:
+        if self._outbox is None:
+            return
+        payload = json.dumps([self.origin, kind, *key], separators=(",", ":"))
+        try:
+            self._outbox.put_nowait(payload)
+        except asyncio.QueueFull:
+            # the TTL resync covers whatever was not announced
+            self.dropped += 1
+
+    def _resolve_mode(self) -> str:
+        mode = settings.invalidation_mode.lower()
+        if mode == "auto":
+            return "notify" if make_url(settings.database_url).get_backend_name() == "postgresql" else "local"
+        return mode
+
+    async def start(self) -> None:
+        self.mode = self._resolve_mode()
+        if self.mode != "notify":
+            log.info("invalidation_mode", mode=self.mode)
+            return
+        self._outbox = asyncio.Queue(maxsize=1000)
+        self._tasks = [
+            asyncio.create_task(self._listen_loop(), name="invalidation-listen"),
+            asyncio.create_task(self._ttl_loop(), name="invalidation-ttl"),
+        ]
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    def _dsn(self) -> str:
+        url = make_url(settings.database_url).set(drivername="postgresql")
+        return url.render_as_string(hide_password=False)
+
+    async def _listen_loop(self) -> None:
+        import asyncpg
+
+        backoff = 1.0
+        first = True
+        while True:
+            try:
+                self._conn = await asyncpg.connect(self._dsn())
+                await self._conn.add_listener(CHANNEL, self._on_notify)
+                log.info("invalidation_listening", channel=CHANNEL)
+                if not first:
+                    self.reconnects += 1
+                    await self._run_resync()
+                first = False
+                backoff = 1.0
+                while not self._conn.is_closed():
+                    try:
+                        payload = await asyncio.wait_for(self._outbox.get(), timeout=5.0)
+                    except TimeoutError:
+                        await self._conn.execute("SELECT 1")  # notices a dead connection
+                        continue
+                    await self._conn.execute("SELECT pg_notify($1, $2)", CHANNEL, payload)
+                    self.sent += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                log.warning("invalidation_connection_error", error=str(e)[:200])
+            if self._conn is not None:
+                try:
+                    await self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        self.received += 1
+        try:
+            origin, kind, *key = json.loads(payload)
+        except (ValueError, TypeError):
+            return
+        if origin == self.origin:
+            return
+        handler = self._handlers.get(kind)
+        if handler is not None:
+            asyncio.get_running_loop().create_task(self._apply(kind, handler, key))
+
+    async def _apply(self, kind: str, handler: Handler, key: list[Any]) -> None:
+        try:
+            await handler(key)
+            self.applied += 1
+        except Exception as e:
+            self.errors += 1
+            log.warning("invalidation_apply_error", kind=kind, error=str(e)[:200])
+
+    async def _run_resync(self) -> None:
+        for hook in self._resync:
+            try:
+                await hook()
+            except Exception as e:
+                log.warning("invalidation_resync_error", error=str(e)[:200])
+
+    async def _ttl_loop(self) -> None:
+        while True:
+            await asyncio.sleep(max(30.0, settings.cache_ttl_seconds))
+            await self._run_resync()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "connected": self._conn is not None and not self._conn.is_closed(),
+            "sent": self.sent,
+            "received": self.received,
+            "applied": self.applied,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+        }
+
+invalidation = InvalidationBus()
@@ -0,0 +1,161 @@
+from __future__ import annotations
+import asyncio, gzip, json, os, sys, time
+from dataclasses import fields
+from pathlib import Path
+from typing import Any
+import structlog
+from ..client.cache import ResponseCache, panel_cache
+from ..client.records import AllocationRecord, BackupRecord, NodeRecord, ResourceRecord, ServerRecord
+from ..config import settings
+from ..core.executor import thread_pool
+
+log = structlog.get_logger()
+
+# Bump when the entry layout or a record's field list changes; older files are ignored.
+VERSION = 2
+
+RECORD_TYPES = {c.__name__: c for c in (ServerRecord, ResourceRecord, BackupRecord, NodeRecord, AllocationRecord)}
+_FIELDS = {name: tuple(f.name for f in fields(c)) for name, c in RECORD_TYPES.items()}
+
+# Never persisted: short-lived signed URLs and console credentials.
+SKIP_PATHS = ("/websocket", "/files/")
+
+def _encode(value: Any) -> Any:
+    """Record lists become ``{"$r": type, "rows": [...]}``, a single record
+    ``{"$r1": type, "row": [...]}``; plain JSON passes through."""
+    if isinstance(value, list) and value and type(value[0]).__name__ in RECORD_TYPES:
+        name = type(value[0]).__name__
+        names = _FIELDS[name]
+        return {"$r": name, "rows": [[getattr(r, n) for n in names] for r in value]}
+    if type(value).__name__ in RECORD_TYPES:
+        name = type(value).__name__
+        return {"$r1": name, "row": [getattr(value, n) for n in _FIELDS[name]]}
+    if isinstance(value, (list, dict)):
+        return value
+    raise TypeError(f"cannot snapshot {type(value).__name__}")
+
+def _row(cls: type, row: list[Any]) -> Any:
+    return cls(*[sys.intern(v) if isinstance(v, str) else v for v in row])
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict) and "$r" in value:
+        cls = RECORD_TYPES[value["$r"]]
+        return [_row(cls, row) for row in value["rows"]]
+    if isinstance(value, dict) and "$r1" in value:
+        return _row(RECORD_TYPES[value["$r1"]], value["row"])
+    return value
+
+def dump(entries: list[tuple[tuple[str, str, str], float, Any]], path: Path) -> int:
+    rows = []
+    for (host, fp, key_path), stored_at, value in entries:
+        if any(s in key_path for s in SKIP_PATHS):
+            continue
+        try:
+            rows.append([host, fp, key_path, stored_at, _encode(value)])
+        except TypeError:
+            continue
+    raw = json.dumps({"v": VERSION, "written_at": time.time(), "entries": rows}, separators=(",", ":"))
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(gzip.compress(raw.encode("utf-8"), compresslevel=6))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)  # readers only ever see a complete file
+    return len(rows)
+
+def load(path: Path, max_age: float) -> list[tuple[tuple[str, str, str], float, Any]]:
+    with open(path, "rb") as f:
+        doc = json.loads(gzip.decompress(f.read()))
+    if doc.get("v") != VERSION:
+        raise ValueError(f"snapshot version {doc.get('v')} != {VERSION}")
+    cutoff = time.time() - max_age
+    out = []
+    for host, fp, key_path, stored_at, value in doc.get("entries", []):
+        if stored_at >= cutoff:
+            out.append(((host, fp, key_path), stored_at, _decode(value)))
+    return out
+
+class CacheSnapshot:
+    """Persists the panel response cache (server directories, details,
+    resources, backup lists, node inventory) so a restart starts warm.
+
+    Restored entries are served as stale until the revalidator replaces them.
+    Only what the cache already holds is written: keys carry the token
+    fingerprint, never a token. The alias map is not included; it is DB-backed
+    and loaded in one query at startup.
+    """
+
+    def __init__(self, cache: ResponseCache, path: str):
+        self.cache = cache
+        self.path = Path(path) if path else None
+        self._task: asyncio.Task | None = None
+        self._restored = False  # never overwrite the file before it has been read
+        self.loaded = 0
+        self.written = 0
+        self.last_write: float | None = None
+        self.errors = 0
+
+    def _usable(self) -> bool:
+        return self.path is not None and self.path.parent.is_dir()
+
+    def start(self) -> None:
+        if not self._usable():
+            log.info("snapshot_disabled", path=str(self.path or ""))
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="cache-snapshot")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            await self.save()
+
+    async def _run(self) -> None:
+        await self.restore()
+        while True:
+            await asyncio.sleep(max(30.0, settings.snapshot_interval_seconds))
+            await self.save()
+
+    async def restore(self) -> int:
+        if not self.path.exists():
+            self._restored = True
+            return 0
+        try:
+            entries = await thread_pool.run(load, self.path, settings.snapshot_max_age_seconds)
+        except Exception as e:
+            self.errors += 1
+            self._restored = True  # unreadable: the next save replaces it
+            log.warning("snapshot_load_error", path=str(self.path), error=str(e)[:200])
+            return 0
+        self._restored = True
+        for key, stored_at, value in entries:
+            self.cache.restore(key, stored_at, value)
+        self.loaded = len(entries)
+        log.info("snapshot_loaded", entries=self.loaded)
+        return self.loaded
+
+    async def save(self) -> int:
+        if not self._restored or not self._usable():
+            return 0
+        entries = list(self.cache.items())
+        try:
+            n = await thread_pool.run(dump, entries, self.path)
+        except Exception as e:
+            self.errors += 1
+            log.warning("snapshot_write_error", path=str(self.path), error=str(e)[:200])
+            return 0
+        self.written = n
+        self.last_write = time.time()
+        return n
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "written": self.written,
+            "last_write_age": round(time.time() - self.last_write, 1) if self.last_write else None,
+            "errors": self.errors,
+        }
+
+cache_snapshot = CacheSnapshot(panel_cache, settings.snapshot_path)
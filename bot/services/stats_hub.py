@@ -0,0 +1,234 @@
+from __future__ import annotations
+import asyncio, json, time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Any, Generic, TypeVar
+import aiohttp
+import structlog
+from ..client.ptero_rest import PteroClient
+from ..client.ptero_ws import _auth, _dial
+from ..config import settings
+from ..db import SessionLocal
+from .credentials import get_user_token
+
+log = structlog.get_logger()
+
+T = TypeVar("T")
+# (user_id, panel_url, uuid): a stream runs on its owner's token, so it is never shared across users
+StreamKey = tuple[int, str, str]
+
+class DropOldestQueue(Generic[T]):
+    """Bounded queue whose producer never waits: when full the oldest entry is dropped."""
+
+    def __init__(self, maxsize: int):
+        self._buf: deque[T] = deque(maxlen=max(1, maxsize))
+        self._ready = asyncio.Event()
+        self.dropped = 0
+
+    def put_nowait(self, item: T) -> None:
+        if len(self._buf) == self._buf.maxlen:
+            self.dropped += 1
+        self._buf.append(item)
+        self._ready.set()
+
+    async def get(self) -> T:
+        while not self._buf:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._buf.popleft()
+
+    def latest(self) -> T | None:
+        """Discard everything queued and return only the newest item (for consumers that render snapshots)."""
+        item = self._buf[-1] if self._buf else None
+        self._buf.clear()
+        return item
+
+    def __len__(self) -> int:
+        return len(self._buf)
+
+@dataclass(slots=True)
+class StatsEvent:
+    panel: str
+    uuid: str
+    kind: str  # "stats" | "status"
+    ts: float
+    state: str | None = None
+    cpu: float | None = None
+    memory_bytes: int | None = None
+    memory_limit_bytes: int | None = None
+    disk_bytes: int | None = None
+    rx_bytes: int | None = None
+    tx_bytes: int | None = None
+    uptime_ms: int | None = None
+
+def parse_event(panel: str, uuid: str, data: dict[str, Any]) -> StatsEvent | None:
+    ev = data.get("event")
+    arg = (data.get("args") or [None])[0]
+    if ev == "status":
+        return StatsEvent(panel, uuid, "status", time.time(), state=str(arg))
+    if ev != "stats" or arg is None:
+        return None
+    s = json.loads(arg) if isinstance(arg, str) else arg
+    net = s.get("network") or {}
+    return StatsEvent(
+        panel, uuid, "stats", time.time(),
+        state=s.get("state"),
+        cpu=float(s.get("cpu_absolute") or 0.0),
+        memory_bytes=int(s.get("memory_bytes") or 0),
+        memory_limit_bytes=int(s.get("memory_limit_bytes") or 0),
+        disk_bytes=int(s.get("disk_bytes") or 0),
+        rx_bytes=int(net.get("rx_bytes") or 0),
+        tx_bytes=int(net.get("tx_bytes") or 0),
+        uptime_ms=int(s.get("uptime") or 0),
+    )
+
+class Subscription:
+    def __init__(self, hub: StatsHub, key: StreamKey, maxsize: int):
+        self.hub = hub
+        self.key = key
+        self.queue: DropOldestQueue[StatsEvent] = DropOldestQueue(maxsize)
+
+    async def get(self) -> StatsEvent:
+        return await self.queue.get()
+
+    def close(self) -> None:
+        self.hub._unsubscribe(self)
+
+    async def __aenter__(self) -> Subscription:
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+class _Stream:
+    """One console socket for one server; parses each frame once and fans it out."""
+
+    def __init__(self, hub: StatsHub, key: StreamKey):
+        self.hub = hub
+        self.key = key
+        self.user_id, self.panel, self.uuid = key
+        self.subscribers: set[Subscription] = set()
+        self.last: StatsEvent | None = None
+        self.connected = False
+        self.reconnects = 0
+        self.task: asyncio.Task | None = None
+        self._stop_handle: asyncio.TimerHandle | None = None
+
+    def publish(self, event: StatsEvent) -> None:
+        if event.kind == "status" and self.last is not None:
+            # events are shared by every consumer, so never mutate one after it was published
+            self.last = replace(self.last, state=event.state, ts=event.ts)
+        else:
+            self.last = event
+        for sub in tuple(self.subscribers):
+            sub.queue.put_nowait(event)
+
+    async def _socket_credentials(self) -> tuple[str, str]:
+        async with SessionLocal() as s:
+            token = await get_user_token(s, self.user_id, self.panel)
+        if not token:
+            raise RuntimeError("no key for panel")
+        info = await PteroClient(self.hub.session, self.panel, token).websocket_info(self.uuid)
+        return info["data"]["socket"], info["data"]["token"]
+
+    async def run(self) -> None:
+        backoff = 1.0
+        while self.subscribers:
+            ws = None
+            try:
+                socket, token = await self._socket_credentials()
+                ws = await _dial(socket, self.panel, token)
+                await _auth(ws, token)
+                self.connected = True
+                backoff = 1.0
+                async for raw in ws:
+                    data = json.loads(raw)
+                    ev = data.get("event")
+                    if ev == "token expiring":
+                        _, token = await self._socket_credentials()
+                        await ws.send(json.dumps({"event": "auth", "args": [token]}))
+                        continue
+                    if ev == "token expired":
+                        break
+                    parsed = parse_event(self.panel, self.uuid, data)
+                    if parsed is not None:
+                        self.publish(parsed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.info("stats_stream_error", panel=self.panel, uuid=self.uuid, error=str(e)[:200])
+            finally:
+                self.connected = False
+                if ws is not None:
+                    await ws.close()
+            if not self.subscribers:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+class StatsHub:
+    """Keeps one WebSocket per (user, watched server) and fans parsed stats/status out to any number
+    of that user's in-process consumers. Each consumer has its own drop-oldest queue, so a slow consumer only
+    loses its own backlog and never blocks the socket reader."""
+
+    def __init__(self, session: aiohttp.ClientSession, queue_size: int | None = None, idle_grace: float | None = None):
+        self.session = session
+        self.queue_size = queue_size or settings.stats_queue_size
+        self.idle_grace = settings.stats_idle_grace_seconds if idle_grace is None else idle_grace
+        self._streams: dict[StreamKey, _Stream] = {}
+
+    def subscribe(self, panel_url: str, uuid: str, user_id: int, maxsize: int | None = None) -> Subscription:
+        key = (user_id, panel_url, uuid)
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = _Stream(self, key)
+        if stream._stop_handle is not None:
+            stream._stop_handle.cancel()
+            stream._stop_handle = None
+        sub = Subscription(self, key, maxsize or self.queue_size)
+        stream.subscribers.add(sub)
+        if stream.last is not None:
+            sub.queue.put_nowait(stream.last)
+        if stream.task is None or stream.task.done():
+            stream.task = asyncio.create_task(stream.run(), name=f"stats-{uuid[:8]}")
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        stream = self._streams.get(sub.key)
+        if stream is None:
+            return
+        stream.subscribers.discard(sub)
+        if not stream.subscribers and stream._stop_handle is None:
+            # keep the socket briefly so a quick re-subscribe does not redial
+            stream._stop_handle = asyncio.get_running_loop().call_later(self.idle_grace, self._stop_if_idle, sub.key)
+
+    def _stop_if_idle(self, key: StreamKey) -> None:
+        stream = self._streams.get(key)
+        if stream is None or stream.subscribers:
+            return
+        stream._stop_handle = None
+        if stream.task:
+            stream.task.cancel()
+        del self._streams[key]
+
+    def stats(self) -> dict[str, Any]:
+        subs = [sub for st in self._streams.values() for sub in st.subscribers]
+        return {
+            "streams": len(self._streams),
+            "connected": sum(1 for st in self._streams.values() if st.connected),
+            "subscribers": len(subs),
+            "dropped": sum(sub.queue.dropped for sub in subs),
+            "reconnects": sum(st.reconnects for st in self._streams.values()),
+        }
+
+    async def close(self) -> None:
+        tasks = [st.task for st in self._streams.values() if st.task]
+        for st in self._streams.values():
+            st.subscribers.clear()
+            if st._stop_handle:
+                st._stop_handle.cancel()
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._streams.clear()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+import asyncio, time
+from collections.abc import AsyncIterator
+import aiohttp
+from yarl import URL
+from ..config import settings
+
+class UploadTooLarge(ValueError):
+    pass
+
+class UploadProgress:
+    def __init__(self, filename: str, total: int | None):
+        self.filename = filename
+        self.total = total
+        self.sent = 0
+        self.started = time.monotonic()
+        self.waiting = True
+
+    def begin(self) -> None:
+        self.waiting = False
+        self.started = time.monotonic()
+
+    def line(self) -> str:
+        if self.waiting:
+            return f"`{self.filename}` — waiting for an upload slot…"
+        elapsed = max(0.001, time.monotonic() - self.started)
+        rate = self.sent / elapsed / 1024 / 1024
+        sent_mib = self.sent / 1024 / 1024
+        if self.total:
+            frac = min(1.0, self.sent / self.total)
+            bar = "█" * int(frac * 20) + "░" * (20 - int(frac * 20))
+            return f"`{self.filename}` {bar} {frac:.0%} — {sent_mib:.1f}/{self.total / 1024 / 1024:.1f} MiB @ {rate:.1f} MiB/s"
+        return f"`{self.filename}` — {sent_mib:.1f} MiB @ {rate:.1f} MiB/s"
+
+_panel_slots: dict[str, asyncio.Semaphore] = {}
+
+def panel_slot(panel_url: str) -> asyncio.Semaphore:
+    host = URL(panel_url).host or panel_url
+    sem = _panel_slots.get(host)
+    if sem is None:
+        sem = _panel_slots[host] = asyncio.Semaphore(max(1, settings.upload_per_panel))
+    return sem
+
+async def stream_upload(session: aiohttp.ClientSession, source_url: str, upload_url: str, directory: str,
+                        progress: UploadProgress, max_bytes: int | None = None) -> None:
+    """Pipe ``source_url`` into a Wings signed upload URL chunk by chunk.
+
+    The body is a chunked multipart stream fed straight from the download,
+    so memory use stays at one chunk regardless of file size.
+    """
+    max_bytes = max_bytes or settings.upload_max_bytes
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=120)
+    async with session.get(source_url, timeout=timeout) as src:
+        src.raise_for_status()
+        length = src.content_length or progress.total
+        if length and length > max_bytes:
+            raise UploadTooLarge(f"file is {length / 1024 / 1024:.1f} MiB, limit is {max_bytes / 1024 / 1024:.0f} MiB")
+        progress.total = length
+
+        async def body() -> AsyncIterator[bytes]:
+            async for chunk in src.content.iter_chunked(settings.upload_chunk_bytes):
+                progress.sent += len(chunk)
+                if progress.sent > max_bytes:
+                    raise UploadTooLarge(f"upload exceeded {max_bytes / 1024 / 1024:.0f} MiB")
+                yield chunk
+
+        with aiohttp.MultipartWriter("form-data") as mp:
+            part = mp.append(body(), {"Content-Type": "application/octet-stream"})
+            part.set_content_disposition("form-data", name="files", filename=progress.filename)
+
+        target = URL(upload_url, encoded=True).update_query(directory=directory or "/")
+        async with session.post(target, data=mp, timeout=timeout) as r:
+            r.raise_for_status()
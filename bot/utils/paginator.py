@@ -0,0 +1,396 @@
+from __future__ import annotations
+import asyncio
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from typing import Any
+import discord
+
+RenderPage = Callable[[list[Any]], str]
+Match = Callable[[Any, str], bool]
+# fetch(page_number starting at 1, filter text) -> (items, total_pages)
+FetchPage = Callable[[int, str | None], Awaitable[tuple[list[Any], int]]]
+
+# Filters whose source and rendered pages a view keeps (besides the unfiltered one)
+FILTERS_KEPT = 8
+
+
+class PageSource(ABC):
+    """Produces the items of one page on demand; the view decides which pages to ask for."""
+
+    title: str = ""
+    filterable: bool = False
+    error: str | None = None  # set while the last fetch failed; such pages are never cached
+
+    @abstractmethod
+    async def page_count(self) -> int | None:
+        """Number of pages, or None while it is not known without fetching more."""
+
+    async def total_pages(self) -> int:
+        """Number of pages, fetching whatever it takes to know it (Last / Jump)."""
+        return await self.page_count() or 1
+
+    @abstractmethod
+    async def get_page(self, index: int) -> list[Any]:
+        ...
+
+    @abstractmethod
+    def render(self, items: list[Any]) -> str:
+        ...
+
+    def with_filter(self, text: str | None) -> PageSource:
+        return self
+
+
+class ListPageSource(PageSource):
+    """Items already in memory; only the requested page is formatted."""
+
+    def __init__(self, items: list[Any], per_page: int, render: RenderPage, match: Match | None = None, title: str = ""):
+        self.all_items = items
+        self.items = items
+        self.per_page = max(1, per_page)
+        self._render = render
+        self.match = match
+        self.title = title
+        self.filterable = match is not None
+
+    async def page_count(self) -> int:
+        return max(1, -(-len(self.items) // self.per_page))
+
+    async def get_page(self, index: int) -> list[Any]:
+        return self.items[index * self.per_page:(index + 1) * self.per_page]
+
+    def render(self, items: list[Any]) -> str:
+        return self._render(items)
+
+    def with_filter(self, text: str | None) -> PageSource:
+        src = ListPageSource(self.all_items, self.per_page, self._render, self.match, self.title)
+        if text and self.match:
+            src.items = [i for i in self.all_items if self.match(i, text)]
+        return src
+
+
+class RemotePageSource(PageSource):
+    """Pages fetched from a paginated API one at a time, as they are viewed.
+
+    If the API can filter (``server_filter``) the filter is passed through;
+    otherwise a ``match`` predicate turns filtering into a lazy scan.
+    """
+
+    def __init__(self, fetch: FetchPage, render: RenderPage, *, match: Match | None = None,
+                 server_filter: bool = False, filter_text: str | None = None, title: str = ""):
+        self.fetch = fetch
+        self._render = render
+        self.match = match
+        self.server_filter = server_filter
+        self.filter_text = filter_text
+        self.title = title
+        self.filterable = server_filter or match is not None
+        self.error: str | None = None
+        self._pages: dict[int, list[Any]] = {}
+        self._total: int | None = None
+        self._lock = asyncio.Lock()
+
+    async def _load(self, page: int) -> list[Any]:
+        async with self._lock:
+            if page in self._pages:
+                return self._pages[page]
+            try:
+                items, total = await self.fetch(page, self.filter_text if self.server_filter else None)
+            except Exception as e:
+                # not cached: the next view of this page fetches again
+                self.error = str(e)[:200] or type(e).__name__
+                return []
+            self.error = None
+            self._pages[page] = items
+            self._total = max(1, total)
+            return items
+
+    async def page_count(self) -> int:
+        if self._total is None:
+            await self._load(1)
+        return self._total or 1
+
+    async def get_page(self, index: int) -> list[Any]:
+        return await self._load(index + 1)
+
+    def render(self, items: list[Any]) -> str:
+        if self.error:
+            return f"⚠ {self.error}"
+        return self._render(items) if items else "_(nothing here)_"
+
+    def with_filter(self, text: str | None) -> PageSource:
+        if self.server_filter or not text:
+            return RemotePageSource(self.fetch, self._render, match=self.match, server_filter=self.server_filter,
+                                    filter_text=text or None, title=self.title)
+        if self.match:
+            return ScanningPageSource(RemotePageSource(self.fetch, self._render, title=self.title), self.match, text, origin=self)
+        return self
+
+
+class ScanningPageSource(PageSource):
+    """Client-side filter over a remote source: remote pages are pulled only until the requested page is full."""
+
+    filterable = True
+
+    def __init__(self, base: RemotePageSource, match: Match, text: str, *, origin: PageSource, per_page: int | None = None):
+        self.base = base
+        self.origin = origin
+        self.match = match
+        self.text = text
+        self.title = base.title
+        self.per_page = per_page
+        self._matches: list[Any] = []
+        self._next_remote = 1
+        self._exhausted = False
+
+    @property
+    def error(self) -> str | None:
+        return self.base.error
+
+    async def _fill(self, want: int) -> None:
+        while len(self._matches) < want and not self._exhausted:
+            items = await self.base.get_page(self._next_remote - 1)
+            if self.base.error:
+                return  # retry this remote page next time rather than skipping it
+            if self.per_page is None:
+                self.per_page = max(1, len(items))
+            self._matches.extend(i for i in items if self.match(i, self.text))
+            self._next_remote += 1
+            if self._next_remote > await self.base.page_count():
+                self._exhausted = True
+
+    def _count(self) -> int:
+        return max(1, -(-len(self._matches) // (self.per_page or 1)))
+
+    async def page_count(self) -> int | None:
+        # unknown until the remote pages run out: counting would mean fetching them all
+        return self._count() if self._exhausted else None
+
+    async def total_pages(self) -> int:
+        await self._fill(10**9)
+        return self._count()
+
+    async def get_page(self, index: int) -> list[Any]:
+        if self.per_page is None:
+            await self._fill(1)
+        n = self.per_page or 1
+        await self._fill((index + 1) * n)
+        return self._matches[index * n:(index + 1) * n]
+
+    def render(self, items: list[Any]) -> str:
+        return self.base.render(items)
+
+    def with_filter(self, text: str | None) -> PageSource:
+        return self.origin.with_filter(text)
+
+
+class ChainedPageSource(PageSource):
+    """Concatenates sources (e.g. one per panel); each view page belongs to exactly one source."""
+
+    def __init__(self, sources: list[PageSource]):
+        self.sources = sources
+        self.filterable = any(s.filterable for s in sources)
+        self._counts: list[int] | None = None
+
+    @property
+    def error(self) -> str | None:
+        return next((s.error for s in self.sources if s.error), None)
+
+    async def _layout(self) -> list[int]:
+        if self._counts is not None:
+            return self._counts
+        counts = list(await asyncio.gather(*(s.total_pages() for s in self.sources)))
+        if not self.error:
+            self._counts = counts
+        return counts
+
+    async def _locate(self, index: int) -> tuple[PageSource, int]:
+        for src, n in zip(self.sources, await self._layout(), strict=True):
+            if index < n:
+                return src, index
+            index -= n
+        raise IndexError(index)
+
+    async def page_count(self) -> int:
+        return max(1, sum(await self._layout()))
+
+    async def get_page(self, index: int) -> list[Any]:
+        src, local = await self._locate(index)
+        return [(src, item) for item in await src.get_page(local)] or [(src, None)]
+
+    def render(self, items: list[Any]) -> str:
+        src = items[0][0]
+        body = src.render([i for _, i in items if i is not None])
+        return f"**{src.title}**\n{body}" if src.title else body
+
+    def with_filter(self, text: str | None) -> PageSource:
+        return ChainedPageSource([s.with_filter(text) for s in self.sources])
+
+
+class _JumpModal(discord.ui.Modal, title="Jump to page"):
+    page = discord.ui.TextInput(label="Page number", max_length=6)
+
+    def __init__(self, view: Paginator):
+        super().__init__()
+        self.paginator = view
+
+    async def on_submit(self, inter: discord.Interaction):
+        try:
+            n = int(str(self.page.value).strip())
+        except ValueError:
+            await inter.response.send_message("Not a number.", ephemeral=True)
+            return
+        await self.paginator.show(inter, n - 1)
+
+
+class _FilterModal(discord.ui.Modal, title="Filter results"):
+    text = discord.ui.TextInput(label="Filter (empty to clear)", required=False, max_length=100)
+
+    def __init__(self, view: Paginator):
+        super().__init__()
+        self.paginator = view
+        self.text.default = view.filter_text or ""
+
+    async def on_submit(self, inter: discord.Interaction):
+        await self.paginator.apply_filter(inter, str(self.text.value).strip() or None)
+
+
+class Paginator(discord.ui.View):
+    """Button-paginated message over a ``PageSource``.
+
+    Pages are fetched and rendered only when shown, kept in a per-filter
+    cache, and the whole view (and its cache) is dropped after ``timeout``
+    seconds without interaction.
+    """
+
+    def __init__(self, owner_id: int, source: PageSource, *, header: str = "", filter_text: str | None = None,
+                 timeout: float = 180):
+        super().__init__(timeout=timeout)
+        self.owner_id = owner_id
+        self.base_source = source
+        self.header = header
+        self.filter_text = filter_text
+        self.index = 0
+        self.pages: int | None = None  # None while the source cannot tell without fetching more
+        self.message: discord.Message | discord.WebhookMessage | None = None
+        # one source and one rendered-page cache per filter, so switching back costs nothing
+        self._sources: dict[str | None, PageSource] = {None: source}
+        self._cache: dict[tuple[str | None, int], str] = {}
+        self.source = self._source_for(filter_text)
+        self._failed = False
+        if not source.filterable:
+            self.remove_item(self.filter_button)
+
+    def _source_for(self, text: str | None) -> PageSource:
+        src = self._sources.get(text)
+        if src is None:
+            if len(self._sources) > FILTERS_KEPT:
+                oldest = next(k for k in self._sources if k is not None)
+                del self._sources[oldest]
+                self._cache = {k: v for k, v in self._cache.items() if k[0] != oldest}
+            src = self._sources[text] = self.base_source.with_filter(text)
+        return src
+
+    async def render(self, index: int) -> str:
+        if self.pages is None or self._failed:
+            self.pages = await self.source.page_count()
+        if self.pages is not None:
+            index = min(index, self.pages - 1)
+        index = max(0, index)
+        key = (self.filter_text, index)
+        body = self._cache.get(key)
+        self._failed = False
+        if body is None:
+            items = await self.source.get_page(index)
+            if self.pages is None:
+                # fetching this page may have reached the end of the source
+                self.pages = await self.source.page_count()
+                if self.pages is not None and index >= self.pages:
+                    index = self.pages - 1
+                    key = (self.filter_text, index)
+                    items = await self.source.get_page(index)
+            body = self.source.render(items)
+            if self.source.error:
+                self._failed = True  # not cached; the next press fetches again
+            else:
+                self._cache[key] = body
+        self.index = index
+        parts = [p for p in (self.header, body) if p]
+        footer = f"page {index + 1}/{self.pages if self.pages is not None else '?'}"
+        if self.filter_text:
+            footer += f" • filter: `{self.filter_text}`"
+        return ("\n".join(parts) + f"\n-# {footer}")[:2000]
+
+    def _sync_buttons(self) -> None:
+        last = None if self.pages is None else self.pages - 1
+        # after a failed fetch every arrow stays live so the page can be retried
+        self.first_page.disabled = self.prev_page.disabled = self.index <= 0 and not self._failed
+        at_end = last is not None and self.index >= last
+        self.next_page.disabled = self.last_page.disabled = at_end and not self._failed
+        self.jump_button.disabled = last == 0
+
+    async def send(self, inter: discord.Interaction, *, ephemeral: bool = True) -> None:
+        content = await self.render(0)
+        self._sync_buttons()
+        self.message = await inter.followup.send(content, view=self, ephemeral=ephemeral, wait=True)
+
+    async def show(self, inter: discord.Interaction, index: int | None) -> None:
+        """Show page ``index``; None is the last page, which may mean scanning to the end."""
+        await inter.response.defer()
+        if index is None:
+            self.pages = await self.source.total_pages()
+            index = self.pages - 1
+        content = await self.render(index)
+        self._sync_buttons()
+        await inter.edit_original_response(content=content, view=self)
+
+    def set_source(self, source: PageSource) -> None:
+        self.base_source = source
+        self._sources = {None: source}
+        self._cache.clear()
+        self.source = self._source_for(self.filter_text)
+        self.pages = None
+
+    async def apply_filter(self, inter: discord.Interaction, text: str | None) -> None:
+        self.filter_text = text
+        self.source = self._source_for(text)
+        self.pages = None
+        await self.show(inter, 0)
+
+    async def interaction_check(self, inter: discord.Interaction) -> bool:
+        return inter.user.id == self.owner_id
+
+    async def on_timeout(self) -> None:
+        self._cache.clear()
+        for item in self.children:
+            if isinstance(item, discord.ui.Button | discord.ui.Select):
+                item.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+    @discord.ui.button(label="⏮", style=discord.ButtonStyle.secondary, row=0)
+    async def first_page(self, inter: discord.Interaction, button: discord.ui.Button):
+        await self.show(inter, 0)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary, row=0)
+    async def prev_page(self, inter: discord.Interaction, button: discord.ui.Button):
+        await self.show(inter, self.index - 1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary, row=0)
+    async def next_page(self, inter: discord.Interaction, button: discord.ui.Button):
+        await self.show(inter, self.index + 1)
+
+    @discord.ui.button(label="⏭", style=discord.ButtonStyle.secondary, row=0)
+    async def last_page(self, inter: discord.Interaction, button: discord.ui.Button):
+        await self.show(inter, None)
+
+    @discord.ui.button(label="Jump", style=discord.ButtonStyle.primary, row=1)
+    async def jump_button(self, inter: discord.Interaction, button: discord.ui.Button):
+        await inter.response.send_modal(_JumpModal(self))
+
+    @discord.ui.button(label="Filter", style=discord.ButtonStyle.primary, row=1)
+    async def filter_button(self, inter: discord.Interaction, button: discord.ui.Button):
+        await inter.response.send_modal(_FilterModal(self))
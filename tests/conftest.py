@@ -0,0 +1,7 @@
+import os
+
+# bot.config requires these at import time; the tests never reach Discord, a panel or a real DB.
+os.environ.setdefault("DISCORD_TOKEN", "test")
+os.environ.setdefault("ENCRYPTION_KEY", "test")
+os.environ.setdefault("PTERO_PANEL_URL", "https://panel.example")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
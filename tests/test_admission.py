@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from bot.core.admission import AdmissionRejected, Ticket, _Scope, _Slots
+
+
+@pytest.mark.asyncio
+async def test_release_hands_the_slot_to_the_oldest_waiter():
+    slots = _Slots(1)
+    assert slots.try_take() and not slots.try_take()
+    first = asyncio.create_task(slots.wait(1.0))
+    second = asyncio.create_task(slots.wait(1.0))
+    await asyncio.sleep(0)
+    slots.release()
+    assert await first and not second.done()
+    assert slots.active == 1 and not slots.try_take()  # a late arrival cannot overtake
+    slots.release()
+    assert await second
+    slots.release()
+    assert slots.active == 0 and not slots.waiters
+
+
+@pytest.mark.asyncio
+async def test_timed_out_waiter_leaves_the_line():
+    slots = _Slots(1)
+    slots.try_take()
+    assert not await slots.wait(0.01)
+    assert not slots.waiters and slots.active == 1
+    slots.release()
+    assert slots.active == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_passes_on_a_slot_it_was_handed():
+    slots = _Slots(1)
+    slots.try_take()
+    doomed = asyncio.create_task(slots.wait(1.0))
+    heir = asyncio.create_task(slots.wait(1.0))
+    await asyncio.sleep(0)
+    slots.release()  # handed to doomed, which is cancelled before it resumes
+    doomed.cancel()
+    try:
+        kept = await doomed  # some Python versions let wait_for return the result instead
+    except asyncio.CancelledError:
+        kept = False
+    if kept:
+        slots.release()  # as the caller's finally would
+    assert await heir and slots.active == 1
+
+
+@pytest.mark.asyncio
+async def test_scope_rejects_past_its_wait_line_and_forgets_idle_keys():
+    scope = _Scope("user", limit=1, queue=1)
+    await scope.acquire(7, 1.0)
+    waiting = asyncio.create_task(scope.acquire(7, 1.0))
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected, match="wait line is full"):
+        await scope.acquire(7, 1.0)
+    scope.release(7)
+    await waiting
+    scope.release(7)
+    assert scope._slots == {}
+    snap = scope.snapshot()
+    assert (snap["admitted"], snap["queued"], snap["rejected"]) == (2, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_ticket_takes_each_panel_host_once():
+    class Control:
+        panel = _Scope("panel", limit=1, queue=0)
+    ticket = Ticket(Control())
+    urls = ["https://b.example/x", "https://a.example", "https://b.example"]
+    await ticket.panels(urls, timeout=0)
+    await ticket.panels(["https://a.example"], timeout=0)
+    assert ticket.hosts == ["a.example", "b.example"]
+    ticket.release()
+    assert Control.panel._slots == {}
@@ -0,0 +1,48 @@
+from bot.services.aliases import AliasEntry, AliasTable
+
+
+def _table() -> AliasTable:
+    t = AliasTable()
+    t._replace_all([
+        AliasEntry("MC", "global-mc", None, None),
+        AliasEntry("web", "global-web", None, None),
+        AliasEntry("mc", "guild1-mc", "https://p", 1),
+        AliasEntry("mod", "guild1-mod", "https://p", 1),
+        AliasEntry("mc", "guild2-mc", "https://p", 2),
+    ])
+    return t
+
+
+def test_guild_alias_shadows_global_one():
+    t = _table()
+    assert t.get(1, " Mc ").uuid == "guild1-mc"
+    assert t.get(2, "mc").uuid == "guild2-mc"
+    assert t.get(3, "mc").uuid == "global-mc"
+    assert t.get(None, "mc").uuid == "global-mc"
+    assert t.get(1, "web").uuid == "global-web"
+    assert t.get(2, "mod") is None
+
+
+def test_suggest_merges_scopes_without_duplicates():
+    t = _table()
+    assert [e.uuid for e in t.suggest(1, "m")] == ["guild1-mc", "guild1-mod"]
+    assert [e.uuid for e in t.suggest(2, "M")] == ["guild2-mc"]
+    assert [e.uuid for e in t.suggest(None, "")] == ["global-mc", "global-web"]
+    assert len(t.suggest(1, "", limit=2)) == 2
+
+
+def test_entries_list_local_then_inherited_globals():
+    t = _table()
+    assert [e.uuid for e in t.entries(1)] == ["guild1-mc", "guild1-mod", "global-web"]
+    assert [e.uuid for e in t.entries(None)] == ["global-mc", "global-web"]
+
+
+def test_put_and_discard_keep_prefix_index_in_step():
+    t = _table()
+    t.put(AliasEntry("Lobby", "guild2-lobby", None, 2))
+    t.put(AliasEntry("lobby", "guild2-lobby-2", None, 2))
+    assert [e.uuid for e in t.suggest(2, "lo")] == ["guild2-lobby-2"]
+    assert t.discard(2, "LOBBY").uuid == "guild2-lobby-2"
+    assert t.discard(2, "lobby") is None
+    assert t.suggest(2, "lo") == []
+    assert t._sorted[2] == ["mc"]
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from bot.services.audit import (
+    EMBEDS_PER_MESSAGE,
+    MESSAGE_CHARS_MAX,
+    AuditRecord,
+    _combined_embeds,
+    _messages,
+)
+
+
+def _records(n: int, detail: str = "x" * 200) -> list[AuditRecord]:
+    return [AuditRecord(datetime(2024, 1, 1), 1, 2, "power", "server", detail, 0) for _ in range(n)]
+
+
+def test_posts_stay_within_discord_limits():
+    posts = _messages(_combined_embeds(_records(400)))
+    assert sum(len(p) for p in posts) == len(_combined_embeds(_records(400)))
+    for embeds in posts:
+        assert len(embeds) <= EMBEDS_PER_MESSAGE
+        assert sum(len(e) for e in embeds) <= MESSAGE_CHARS_MAX
+
+
+def test_small_batch_is_one_post():
+    assert [len(p) for p in _messages(_combined_embeds(_records(3, "ok")))] == [1]
@@ -0,0 +1,52 @@
+from bot.client.cache import mark_stale
+from bot.client.records import ResourceRecord
+from bot.services.boards import (
+    BACKOFF_MAX,
+    BoardState,
+    BoardTarget,
+    decode_targets,
+    encode_targets,
+    render_board,
+    to_bucket,
+)
+
+MIB = 1024 * 1024
+
+
+def _board(*labels: str) -> BoardState:
+    targets = [BoardTarget(lb, f"u{i}", "https://p") for i, lb in enumerate(labels)]
+    return BoardState(1, 10, 20, 30, 40, None, targets)
+
+
+def _res(cpu: float, mem_mib: int) -> ResourceRecord:
+    return ResourceRecord("running", False, cpu, mem_mib * MIB, 0, 0, 0, 0)
+
+
+def test_targets_round_trip_and_skip_malformed_lines():
+    targets = [BoardTarget("mc|lobby", "u1", "https://a"), BoardTarget("web", "u2", "https://b")]
+    assert decode_targets(encode_targets(targets)) == targets
+    assert decode_targets("garbage\nu3|https://c|ok") == [BoardTarget("ok", "u3", "https://c")]
+
+
+def test_small_changes_keep_the_same_bucket():
+    assert to_bucket(_res(12.0, 100)) == to_bucket(_res(14.9, 127)) == ("running", 10, 64)
+    assert to_bucket(_res(15.0, 100)) != to_bucket(_res(14.9, 100))
+    assert to_bucket(mark_stale(_res(12.0, 100), 60))[0] == "running*"
+
+
+def test_render_marks_stale_rows_and_missing_keys():
+    board = _board("mc", "web")
+    fresh = render_board(board, (("running", 10, 2048), None))
+    assert "2.0G" in fresh and "no key" in fresh and "last known" not in fresh
+    stale = render_board(board, (("running*", 10, 64), None))
+    assert "last known value" in stale
+
+
+def test_back_off_doubles_up_to_the_cap():
+    board = _board("mc")
+    waits = []
+    for _ in range(12):
+        board.back_off(0.0, 30.0)
+        waits.append(board.retry_at)
+    assert waits[:3] == [60.0, 120.0, 240.0]
+    assert waits[-1] == BACKOFF_MAX and board.denied == 12
@@ -0,0 +1,73 @@
+import aiohttp
+import pytest
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from bot.client.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    BreakerRegistry,
+    CircuitBreaker,
+    CircuitOpenError,
+    is_panel_failure,
+)
+
+
+def _breaker() -> CircuitBreaker:
+    return CircuitBreaker("panel.example", window=60, min_calls=10, error_rate=0.5,
+                          max_consecutive=3, open_seconds=30)
+
+
+def _status(code: int) -> aiohttp.ClientResponseError:
+    url = URL("https://panel.example/api/client")
+    info = aiohttp.RequestInfo(url, "GET", CIMultiDictProxy(CIMultiDict()), url)
+    return aiohttp.ClientResponseError(info, (), status=code)
+
+
+async def _call(br: CircuitBreaker, exc: Exception | None = None) -> None:
+    async with br.guard():
+        if exc is not None:
+            raise exc
+
+
+def test_only_panel_side_errors_count():
+    assert is_panel_failure(_status(502)) and is_panel_failure(_status(429))
+    assert not is_panel_failure(_status(404)) and not is_panel_failure(ValueError())
+    assert is_panel_failure(aiohttp.ClientConnectionError())
+
+
+@pytest.mark.asyncio
+async def test_trips_on_consecutive_failures_and_fails_fast():
+    br = _breaker()
+    for _ in range(5):
+        with pytest.raises(aiohttp.ClientResponseError):
+            await _call(br, _status(404))
+    assert br.state == CLOSED
+    for _ in range(3):
+        with pytest.raises(aiohttp.ClientResponseError):
+            await _call(br, _status(503))
+    assert br.state == OPEN and br.trips == 1
+    with pytest.raises(CircuitOpenError):
+        await _call(br)
+
+
+@pytest.mark.asyncio
+async def test_half_open_lets_one_probe_through():
+    br = _breaker()
+    br._trip(0.0)  # opened long enough ago
+    probe = br.before_call()
+    assert probe and br.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        br.before_call()
+    br.record(True, probe, "boom")
+    assert br.state == OPEN and br.trips == 2
+    br.opened_at = 0.0
+    await _call(br)
+    assert br.state == CLOSED
+
+
+def test_registry_shares_one_breaker_per_host():
+    reg = BreakerRegistry()
+    assert reg.get("https://panel.example/") is reg.get("https://panel.example/api")
+    assert reg.get("https://panel.example:8443") is not reg.get("https://panel.example")
@@ -0,0 +1,63 @@
+import pytest
+
+from bot.client.records import ServerRecord
+from bot.services import bulk_ops
+from bot.services.aliases import AliasEntry, aliases
+
+PANEL = "https://panel.example"
+UUID_A = "aaaaaaaa-1111-2222-3333-444444444444"
+UUID_B = "bbbbbbbb-1111-2222-3333-444444444444"
+
+
+def _srv(uuid: str, name: str) -> ServerRecord:
+    return ServerRecord(uuid, uuid[:8], name, "node1", None, 0, 0, 0, False)
+
+
+class _FakeClient:
+    def __init__(self, session, panel, token):
+        pass
+
+    async def list_servers(self, allow_warm: bool = False):
+        return [_srv(UUID_A, "Lobby"), _srv(UUID_B, "Survival")]
+
+
+@pytest.fixture(autouse=True)
+def fake_panel(monkeypatch):
+    monkeypatch.setattr(bulk_ops, "PteroClient", _FakeClient)
+
+
+async def _select(**kw):
+    targets, missing = await bulk_ops.select_targets(None, {PANEL: "tok"}, **kw)
+    return sorted(t.uuid for t in targets), missing
+
+
+@pytest.mark.asyncio
+async def test_name_and_prefix():
+    assert await _select(names=["lobby", UUID_B[:8]]) == ([UUID_A, UUID_B], [])
+
+
+@pytest.mark.asyncio
+async def test_short_prefix_is_not_a_match():
+    assert await _select(names=["bbbb"]) == ([], ["bbbb"])
+
+
+@pytest.mark.asyncio
+async def test_filter_and_whole_panel():
+    assert await _select(needle="surv") == ([UUID_B], [])
+    assert await _select(whole_panel=True) == ([UUID_A, UUID_B], [])
+
+
+@pytest.mark.asyncio
+async def test_empty_selection_without_panel_selects_nothing():
+    # what /bulk_power targets:"," without filter or panel parses to
+    assert await _select(names=[], needle=None) == ([], [])
+
+
+@pytest.mark.asyncio
+async def test_alias_label(monkeypatch):
+    monkeypatch.setattr(aliases, "_scopes", {})
+    monkeypatch.setattr(aliases, "_sorted", {})
+    aliases.put(AliasEntry("hub", UUID_A, PANEL, 42))
+    targets, missing = await bulk_ops.select_targets(None, {PANEL: "tok"}, names=["hub"],
+                                                     guild_id=42)
+    assert [(t.uuid, t.label) for t in targets] == [(UUID_A, "hub")] and not missing
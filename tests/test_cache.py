@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from bot.client.cache import ResponseCache, Revalidator, is_warm, mark_stale, stale_age, stale_note
+
+
+def test_live_value_has_no_note():
+    assert stale_age([1]) is None
+    assert stale_note({"a": 1}) is None
+
+
+def test_fallback_and_warm_are_told_apart():
+    fallback = mark_stale([1, 2], 120)
+    warm = mark_stale({"a": 1}, 30, warm=True)
+    assert stale_age(fallback) == 120 and not is_warm(fallback)
+    assert "panel unavailable" in stale_note(fallback)
+    assert is_warm(warm) and "snapshot" in stale_note(warm)
+
+
+class _Session:
+    closed = False
+
+
+def _response_error(status: int) -> aiohttp.ClientResponseError:
+    return aiohttp.ClientResponseError(None, (), status=status)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("status", "kept"), [(503, True), (404, False), (403, False)])
+async def test_failed_refresh_keeps_entry_only_while_panel_is_down(status, kept):
+    cache = ResponseCache(10)
+    key = ("panel.example", "fp", "/api/client/servers/x")
+    cache.restore(key, time.time(), {"a": 1})
+    reval = Revalidator(cache, rate=100, concurrency=1)
+    reval.bind(_Session())
+
+    async def refresh(session):
+        raise _response_error(status)
+    assert reval.schedule(key, refresh)
+    while reval.stats()["pending"]:
+        await asyncio.sleep(0)
+    assert (cache.get_warm(key) is not None) is kept
@@ -0,0 +1,48 @@
+import pytest
+
+from bot.client.records import NodeRecord, ServerColumns
+from bot.services import capacity
+from bot.services.capacity import capacity_report, group_by_node
+
+
+def _cols() -> ServerColumns:
+    cols = ServerColumns()
+    cols.extend([
+        {"node": 1, "limits": {"memory": 1024, "disk": 2048, "cpu": 100}},
+        {"node": 1, "limits": {"memory": 512, "disk": 0, "cpu": 50}},
+        {"node": 2, "limits": {"memory": 4096, "disk": 10240, "cpu": 0}},
+        {"node": 9, "limits": {"memory": 256, "disk": 256}},
+    ])
+    return cols
+
+
+def _node(node_id: int, location: int, memory: int, overallocate: int = 0) -> NodeRecord:
+    return NodeRecord(node_id, f"n{node_id}", "", location, memory, overallocate, 20480, 0, False)
+
+
+def test_plain_grouping():
+    by_node = group_by_node(_cols(), vectorized=False)
+    assert by_node[1].servers == 2
+    assert by_node[1].memory_mib == 1536
+    assert by_node[1].unlimited == 1
+    assert by_node[9].disk_mib == 256
+
+
+@pytest.mark.skipif(capacity.np is None, reason="numpy not installed")
+def test_numpy_matches_plain():
+    cols = _cols()
+    assert group_by_node(cols, vectorized=True) == group_by_node(cols, vectorized=False)
+
+
+def test_report_groups_locations_and_orphans():
+    nodes = [_node(1, 10, 2048), _node(2, 20, 4096, overallocate=-1)]
+    report = capacity_report(_cols(), nodes, vectorized=False)
+    assert [g.key for g in report.locations] == [0, 10, 20]
+    assert report.estate.used.servers == 4
+    assert report.estate.nodes == 2
+    n1 = next(u for u in report.nodes if u.node_id == 1)
+    assert n1.memory_ratio == 0.75
+    assert n1.memory_headroom_mib == 512
+    # unlimited overallocation has no headroom figure
+    assert next(u for u in report.nodes if u.node_id == 2).memory_headroom_mib is None
+    assert [u.node_id for u in report.most_headroom(5)] == [1]
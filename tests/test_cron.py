@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+
+from bot.services.cron import next_fire, parse_cron
+
+
+def test_macro_and_step():
+    at = datetime(2024, 5, 1, 13, 7)
+    assert next_fire(parse_cron("@daily"), at) == datetime(2024, 5, 2, 0, 0)
+    assert next_fire(parse_cron("*/15 * * * *"), at) == datetime(2024, 5, 1, 13, 15)
+
+
+def test_strictly_after():
+    spec = parse_cron("30 2 * * *")
+    assert next_fire(spec, datetime(2024, 5, 1, 2, 30, 59)) == datetime(2024, 5, 2, 2, 30)
+
+
+def test_day_of_month_or_weekday():
+    # classic cron: with both restricted, either may match (1 June 2024 is a Saturday)
+    spec = parse_cron("0 0 1 * 1")
+    assert next_fire(spec, datetime(2024, 5, 28)) == datetime(2024, 6, 1)
+    assert next_fire(spec, datetime(2024, 6, 1, 0, 0)) == datetime(2024, 6, 3)
+
+
+def test_sunday_as_seven():
+    assert parse_cron("0 0 * * 7").weekdays == frozenset({0})
+
+
+@pytest.mark.parametrize(
+    "expr", ["* * * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *", "0 0 31 2 *"]
+)
+def test_invalid(expr):
+    with pytest.raises(ValueError):
+        next_fire(parse_cron(expr), datetime(2024, 1, 1))
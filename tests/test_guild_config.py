@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from bot.db.models import Base, GuildConfig
+from bot.services.guild_config import GuildConfigCache, GuildSettings, parse_role_ids
+
+
+def _cache() -> GuildConfigCache:
+    cache = GuildConfigCache()
+    cache._default = GuildSettings(None, frozenset({99}), 500, None)
+    return cache
+
+
+def test_parse_role_ids_ignores_junk():
+    assert parse_role_ids(" 1, x,2,,3 ") == frozenset({1, 2, 3})
+    assert parse_role_ids(None) == frozenset()
+
+
+def test_null_roles_inherit_and_empty_roles_mean_none():
+    cache = _cache()
+    inherit = cache._from_row(GuildConfig(guild_id=1, admin_role_ids=None, alert_channel_id=7))
+    assert inherit.admin_role_ids == {99} and inherit.log_channel_id == 500
+    assert inherit.overrides == {"alert_channel_id"}
+    none = cache._from_row(GuildConfig(guild_id=2, admin_role_ids=""))
+    assert none.admin_role_ids == frozenset() and none.overrides == {"admin_role_ids"}
+
+
+def test_unknown_guild_gets_defaults_under_its_own_id():
+    cfg = _cache().get(42)
+    assert cfg.guild_id == 42 and cfg.admin_role_ids == {99}
+
+
+@pytest.mark.asyncio
+async def test_removing_the_last_role_does_not_fall_back():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(engine, expire_on_commit=False)  # as SessionLocal
+    cache = _cache()
+    async with session() as s:
+        assert (await cache.update(s, 1, admin_role_ids=[5])).admin_role_ids == {5}
+        assert (await cache.update(s, 1, admin_role_ids=[])).admin_role_ids == frozenset()
+    cache.evict(1)
+    async with session() as s:
+        await cache.load(s)
+    assert cache.get(1).admin_role_ids == frozenset()
+    await engine.dispose()
@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import pytest
+
+from bot.services.invalidation import CHANNEL, InvalidationBus
+
+
+def test_publish_is_a_no_op_in_local_mode():
+    bus = InvalidationBus()
+    bus.publish("alias", 1, "mc")
+    assert bus.stats()["mode"] == "local" and bus.dropped == 0
+
+
+def test_publish_drops_when_the_outbox_is_full():
+    bus = InvalidationBus()
+    bus._outbox = asyncio.Queue(maxsize=1)
+    bus.publish("alias", 1, "mc")
+    bus.publish("alias", 2, "web")
+    assert json.loads(bus._outbox.get_nowait()) == [bus.origin, "alias", 1, "mc"]
+    assert bus.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_notifications_from_other_processes_reach_the_handler():
+    bus = InvalidationBus()
+    seen = []
+
+    async def on_alias(key):
+        seen.append(key)
+
+    async def broken(key):
+        raise RuntimeError("db down")
+    bus.subscribe("alias", on_alias)
+    bus.subscribe("guild", broken)
+    for payload in (
+        json.dumps(["other", "alias", 1, "mc"]),
+        json.dumps([bus.origin, "alias", 2, "own"]),
+        json.dumps(["other", "guild", 3]),
+        json.dumps(["other", "unknown"]),
+        "not json",
+    ):
+        bus._on_notify(None, 0, CHANNEL, payload)
+    await asyncio.sleep(0)
+    assert seen == [[1, "mc"]]
+    assert (bus.received, bus.applied, bus.errors) == (5, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_a_failing_resync_hook_does_not_skip_the_rest():
+    bus = InvalidationBus()
+    ran = []
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    async def reload():
+        ran.append(True)
+    bus.on_resync(broken)
+    bus.on_resync(reload)
+    await bus._run_resync()
+    assert ran == [True]
@@ -0,0 +1,59 @@
+from sqlalchemy import create_engine, inspect
+
+from bot.db.migrations import MIGRATIONS, migrate
+
+
+def test_fresh_database_records_every_step():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        assert migrate(conn) == [v for v, _, _ in MIGRATIONS]
+        assert migrate(conn) == []
+
+
+def test_legacy_guild_roles_become_inherit():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE guild_config (id INTEGER PRIMARY KEY, guild_id BIGINT NOT NULL, "
+            "admin_role_ids VARCHAR NOT NULL, log_channel_id BIGINT, alert_channel_id BIGINT, "
+            "created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO guild_config (guild_id, admin_role_ids) VALUES (1, ''), (2, '7,8')"
+        )
+        migrate(conn)
+        rows = conn.exec_driver_sql(
+            "SELECT guild_id, admin_role_ids FROM guild_config ORDER BY guild_id"
+        ).all()
+        assert rows == [(1, None), (2, "7,8")]
+        cols = inspect(conn).get_columns("guild_config")
+        col = next(c for c in cols if c["name"] == "admin_role_ids")
+        assert col["nullable"]
+
+
+def test_alias_unique_becomes_per_guild():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE server_alias (id INTEGER PRIMARY KEY, alias VARCHAR(64) NOT NULL, "
+            "uuid VARCHAR(36) NOT NULL, panel_url VARCHAR, guild_id BIGINT, "
+            "CONSTRAINT uq_alias UNIQUE (alias))"
+        )
+        conn.exec_driver_sql("CREATE INDEX ix_server_alias_alias ON server_alias (alias)")
+        conn.exec_driver_sql(
+            "INSERT INTO server_alias (alias, uuid, panel_url, guild_id) "
+            "VALUES ('mc', 'u1', 'https://p', 1), ('web', 'u2', NULL, NULL)"
+        )
+        migrate(conn)
+        rows = conn.exec_driver_sql(
+            "SELECT alias, uuid, panel_url, guild_id FROM server_alias ORDER BY id"
+        ).all()
+        assert rows == [("mc", "u1", "https://p", 1), ("web", "u2", None, None)]
+        names = {u["name"] for u in inspect(conn).get_unique_constraints("server_alias")}
+        assert names == {"uq_guild_alias"}
+        conn.exec_driver_sql(
+            "INSERT INTO server_alias (alias, uuid, guild_id) VALUES ('mc', 'u3', 2)"
+        )
+        assert conn.exec_driver_sql(
+            "SELECT count(*) FROM server_alias WHERE alias = 'mc'"
+        ).scalar() == 2
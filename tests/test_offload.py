@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bot.core.executor import BoundedExecutor, offload
+from bot.services import credentials
+
+
+def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_small_jobs_run_inline_and_large_ones_in_the_pool():
+    assert await offload(_thread_name, size=10, threshold=100) == threading.current_thread().name
+    assert (await offload(_thread_name, size=100, threshold=100)).startswith("offload")
+
+
+@pytest.mark.asyncio
+async def test_bounded_executor_caps_jobs_in_flight():
+    ex = BoundedExecutor("test", lambda: ThreadPoolExecutor(4), workers=1, max_pending=2)
+    try:
+        await asyncio.gather(*(ex.run(time.sleep, 0.02) for _ in range(6)))
+    finally:
+        ex.shutdown()
+    snap = ex.snapshot()
+    assert snap["peak"] == 2 and snap["completed"] == 6 and snap["waiting"] == 0
+
+
+def test_cache_hits_refresh_last_used_at_at_most_once_per_interval(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(credentials.time, "monotonic", lambda: now[0])
+    credentials.forget_tokens()
+    credentials._remember_token(1, "https://p", "tok", cred_id=7)
+    assert credentials._due_touch(1, "https://p") is None
+    now[0] += credentials.TOUCH_INTERVAL
+    assert credentials._due_touch(1, "https://p") == 7
+    assert credentials._due_touch(1, "https://p") is None
+    assert credentials._due_touch(2, "https://p") is None
+    credentials.forget_tokens()
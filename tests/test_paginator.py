@@ -0,0 +1,85 @@
+import pytest
+
+from bot.utils.paginator import ChainedPageSource, Paginator, RemotePageSource
+
+
+def _flaky(fail_first: int):
+    calls = {"n": 0}
+
+    async def fetch(page, text):
+        calls["n"] += 1
+        if calls["n"] <= fail_first:
+            raise RuntimeError("panel down")
+        return [f"item{page}"], 2
+    return fetch
+
+
+@pytest.mark.asyncio
+async def test_failed_page_is_refetched():
+    src = RemotePageSource(_flaky(1), lambda items: ",".join(items))
+    assert await src.get_page(0) == []
+    assert src.render([]) == "⚠ panel down"
+    assert await src.get_page(0) == ["item1"]
+    assert src.error is None
+    assert await src.page_count() == 2
+
+
+@pytest.mark.asyncio
+async def test_chained_layout_not_kept_after_failure():
+    src = RemotePageSource(_flaky(1), lambda items: ",".join(items))
+    chained = ChainedPageSource([src])
+    assert await chained.page_count() == 1
+    assert chained.error == "panel down"
+    assert await chained.page_count() == 2
+
+
+def _remote_pages(pages: int, per_page: int = 2):
+    fetched: list[int] = []
+
+    async def fetch(page, text):
+        fetched.append(page)
+        return [f"{page}-{i}" for i in range(per_page)], pages
+    return fetch, fetched
+
+
+def _ends_in(item, text):
+    return item.endswith(text)
+
+
+@pytest.mark.asyncio
+async def test_client_filter_fetches_only_viewed_pages():
+    fetch, fetched = _remote_pages(50)
+    src = RemotePageSource(fetch, ",".join, match=_ends_in).with_filter("0")
+    assert await src.page_count() is None
+    assert await src.get_page(0) == ["1-0", "2-0"]
+    assert fetched == [1, 2]
+    assert await src.page_count() is None
+    assert await src.total_pages() == 25
+    assert len(fetched) == 50
+
+
+@pytest.mark.asyncio
+async def test_view_shows_unknown_count_and_clamps_past_the_end():
+    fetch, fetched = _remote_pages(3)
+    view = Paginator(1, RemotePageSource(fetch, ",".join, match=_ends_in), filter_text="0")
+    assert (await view.render(0)).endswith("page 1/? • filter: `0`")
+    assert fetched == [1, 2]
+    view._sync_buttons()
+    assert not view.next_page.disabled and not view.last_page.disabled
+    # jumping past the end scans only until the end is known, then lands on the last page
+    assert (await view.render(9)).endswith("page 2/2 • filter: `0`")
+    assert view.index == 1
+
+
+@pytest.mark.asyncio
+async def test_rendered_pages_kept_per_filter():
+    fetch, fetched = _remote_pages(2)
+    view = Paginator(1, RemotePageSource(fetch, ",".join, match=_ends_in))
+    await view.render(0)
+    view.filter_text, view.source = "1", view._source_for("1")
+    await view.render(0)
+    n = len(fetched)
+    view.filter_text, view.source = None, view._source_for(None)
+    view.pages = None
+    await view.render(0)
+    assert len(fetched) == n
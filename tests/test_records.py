@@ -0,0 +1,42 @@
+from bot.client.cache import is_warm, mark_stale, stale_age, stale_note
+from bot.client.records import AllocationRecord, ResourceRecord
+from bot.services.snapshot import dump, load
+
+STATS = {
+    "current_state": "running",
+    "is_suspended": False,
+    "resources": {
+        "cpu_absolute": 12.5, "memory_bytes": 1024, "rx_bytes": 7, "tx_bytes": 9, "uptime": 5,
+    },
+}
+
+
+def test_resources_fall_back_to_unprefixed_network_fields():
+    r = ResourceRecord.from_api(STATS)
+    assert (r.state, r.cpu, r.rx_bytes, r.tx_bytes, r.uptime_ms) == ("running", 12.5, 7, 9, 5)
+    assert stale_age(r) is None
+
+
+def test_stale_marking_copies_the_record():
+    live = ResourceRecord.from_api(STATS)
+    warm = mark_stale(live, 30, warm=True)
+    assert stale_age(live) is None
+    assert stale_age(warm) == 30 and is_warm(warm)
+    assert "snapshot" in stale_note(warm)
+
+
+def test_allocation_address_prefers_alias():
+    attrs = {"id": 1, "ip": "10.0.0.1", "ip_alias": "play.example", "port": 25565}
+    a = AllocationRecord.from_api(attrs)
+    assert a.address == "play.example:25565" and not a.assigned
+
+
+def test_snapshot_round_trip(tmp_path):
+    res = ResourceRecord.from_api(STATS)
+    allocs = [AllocationRecord(1, "10.0.0.1", 25565, None, True)]
+    key = ("panel.example", "fp", "/api/client/servers/x/resources")
+    path = tmp_path / "snap.json.gz"
+    assert dump([(key, 1e12, res), (("panel.example", "", "/allocs"), 1e12, allocs)], path) == 2
+    restored = {k: v for k, _, v in load(path, 60)}
+    assert restored[key] == res
+    assert restored[("panel.example", "", "/allocs")] == allocs
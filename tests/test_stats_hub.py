@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from bot.services.stats_hub import DropOldestQueue, StatsHub, _Stream, parse_event
+
+PANEL, UUID = "https://panel.example", "0123abcd-0000"
+
+
+def test_queue_drops_oldest_and_latest_skips_the_backlog():
+    q = DropOldestQueue(2)
+    for i in range(4):
+        q.put_nowait(i)
+    assert q.dropped == 2 and len(q) == 2
+    assert q.latest() == 3 and len(q) == 0
+
+
+def test_parse_event():
+    stats = parse_event(PANEL, UUID, {"event": "stats", "args": [
+        '{"state": "running", "cpu_absolute": 3.5, "memory_bytes": 10, "network": {"rx_bytes": 4}}'
+    ]})
+    assert (stats.kind, stats.state, stats.cpu) == ("stats", "running", 3.5)
+    assert (stats.rx_bytes, stats.tx_bytes) == (4, 0)
+    assert parse_event(PANEL, UUID, {"event": "status", "args": ["offline"]}).state == "offline"
+    assert parse_event(PANEL, UUID, {"event": "console output", "args": ["hi"]}) is None
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    async def idle(self):
+        await asyncio.Event().wait()
+    monkeypatch.setattr(_Stream, "run", idle)
+    return StatsHub(session=None, queue_size=4, idle_grace=0)
+
+
+@pytest.mark.asyncio
+async def test_streams_are_per_user(hub):
+    a1 = hub.subscribe(PANEL, UUID, user_id=1)
+    a2 = hub.subscribe(PANEL, UUID, user_id=1)
+    b = hub.subscribe(PANEL, UUID, user_id=2)
+    assert hub.stats()["streams"] == 2 and hub.stats()["subscribers"] == 3
+    status = parse_event(PANEL, UUID, {"event": "status", "args": ["running"]})
+    hub._streams[(1, PANEL, UUID)].publish(status)
+    assert len(a1.queue) == len(a2.queue) == 1 and len(b.queue) == 0
+    for sub in (a1, a2, b):
+        sub.close()
+    await asyncio.sleep(0.01)  # idle grace of 0 still runs on the next loop turn
+    assert hub.stats()["streams"] == 0
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_late_subscriber_gets_last_state_without_mutating_events(hub):
+    first = hub.subscribe(PANEL, UUID, user_id=1)
+    stream = hub._streams[(1, PANEL, UUID)]
+    args = [{"state": "running", "cpu_absolute": 1}]
+    stats = parse_event(PANEL, UUID, {"event": "stats", "args": args})
+    stream.publish(stats)
+    stream.publish(parse_event(PANEL, UUID, {"event": "status", "args": ["stopping"]}))
+    assert stats.state == "running"
+    late = hub.subscribe(PANEL, UUID, user_id=1)
+    seen = await late.get()
+    assert (seen.kind, seen.state, seen.cpu) == ("stats", "stopping", 1.0)
+    first.close()
+    late.close()
+    await hub.close()